@@ -0,0 +1,15 @@
+# app/auth.py
+import hmac
+from fastapi import Header, HTTPException
+from app import config
+
+
+async def require_api_key(x_api_key: str = Header(None)):
+    """
+    Dependency for routes that sign transactions with the server key and spend its
+    gas: they need the configured API_KEY in X-API-Key, and stay off without one.
+    """
+    if not config.API_KEY:
+        raise HTTPException(status_code=503, detail="Write routes are disabled: API_KEY is not configured")
+    if x_api_key is None or not hmac.compare_digest(x_api_key.encode(), config.API_KEY.encode()):
+        raise HTTPException(status_code=401, detail="Invalid or missing API key")
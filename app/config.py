@@ -4,7 +4,12 @@ from dotenv import load_dotenv
 load_dotenv()
 
 HELA_RPC = os.getenv("HELA_RPC")
+# Comma-separated list of HeLa RPC nodes; defaults to HELA_RPC alone
+HELA_RPC_URLS = [u.strip() for u in os.getenv("HELA_RPC_URLS", HELA_RPC or "").split(",") if u.strip()]
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
+# Shared secret for routes that sign with PRIVATE_KEY (X-API-Key header);
+# unset leaves those routes disabled
+API_KEY = os.getenv("API_KEY")
 
 FEED_ADDRESS = os.getenv("FEED_ADDRESS")
 COMMENT_ADDRESS = os.getenv("COMMENT_ADDRESS")
@@ -13,4 +18,96 @@ STREAK_ADDRESS = os.getenv("STREAK_ADDRESS")
 LEARNING_ADDRESS = os.getenv("LEARNING_ADDRESS")
 DAO_ADDRESS = os.getenv("DAO_ADDRESS")
 MODERATION_ADDRESS = os.getenv("MODERATION_ADDRESS")
-PROFILE_ADDRESS = os.getenv("PROFILE_ADDRESS")
\ No newline at end of file
+PROFILE_ADDRESS = os.getenv("PROFILE_ADDRESS")
+
+# Seconds a fetched gas price is reused for new transactions
+GAS_PRICE_TTL = float(os.getenv("GAS_PRICE_TTL", "5"))
+
+# Receipt polling for transactions submitted with wait=false
+TX_POLL_INTERVAL = float(os.getenv("TX_POLL_INTERVAL", "2"))
+TX_TIMEOUT = float(os.getenv("TX_TIMEOUT", "600"))
+
+# Like/dislike requests are coalesced over this window (seconds) before sending
+REACTION_BATCHING_ENABLED = os.getenv("REACTION_BATCHING_ENABLED", "true").lower() == "true"
+REACTION_BATCH_WINDOW = float(os.getenv("REACTION_BATCH_WINDOW", "0.25"))
+
+# Max read calls per JSON-RPC batch request
+BATCH_CALL_CHUNK_SIZE = int(os.getenv("BATCH_CALL_CHUNK_SIZE", "100"))
+
+# Local event indexers
+FEED_INDEX_ENABLED = os.getenv("FEED_INDEX_ENABLED", "true").lower() == "true"
+DAO_INDEX_ENABLED = os.getenv("DAO_INDEX_ENABLED", "true").lower() == "true"
+MODERATION_INDEX_ENABLED = os.getenv("MODERATION_INDEX_ENABLED", "true").lower() == "true"
+LEARNING_CATALOGUE_ENABLED = os.getenv("LEARNING_CATALOGUE_ENABLED", "true").lower() == "true"
+INDEXER_POLL_INTERVAL = float(os.getenv("INDEXER_POLL_INTERVAL", "2"))
+INDEXER_CONFIRMATIONS = int(os.getenv("INDEXER_CONFIRMATIONS", "0"))
+
+# Profile lookup cache
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+
+# Per-post comment cache
+COMMENT_CACHE_SIZE = int(os.getenv("COMMENT_CACHE_SIZE", "5000"))
+COMMENT_CACHE_TTL = float(os.getenv("COMMENT_CACHE_TTL", "300"))
+
+# AI quiz cache (MongoDB "quiz_cache"); bump the version after prompt changes
+QUIZ_CACHE_VERSION = os.getenv("QUIZ_CACHE_VERSION", "1")
+QUIZ_CACHE_TTL = int(os.getenv("QUIZ_CACHE_TTL", str(30 * 24 * 3600)))
+QUIZ_MEMO_SIZE = int(os.getenv("QUIZ_MEMO_SIZE", "500"))
+QUIZ_PREGENERATE_CONCURRENCY = int(os.getenv("QUIZ_PREGENERATE_CONCURRENCY", "4"))
+
+# Outbound HTTP (OpenRouter, Pinata): shared pool, timeouts, retries, circuit breaker
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "100"))
+OPENROUTER_TIMEOUT = float(os.getenv("OPENROUTER_TIMEOUT", "120"))
+PINATA_TIMEOUT = float(os.getenv("PINATA_TIMEOUT", "15"))
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "2"))
+HTTP_RETRY_BACKOFF = float(os.getenv("HTTP_RETRY_BACKOFF", "0.5"))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_TIMEOUT = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+
+# Pinata pre-signed upload URLs (pooled in memory, see services/url_pool.py)
+PINATA_JWT = os.getenv("PINATA_JWT")
+PINATA_URL_EXPIRES = int(os.getenv("PINATA_URL_EXPIRES", "60"))
+# Pooled URLs are signed for EXPIRES + SHELF_LIFE seconds and served only while
+# at least EXPIRES remain, so clients always get the full PINATA_URL_EXPIRES
+PINATA_URL_SHELF_LIFE = int(os.getenv("PINATA_URL_SHELF_LIFE", "240"))
+PINATA_POOL_MIN = int(os.getenv("PINATA_POOL_MIN", "2"))
+PINATA_POOL_MAX = int(os.getenv("PINATA_POOL_MAX", "50"))
+PINATA_POOL_HORIZON = float(os.getenv("PINATA_POOL_HORIZON", "10"))
+
+# Max seconds each startup warm-up step (RPC, MongoDB, ...) may delay boot
+STARTUP_WARMUP_TIMEOUT = float(os.getenv("STARTUP_WARMUP_TIMEOUT", "10"))
+
+# RPC failover between HELA_RPC_URLS (services/rpc_pool.py)
+RPC_REQUEST_TIMEOUT = float(os.getenv("RPC_REQUEST_TIMEOUT", "10"))
+RPC_MAX_ATTEMPTS = int(os.getenv("RPC_MAX_ATTEMPTS", "3"))
+RPC_EJECT_AFTER = int(os.getenv("RPC_EJECT_AFTER", "3"))
+RPC_EJECT_COOLDOWN = float(os.getenv("RPC_EJECT_COOLDOWN", "10"))
+
+# Read-through cache for contract view calls (services/view_cache.py)
+VIEW_CACHE_SIZE = int(os.getenv("VIEW_CACHE_SIZE", "10000"))
+VIEW_CACHE_EVENT_TTL = float(os.getenv("VIEW_CACHE_EVENT_TTL", "300"))
+HEAD_POLL_INTERVAL = float(os.getenv("HEAD_POLL_INTERVAL", "1"))
+
+# Shared L2 cache tier behind the per-worker caches (services/cache_backend.py):
+# "memory" (no shared tier), "redis" (any Redis-protocol server) or "mongo"
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "desocial:")
+
+# Seconds between Mongo snapshots of deleted/removed post IDs (services/hidden_content.py)
+HIDDEN_SNAPSHOT_INTERVAL = float(os.getenv("HIDDEN_SNAPSHOT_INTERVAL", "60"))
+# Moderation contract deployment block: a fresh start replays FlagResolved logs from here
+MODERATION_DEPLOY_BLOCK = int(os.getenv("MODERATION_DEPLOY_BLOCK", "0"))
+# Seconds a feed read waits for that replay before failing
+HIDDEN_READY_TIMEOUT = float(os.getenv("HIDDEN_READY_TIMEOUT", "5"))
+
+# Live DAO vote tally streams (services/tally_stream.py)
+TALLY_STREAM_HEARTBEAT = float(os.getenv("TALLY_STREAM_HEARTBEAT", "15"))
+TALLY_STREAM_QUEUE_SIZE = int(os.getenv("TALLY_STREAM_QUEUE_SIZE", "256"))
+
+# Local streak projection refreshed from head-state reads (services/streak_projection.py)
+STREAK_PROJECTION_ENABLED = os.getenv("STREAK_PROJECTION_ENABLED", "true").lower() == "true"
+STREAK_PROJECTION_SIZE = int(os.getenv("STREAK_PROJECTION_SIZE", "100000"))
+STREAK_HISTORY_DAYS = int(os.getenv("STREAK_HISTORY_DAYS", "64"))
+STREAK_REFRESH_BATCH = int(os.getenv("STREAK_REFRESH_BATCH", "500"))
@@ -1,8 +1,74 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routers import learning, upload
+from app import config
+from app.routers import comment, dao, feed, learning, moderation, profile, streak, tx, upload
+from app.services import db, web3_utils
+from app.services.cache_backend import cache_backend, cache_stats
+from app.services.http_client import http_client
+from app.services.feed_service import hidden_content, reaction_batcher
+from app.services.learning_service import ensure_quiz_indexes
+from app.services.pinata_service import signed_url_pool
+from app.services.view_cache import view_cache
 
-app = FastAPI(title="Web3 Productivity Social App")
+logger = logging.getLogger(__name__)
+
+
+async def _warm_mongo():
+    await db.warm_up()
+    await ensure_quiz_indexes()
+
+async def _restore_hidden_content():
+    # Filter deleted/removed posts before the indexers have caught up
+    await asyncio.to_thread(hidden_content.restore)
+
+async def _warm_contracts():
+    # ABI parsing is CPU-bound; keep it off the event loop
+    await asyncio.to_thread(web3_utils.resolve_contracts)
+
+async def _warm_signed_urls():
+    if config.PINATA_JWT:
+        signed_url_pool.start()
+
+async def _timed(name: str, step):
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(step(), config.STARTUP_WARMUP_TIMEOUT)
+        logger.info("Warm-up %s done in %.0f ms", name, (time.perf_counter() - started) * 1000)
+    except (Exception, asyncio.TimeoutError) as e:
+        # A cold dependency only slows its first request down; don't refuse to boot
+        logger.error("Warm-up %s failed: %s", name, e)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Single startup phase: warm every connection in parallel, then serve.
+    Importing the app does no network I/O; everything is opened here or on first use.
+    """
+    await asyncio.gather(
+        _timed("rpc", web3_utils.warm_up),
+        _timed("mongo", _warm_mongo),
+        _timed("contracts", _warm_contracts),
+        _timed("signed-urls", _warm_signed_urls),
+        _timed("cache", cache_backend.start),
+        _timed("hidden-content", _restore_hidden_content),
+    )
+    yield
+    try:
+        await asyncio.to_thread(hidden_content.snapshot)
+    except Exception as e:
+        logger.error("Hidden content snapshot failed: %s", e)
+    await reaction_batcher.stop()
+    await signed_url_pool.stop()
+    await cache_backend.stop()
+    await http_client.close()
+    await web3_utils.aw3.provider.disconnect()
+    await db.close()
+
+app = FastAPI(title="Web3 Productivity Social App", lifespan=lifespan)
 
 # CORS - allow frontend (adjust origins as needed)
 origins = [
@@ -20,11 +86,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
+# Include routers (routes that sign with the server key require API_KEY, see app/auth.py)
+app.include_router(feed.router)
+app.include_router(comment.router)
+app.include_router(profile.router)
+app.include_router(dao.router)
+app.include_router(moderation.router)
+app.include_router(streak.router)
 app.include_router(learning.router)
 app.include_router(upload.router)
+app.include_router(tx.router)
 
 # Root
 @app.get("/")
 async def root():
     return {"message": "Web3 Productivity Social App Backend Running"}
+
+@app.get("/health/rpc")
+async def rpc_health():
+    """
+    Per-node latency, error rate and ejection state of the RPC endpoint pool.
+    """
+    return {"endpoints": web3_utils.rpc_pool.stats()}
+
+@app.get("/health/cache")
+async def cache_health():
+    """
+    Hit/miss counters of the contract view-call cache and the shared cache tier.
+    """
+    return {"views": view_cache.stats(), "shared": cache_stats()}
@@ -1,5 +1,7 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Query
 from pydantic import BaseModel
+from typing import List
+from app.auth import require_api_key
 from app.services import comment_service
 
 router = APIRouter(prefix="/comment", tags=["Comment"])
@@ -17,22 +19,34 @@ class CommentUpdate(BaseModel):
 class CommentAction(BaseModel):
     comment_id: int
 
-@router.post("/create")
-async def create_comment(data: CommentCreate):
-    receipt = comment_service.create_comment(data.post_id, data.content, data.media_hash)
+class CommentCounts(BaseModel):
+    post_ids: List[int]
+
+@router.post("/create", dependencies=[Depends(require_api_key)])
+async def create_comment(data: CommentCreate, wait: bool = Query(True)):
+    receipt = await comment_service.create_comment(data.post_id, data.content, data.media_hash, wait=wait)
     return {"success": True, "receipt": receipt}
 
-@router.post("/update")
-async def update_comment(data: CommentUpdate):
-    receipt = comment_service.update_comment(data.comment_id, data.content, data.media_hash)
+@router.post("/update", dependencies=[Depends(require_api_key)])
+async def update_comment(data: CommentUpdate, wait: bool = Query(True)):
+    receipt = await comment_service.update_comment(data.comment_id, data.content, data.media_hash, wait=wait)
     return {"success": True, "receipt": receipt}
 
-@router.post("/delete")
-async def delete_comment(data: CommentAction):
-    receipt = comment_service.delete_comment(data.comment_id)
+@router.post("/delete", dependencies=[Depends(require_api_key)])
+async def delete_comment(data: CommentAction, wait: bool = Query(True)):
+    receipt = await comment_service.delete_comment(data.comment_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
+@router.post("/counts")
+async def get_comment_counts(data: CommentCounts):
+    counts = await comment_service.get_comment_counts(data.post_ids)
+    return {"success": True, "counts": counts}
+
 @router.get("/{post_id}")
-async def get_comments(post_id: int):
-    comments = comment_service.get_comments(post_id)
-    return {"success": True, "comments": comments}
+async def get_comments(post_id: int, cursor: int = Query(None, ge=0), limit: int = Query(None, ge=1, le=100)):
+    # Without cursor/limit the full list is returned, as before
+    if cursor is None and limit is None:
+        comments = await comment_service.get_comments(post_id)
+        return {"success": True, "comments": comments}
+    page = await comment_service.get_comments_page(post_id, cursor, limit or 20)
+    return {"success": True, "comments": page["comments"], "next_cursor": page["next_cursor"]}
@@ -1,7 +1,10 @@
 # app/routers/dao.py
 
-from fastapi import APIRouter
+import json
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
+from app.auth import require_api_key
 from app.services import dao_service
 
 router = APIRouter(prefix="/dao", tags=["DAO"])
@@ -27,34 +30,79 @@ class UserAddress(BaseModel):
 
 # ----------------- ROUTES -----------------
 
-@router.post("/create")
-async def create_proposal(data: ProposalCreate):
-    receipt = dao_service.create_proposal(data.description, data.duration)
+@router.post("/create", dependencies=[Depends(require_api_key)])
+async def create_proposal(data: ProposalCreate, wait: bool = Query(True)):
+    receipt = await dao_service.create_proposal(data.description, data.duration, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
-@router.post("/vote")
-async def vote(data: ProposalVote):
-    receipt = dao_service.vote(data.proposal_id, data.support)
+@router.post("/vote", dependencies=[Depends(require_api_key)])
+async def vote(data: ProposalVote, wait: bool = Query(True)):
+    receipt = await dao_service.vote(data.proposal_id, data.support, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
-@router.post("/execute")
-async def execute(data: ProposalAction):
-    receipt = dao_service.execute_proposal(data.proposal_id)
+@router.post("/execute", dependencies=[Depends(require_api_key)])
+async def execute(data: ProposalAction, wait: bool = Query(True)):
+    receipt = await dao_service.execute_proposal(data.proposal_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
+# Query proposals (declared before /{proposal_id} so "proposals" isn't taken as an ID)
+@router.get("/proposals")
+async def query_proposals(
+    proposer: str = Query(None),
+    status: str = Query(None, pattern="^(live|ended|executed)$"),
+    sort: str = Query("id", pattern="^(id|endTime)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    cursor: str = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    try:
+        page = await dao_service.query_proposals(proposer, status, sort, order, cursor, limit)
+        return {"success": True, "proposals": page["proposals"], "next_cursor": page["next_cursor"]}
+    except ValueError as ve:
+        return {"success": False, "error": str(ve)}
+    except Exception as e:
+        return {"success": False, "error": "Internal server error"}
+
+
 @router.get("/{proposal_id}")
 async def get_proposal(proposal_id: int):
-    proposal = dao_service.get_proposal(proposal_id)
+    proposal = await dao_service.get_proposal(proposal_id)
     return {"success": True, "proposal": proposal}
 
 
+@router.get("/{proposal_id}/stream")
+async def stream_proposal(proposal_id: int):
+    """
+    Server-Sent Events feed of a proposal's tally: `snapshot`, then one `vote` event
+    per vote (voter, voteType and the new totals) until `executed`.
+    """
+    async def events():
+        try:
+            async for item in dao_service.watch_proposal(proposal_id):
+                if item is None:
+                    # Comment line: keeps idle connections open through proxies
+                    yield ": ping\n\n"
+                    continue
+                event, data = item
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+        except Exception as e:
+            yield f"event: error\ndata: {json.dumps({'detail': str(e)})}\n\n"
+
+    # X-Accel-Buffering stops nginx from holding back events
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/user/{user_address}")
 async def get_user_proposals(user_address: str):
     try:
-        proposals = dao_service.get_user_proposals(user_address)
+        proposals = await dao_service.get_user_proposals(user_address)
         return {"success": True, "proposals": proposals}
     except ValueError as ve:
         return {"success": False, "error": str(ve)}
@@ -65,7 +113,7 @@ async def get_user_proposals(user_address: str):
 @router.get("/live/{user_address}")
 async def get_live_proposals(user_address: str):
     try:
-        proposals = dao_service.get_live_proposals_excluding(user_address)
+        proposals = await dao_service.get_live_proposals_excluding(user_address)
         return {"success": True, "proposals": proposals}
     except ValueError as ve:
         return {"success": False, "error": str(ve)}
@@ -76,7 +124,7 @@ async def get_live_proposals(user_address: str):
 @router.get("/vote/{proposal_id}/{user_address}")
 async def get_user_vote(proposal_id: int, user_address: str):
     try:
-        vote_type = dao_service.get_user_vote(proposal_id, user_address)
+        vote_type = await dao_service.get_user_vote(proposal_id, user_address)
         return {"success": True, "voteType": vote_type}  # 0=no vote, 1=like, 2=dislike
     except ValueError as ve:
         return {"success": False, "error": str(ve)}
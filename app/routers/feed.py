@@ -1,8 +1,12 @@
 # backend/app/routers/feed.py
-from fastapi import APIRouter, Query
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
+from web3 import Web3
+from app.auth import require_api_key
 from app.services import feed_service
 from app.services import profile_service  # Import profile_service
+from app.services import comment_service
 
 router = APIRouter(prefix="/feed", tags=["Feed"])
 
@@ -22,66 +26,97 @@ class PostAction(BaseModel):
     post_id: int
 
 
+def _owner_username(owner_address: str, profiles: dict):
+    if not owner_address:
+        return "Unknown"
+    profile = profiles.get(Web3.to_checksum_address(owner_address))
+    return profile.get("username") if profile and profile.get("username") else owner_address
+
+
 # Create Post
-@router.post("/create")
-async def create_post(data: PostCreate):
-    receipt = feed_service.create_post(data.content, data.media_hash)
+@router.post("/create", dependencies=[Depends(require_api_key)])
+async def create_post(data: PostCreate, wait: bool = Query(True)):
+    receipt = await feed_service.create_post(data.content, data.media_hash, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Update Post
-@router.post("/update")
-async def update_post(data: PostUpdate):
-    receipt = feed_service.update_post(data.post_id, data.content, data.media_hash)
+@router.post("/update", dependencies=[Depends(require_api_key)])
+async def update_post(data: PostUpdate, wait: bool = Query(True)):
+    receipt = await feed_service.update_post(data.post_id, data.content, data.media_hash, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Delete Post
-@router.post("/delete")
-async def delete_post(data: PostAction):
-    receipt = feed_service.delete_post(data.post_id)
+@router.post("/delete", dependencies=[Depends(require_api_key)])
+async def delete_post(data: PostAction, wait: bool = Query(True)):
+    receipt = await feed_service.delete_post(data.post_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Like Post
-@router.post("/like")
-async def like_post(data: PostAction):
-    receipt = feed_service.like_post(data.post_id)
+@router.post("/like", dependencies=[Depends(require_api_key)])
+async def like_post(data: PostAction, wait: bool = Query(True)):
+    receipt = await feed_service.like_post(data.post_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Remove Like
-@router.post("/removeLike")
-async def remove_like(data: PostAction):
-    receipt = feed_service.remove_like(data.post_id)
+@router.post("/removeLike", dependencies=[Depends(require_api_key)])
+async def remove_like(data: PostAction, wait: bool = Query(True)):
+    receipt = await feed_service.remove_like(data.post_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Dislike Post
-@router.post("/dislike")
-async def dislike_post(data: PostAction):
-    receipt = feed_service.dislike_post(data.post_id)
+@router.post("/dislike", dependencies=[Depends(require_api_key)])
+async def dislike_post(data: PostAction, wait: bool = Query(True)):
+    receipt = await feed_service.dislike_post(data.post_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
 # Remove Dislike
-@router.post("/removeDislike")
-async def remove_dislike(data: PostAction):
-    receipt = feed_service.remove_dislike(data.post_id)
+@router.post("/removeDislike", dependencies=[Depends(require_api_key)])
+async def remove_dislike(data: PostAction, wait: bool = Query(True)):
+    receipt = await feed_service.remove_dislike(data.post_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
+# Get a page of posts (cursor = last id of the previous page)
+@router.get("/page")
+async def get_posts_page(
+    before_id: int = Query(None, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    user_address: str = Query(None),
+):
+    page = await feed_service.get_posts_page(before_id, limit, user_address)
+    return {
+        "success": True,
+        "posts": await _enrich_posts(page["posts"]),
+        "next_cursor": page["next_cursor"],
+    }
+
+
 # Get a single post
 @router.get("/{post_id}")
 async def get_post(post_id: int, user_address: str = Query(None)):
-    post = feed_service.get_post(post_id, user_address)
+    indexed_owner = feed_service.get_indexed_owner(post_id)
+    try:
+        if indexed_owner:
+            # Owner already known locally: fetch the post and its owner's profile concurrently
+            post, profiles = await asyncio.gather(
+                feed_service.get_post(post_id, user_address),
+                profile_service.get_profiles_by_addresses([indexed_owner]),
+            )
+        else:
+            post = await feed_service.get_post(post_id, user_address)
+            profiles = {}
+    except feed_service.PostRemoved as e:
+        raise HTTPException(status_code=404, detail=str(e))
     owner_address = post.get("owner")
-    owner_username = None
-    if owner_address:
-        profile = profile_service.get_profile_by_address(owner_address)
-        owner_username = profile.get("username") if profile and profile.get("username") else owner_address
-    else:
-        owner_username = "Unknown"
+    if owner_address and Web3.to_checksum_address(owner_address) not in profiles:
+        profiles = await profile_service.get_profiles_by_addresses([owner_address])
+    owner_username = _owner_username(owner_address, profiles)
     created_at = post.get("created_at")
     if not created_at:
         created_at = None  # or set to 0 if you want to show "N/A" in frontend
@@ -96,19 +131,16 @@ async def get_post(post_id: int, user_address: str = Query(None)):
     }
 
 
-# Get latest N posts
-@router.get("/latest/{count}")
-async def get_latest_posts(count: int = 10, user_address: str = Query(None)):
-    posts = feed_service.get_latest_posts(count, user_address)
+async def _enrich_posts(posts):
+    # One lookup per distinct author and one batch of comment counts, cached across requests
+    profiles, comment_counts = await asyncio.gather(
+        profile_service.get_profiles_by_addresses([post["owner"] for post in posts if post.get("owner")]),
+        comment_service.get_comment_counts([post["id"] for post in posts]),
+    )
     enriched_posts = []
     for post in posts:
         owner_address = post.get("owner")
-        owner_username = None
-        if owner_address:
-            profile = profile_service.get_profile_by_address(owner_address)
-            owner_username = profile.get("username") if profile and profile.get("username") else owner_address
-        else:
-            owner_username = "Unknown"
+        owner_username = _owner_username(owner_address, profiles)
         created_at = post.get("created_at")
         if not created_at:
             created_at = None
@@ -116,6 +148,14 @@ async def get_latest_posts(count: int = 10, user_address: str = Query(None)):
             **post,
             "owner": owner_address,
             "owner_username": owner_username,
-            "created_at": created_at
+            "created_at": created_at,
+            "commentCount": comment_counts.get(post["id"], 0)
         })
-    return {"success": True, "posts": enriched_posts}
+    return enriched_posts
+
+
+# Get latest N posts
+@router.get("/latest/{count}")
+async def get_latest_posts(count: int = 10, user_address: str = Query(None)):
+    posts = await feed_service.get_latest_posts(count, user_address)
+    return {"success": True, "posts": await _enrich_posts(posts)}
@@ -1,9 +1,17 @@
 # backend/app/routers/learning.py
 
+import json
+import logging
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
-from app.services.learning_service import generate_quiz_ai, get_module_content
+from app.services.learning_service import (
+    generate_quiz_ai, get_catalogue, get_catalogue_topic, get_module_content,
+    stream_ai_content, stream_quiz_ai,
+)
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/learning", tags=["Learning"])
 
@@ -19,7 +27,7 @@ async def generate_quiz(payload: GenerateQuizReq):
     Reads content from MongoDB (stored by admin-side pipeline).
     """
     try:
-        quiz = generate_quiz_ai(
+        quiz = await generate_quiz_ai(
             payload.topic_id,
             payload.module_id,
             payload.question_count
@@ -28,6 +36,75 @@ async def generate_quiz(payload: GenerateQuizReq):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _sse_response(items, event: str):
+    """
+    Relay an async generator as Server-Sent Events: one `event` per item, then
+    `done`, or `error` if generation fails part-way.
+    """
+    async def events():
+        count = 0
+        try:
+            async for item in items:
+                count += 1
+                yield _sse(event, item)
+        except Exception as e:
+            logger.exception("Streaming generation failed: %s", e)
+            yield _sse("error", {"detail": str(e)})
+            return
+        yield _sse("done", {"count": count})
+
+    # X-Accel-Buffering stops nginx from holding back events until the end
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.post("/generate-quiz/stream")
+async def generate_quiz_stream(payload: GenerateQuizReq):
+    """
+    Server-Sent Events variant of /generate-quiz: one `question` event per question
+    as soon as the model has completed it.
+    """
+    return _sse_response(
+        stream_quiz_ai(payload.topic_id, payload.module_id, payload.question_count),
+        "question",
+    )
+
+@router.get("/content/stream")
+async def generate_content_stream(topic_id: int, module_title: str):
+    """
+    Server-Sent Events stream of AI-generated module content, one `token` event per chunk.
+    """
+    return _sse_response(stream_ai_content(topic_id, module_title), "token")
+
+@router.get("/catalogue")
+async def fetch_catalogue():
+    """
+    The topic -> module tree from the Learning contract, with each module's
+    content metadata from MongoDB.
+    """
+    try:
+        return {"success": True, **await get_catalogue()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/catalogue/{topic_id}")
+async def fetch_catalogue_topic(topic_id: int):
+    """
+    One topic of the catalogue with its modules.
+    """
+    try:
+        topic = await get_catalogue_topic(topic_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if topic is None:
+        raise HTTPException(status_code=404, detail="Topic not found")
+    return {"success": True, "topic": topic}
+
 @router.get("/topic/{topic_id}/module/{module_id}")
 async def fetch_module_content(topic_id: int, module_id: int):
     """
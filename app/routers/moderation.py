@@ -1,7 +1,9 @@
 # backend/app/routers/moderation.py
 
-from fastapi import APIRouter
-from pydantic import BaseModel
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from app.auth import require_api_key
 from app.services import moderation_service
 
 router = APIRouter(prefix="/moderation", tags=["Moderation"])
@@ -16,19 +18,54 @@ class ResolveFlag(BaseModel):
     remove: bool
 
 
-@router.post("/flag")
-async def flag_content(data: FlagContent):
-    receipt = moderation_service.flag_content(data.content_id)
+class FlagsBulkReq(BaseModel):
+    content_ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
+@router.post("/flag", dependencies=[Depends(require_api_key)])
+async def flag_content(data: FlagContent, wait: bool = Query(True)):
+    receipt = await moderation_service.flag_content(data.content_id, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
-@router.post("/resolve")
-async def resolve_flag(data: ResolveFlag):
-    receipt = moderation_service.resolve_flag(data.content_id, data.remove)
+@router.post("/resolve", dependencies=[Depends(require_api_key)])
+async def resolve_flag(data: ResolveFlag, wait: bool = Query(True)):
+    receipt = await moderation_service.resolve_flag(data.content_id, data.remove, wait=wait)
     return {"success": True, "receipt": receipt}
 
 
+@router.post("/flags")
+async def get_flags_bulk(data: FlagsBulkReq):
+    """
+    Flags of many content IDs at once; IDs never flagged map to an empty list.
+    """
+    try:
+        flags = await moderation_service.get_flags_bulk(data.content_ids)
+        return {"success": True, "flags": flags}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+# Declared before /{content_id} so "queue" isn't taken as an ID
+@router.get("/queue")
+async def get_queue(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    try:
+        page = await moderation_service.get_queue(offset, limit)
+        return {"success": True, **page}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/flaggers/{user_address}")
+async def get_flagger_counts(user_address: str):
+    try:
+        counts = await moderation_service.get_flagger_counts(user_address)
+        return {"success": True, **counts}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
 @router.get("/{content_id}")
 async def get_flags(content_id: int):
-    flags = moderation_service.get_flags(content_id)
+    flags = await moderation_service.get_flags(content_id)
     return {"success": True, "flags": flags}
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
+from app.auth import require_api_key
 from app.services import profile_service
 
 router = APIRouter(prefix="/profile", tags=["Profile"])
@@ -17,20 +18,20 @@ async def get_profile(address: str = Query(...)):
     Get the profile for a given address.
     """
     try:
-        profile = profile_service.get_profile_by_address(address)
+        profile = await profile_service.get_profile_by_address(address)
         return {"success": True, "data": profile}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.put("/")
-async def update_profile(address: str = Query(...), body: ProfileUpdateRequest = None):
+@router.put("/", dependencies=[Depends(require_api_key)])
+async def update_profile(address: str = Query(...), body: ProfileUpdateRequest = None, wait: bool = Query(True)):
     """
     Update the profile for a given address.
     """
     try:
         # In production, you'd have the client sign the transaction.
-        res = profile_service.set_profile(body.username, body.avatarURI, body.bio)
+        res = await profile_service.set_profile(body.username, body.avatarURI, body.bio, wait=wait)
         return {"success": True, "data": res}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -1,6 +1,9 @@
 # app/routers/streak.py
-from fastapi import APIRouter
-from pydantic import BaseModel
+from typing import List
+from fastapi import APIRouter, Depends, Query
+from pydantic import BaseModel, Field
+from app import config
+from app.auth import require_api_key
 from app.services import streak_service
 
 router = APIRouter(prefix="/streak", tags=["Streak"])
@@ -11,11 +14,16 @@ class UserAddress(BaseModel):
     user_address: str
 
 
+class StreakBulkReq(BaseModel):
+    addresses: List[str] = Field(..., min_length=1, max_length=500)
+    days: int = Field(7, ge=1, le=config.STREAK_HISTORY_DAYS)
+
+
 # ----------------- ROUTES -----------------
-@router.post("/complete")
-async def complete_task(data: UserAddress):
+@router.post("/complete", dependencies=[Depends(require_api_key)])
+async def complete_task(data: UserAddress, wait: bool = Query(True)):
     try:
-        receipt = streak_service.complete_task(data.user_address)
+        receipt = await streak_service.complete_task(data.user_address, wait=wait)
         return {"success": True, "receipt": receipt}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -24,7 +32,7 @@ async def complete_task(data: UserAddress):
 @router.get("/current/{user_address}")
 async def get_current_streak(user_address: str):
     try:
-        streak = streak_service.get_current_streak(user_address)
+        streak = await streak_service.get_current_streak(user_address)
         return {"success": True, "streak": streak}
     except Exception as e:
         return {"success": False, "error": str(e)}
@@ -33,7 +41,41 @@ async def get_current_streak(user_address: str):
 @router.get("/history/{user_address}")
 async def get_last_7_days_status(user_address: str):
     try:
-        history = streak_service.get_last_7_days_status(user_address)
+        history = await streak_service.get_last_7_days_status(user_address)
         return {"success": True, "history": history}
     except Exception as e:
         return {"success": False, "error": str(e)}
+
+
+@router.post("/bulk")
+async def get_streaks(data: StreakBulkReq):
+    """
+    Current streak and last `days` days (index 0 = today) for many addresses at once.
+    """
+    try:
+        streaks = await streak_service.get_streaks(data.addresses, data.days)
+        return {"success": True, "streaks": streaks}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/leaderboard")
+async def get_leaderboard(offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100)):
+    """
+    Longest live streaks among tracked users only: those this API has served or
+    completed a task for. The contract can't list every user.
+    """
+    try:
+        page = await streak_service.get_leaderboard(offset, limit)
+        return {"success": True, **page}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/leaderboard/{user_address}")
+async def get_leaderboard_rank(user_address: str):
+    try:
+        entry = await streak_service.get_leaderboard_rank(user_address)
+        return {"success": True, **entry}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
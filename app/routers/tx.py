@@ -0,0 +1,42 @@
+# app/routers/tx.py
+import json
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.services.tx_tracker import tx_tracker, PENDING
+
+router = APIRouter(prefix="/tx", tags=["Transactions"])
+
+
+@router.get("/{tx_hash}")
+async def get_tx_status(tx_hash: str):
+    """
+    Status of a transaction submitted with wait=false.
+    """
+    record = tx_tracker.get(tx_hash)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Transaction not tracked")
+    return {"success": True, "tx": record}
+
+
+@router.get("/{tx_hash}/events")
+async def stream_tx_status(tx_hash: str):
+    """
+    Server-Sent Events stream of status updates, closed once the transaction settles.
+    """
+    record = tx_tracker.get(tx_hash)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Transaction not tracked")
+
+    async def events():
+        queue = tx_tracker.subscribe(tx_hash)
+        try:
+            # Re-read after subscribing so an update in between isn't missed
+            current = tx_tracker.get(tx_hash) or record
+            yield f"data: {json.dumps(current)}\n\n"
+            while current["state"] == PENDING:
+                current = await queue.get()
+                yield f"data: {json.dumps(current)}\n\n"
+        finally:
+            tx_tracker.unsubscribe(tx_hash, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream")
@@ -1,50 +1,33 @@
 from fastapi import APIRouter, HTTPException
-import requests
-import os
-import time
-from dotenv import load_dotenv
+import logging
+from app.services.http_client import UpstreamHTTPError, CircuitOpenError
+from app.services.pinata_service import signed_url_pool
 
-load_dotenv()  # loads PINATA_JWT from .env
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/pinata", tags=["Pinata"])
 
-PINATA_JWT = os.getenv("PINATA_JWT")
-PINATA_SIGN_URL = "https://uploads.pinata.cloud/v3/files/sign"
-
 @router.get("/signed-url")
-def get_signed_url():
+async def get_signed_url():
     """
     Returns a presigned URL to upload a file directly from frontend.
+    Served from a pre-signed pool; signs on demand only when the pool is empty.
     """
-    headers = {
-        "Authorization": f"Bearer {PINATA_JWT}",
-        "Content-Type": "application/json"
-    }
-
-    payload = {
-        "expires": 60,  # seconds
-        "name": "client_file",  # optional file name
-        "mimeTypes": ["image/*"],  # optional
-        "maxFileSize": 5000000,  # optional
-        "date": int(time.time())  # REQUIRED: current timestamp
-    }
-
     try:
-        response = requests.post(PINATA_SIGN_URL, json=payload, headers=headers)
-        print("Pinata status code:", response.status_code)
-        print("Pinata response text:", response.text)
-        response.raise_for_status()
-        data = response.json()
-        return {"url": data.get("data")}
-    except requests.HTTPError as e:
-        print("HTTPError:", e)
-        if e.response is not None:
-            print("Response status code:", e.response.status_code)
-            print("Response body:", e.response.text)
-        raise HTTPException(
-            status_code=e.response.status_code if e.response else 500,
-            detail=f"Pinata HTTPError: {e}"
-        )
+        url = await signed_url_pool.get()
+        return {"url": url}
+    except UpstreamHTTPError as e:
+        logger.warning("Pinata sign request failed: %s", e)
+        raise HTTPException(status_code=e.status, detail=f"Pinata HTTPError: {e}")
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Pinata unavailable: {e}")
     except Exception as e:
-        print("Exception:", e)
+        logger.exception("Pinata sign request failed: %s", e)
         raise HTTPException(status_code=500, detail=f"Unexpected error: {e}")
+
+@router.get("/signed-url/pool")
+async def get_signed_url_pool_stats():
+    """
+    Pool size, demand-based target and hit/miss counters.
+    """
+    return signed_url_pool.stats()
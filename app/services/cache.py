@@ -0,0 +1,202 @@
+# app/services/cache.py
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class _Flight:
+    """
+    A load in progress for one key; other callers wait on it instead of loading again.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def resolve(self, value=None, error=None):
+        self.value = value
+        self.error = error
+        self.done.set()
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire `ttl` seconds after being stored.
+
+    get_or_load / get_many_or_load coalesce concurrent misses: while a key is being
+    loaded, other callers asking for it wait for that load instead of starting their own.
+
+    `on_evict(key, value)` is called (under the cache lock) whenever an entry leaves
+    the cache by expiry, LRU eviction, invalidate or clear; not when it is overwritten.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._flights = {}
+        self._async_flights = {}  # key -> asyncio.Future, for the a* methods
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _get_locked(self, key, now: float):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= now:
+            del self._data[key]
+            self._evicted_locked(key, value)
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _set_locked(self, key, value, now: float):
+        self._data[key] = (now + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            old_key, (_, old_value) = self._data.popitem(last=False)
+            self._evicted_locked(old_key, old_value)
+
+    def _evicted_locked(self, key, value):
+        if self.on_evict is not None:
+            self.on_evict(key, value)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._get_locked(key, time.monotonic())
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        with self._lock:
+            self._set_locked(key, value, time.monotonic())
+
+    def invalidate(self, key):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._evicted_locked(key, entry[1])
+
+    def clear(self):
+        with self._lock:
+            entries, self._data = self._data, OrderedDict()
+            for key, (_, value) in entries.items():
+                self._evicted_locked(key, value)
+
+    def get_or_load(self, key, loader):
+        """
+        Return the cached value for `key`, calling `loader()` on a miss.
+        """
+        return self.get_many_or_load([key], lambda keys: {key: loader()})[key]
+
+    def get_many_or_load(self, keys, loader):
+        """
+        Return {key: value} for every distinct key in `keys`.
+        Misses not already being loaded elsewhere are passed to `loader(missing_keys)`
+        in a single call, which must return {key: value} for each of them.
+        """
+        result = {}
+        owned = {}
+        waiting = {}
+        with self._lock:
+            now = time.monotonic()
+            for key in dict.fromkeys(keys):
+                value = self._get_locked(key, now)
+                if value is not _MISSING:
+                    result[key] = value
+                elif key in self._flights:
+                    waiting[key] = self._flights[key]
+                else:
+                    owned[key] = self._flights[key] = _Flight()
+
+        if owned:
+            try:
+                loaded = loader(list(owned.keys()))
+                loaded = {key: loaded[key] for key in owned}
+            except Exception as e:
+                with self._lock:
+                    for key, flight in owned.items():
+                        self._flights.pop(key, None)
+                        flight.resolve(error=e)
+                raise
+            with self._lock:
+                now = time.monotonic()
+                for key, flight in owned.items():
+                    value = loaded[key]
+                    self._set_locked(key, value, now)
+                    self._flights.pop(key, None)
+                    flight.resolve(value)
+                    result[key] = value
+
+        for key, flight in waiting.items():
+            result[key] = flight.wait()
+        return result
+
+    async def aget_or_load(self, key, loader):
+        """
+        Async get_or_load; `loader()` is a coroutine function.
+        """
+        async def load_one(keys):
+            return {key: await loader()}
+        return (await self.aget_many_or_load([key], load_one))[key]
+
+    async def aget_many_or_load(self, keys, loader):
+        """
+        Async get_many_or_load; `loader(missing_keys)` is a coroutine function.
+        Concurrent misses wait on the pending load's future instead of blocking the loop.
+        """
+        result = {}
+        owned = {}
+        waiting = {}
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            now = time.monotonic()
+            for key in dict.fromkeys(keys):
+                value = self._get_locked(key, now)
+                if value is not _MISSING:
+                    result[key] = value
+                elif key in self._async_flights:
+                    waiting[key] = self._async_flights[key]
+                else:
+                    owned[key] = self._async_flights[key] = loop.create_future()
+
+        if owned:
+            try:
+                loaded = await loader(list(owned.keys()))
+                loaded = {key: loaded[key] for key in owned}
+            except BaseException as e:
+                with self._lock:
+                    for key, future in owned.items():
+                        self._async_flights.pop(key, None)
+                        if isinstance(e, asyncio.CancelledError):
+                            future.cancel()
+                        else:
+                            future.set_exception(e)
+                            # Mark retrieved so unawaited failures don't log warnings
+                            future.exception()
+                raise
+            with self._lock:
+                now = time.monotonic()
+                for key, future in owned.items():
+                    value = loaded[key]
+                    self._set_locked(key, value, now)
+                    self._async_flights.pop(key, None)
+                    future.set_result(value)
+                    result[key] = value
+
+        for key, future in waiting.items():
+            result[key] = await asyncio.shield(future)
+        return result
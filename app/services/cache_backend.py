@@ -0,0 +1,413 @@
+# app/services/cache_backend.py
+import asyncio
+import json
+import logging
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from pymongo import CursorType, ReplaceOne
+from pymongo.errors import CollectionInvalid
+
+from app import config
+from app.services.cache import TTLCache
+from app.services.db import get_async_db
+
+logger = logging.getLogger(__name__)
+
+
+def encode_key(key) -> str:
+    """
+    Stable string form of a cache key (str, int or nested tuples of them).
+    """
+    return json.dumps(key, separators=(",", ":"))
+
+
+def _as_tuples(value):
+    return tuple(_as_tuples(v) for v in value) if isinstance(value, list) else value
+
+
+def decode_key(key: str):
+    # JSON turns tuples into lists; L1 keys are tuples
+    return _as_tuples(json.loads(key))
+
+
+class CacheBackend:
+    """
+    Shared L2 tier used by every worker, plus a broadcast channel for invalidations.
+
+    The base class is the "memory" backend: nothing is shared, every lookup misses
+    and broadcasts go nowhere, so caches behave as plain per-worker caches.
+    Keys are encoded strings scoped by namespace; values must be JSON-serializable.
+    """
+
+    name = "memory"
+    shared = False
+
+    def __init__(self):
+        # Identifies this worker's own broadcasts, which it has already applied
+        self.origin = uuid.uuid4().hex
+        self.loop = None
+        self._listeners = {}  # namespace -> [listener(key or None)]
+        self._task = None
+        self._lost = False  # the channel dropped; broadcasts may have been missed
+        self._failures = 0
+
+    # -------- invalidation channel --------
+    def subscribe(self, namespace: str, listener):
+        """
+        `listener(key)` is called when another worker invalidates `key` in
+        `namespace`; `listener(None)` means drop the whole namespace.
+        """
+        self._listeners.setdefault(namespace, []).append(listener)
+        return listener
+
+    def _deliver(self, message: dict):
+        if message.get("origin") == self.origin:
+            return
+        key = message.get("key")
+        for listener in self._listeners.get(message.get("ns"), ()):
+            try:
+                listener(None if key is None else decode_key(key))
+            except Exception as e:
+                logger.exception("Cache invalidation listener failed: %s", e)
+
+    def _resync(self):
+        # Broadcasts may have been missed while disconnected
+        for namespace, listeners in self._listeners.items():
+            for listener in listeners:
+                listener(None)
+
+    def _message(self, namespace: str, key):
+        return json.dumps({"origin": self.origin, "ns": namespace, "key": key})
+
+    async def _listen(self):
+        """
+        Deliver broadcasts until the channel fails; calls _subscribed() once listening.
+        """
+
+    def _subscribed(self):
+        if self._lost:
+            self._resync()
+        self._lost = False
+        self._failures = 0
+
+    async def _run(self):
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("%s cache invalidation channel failed: %s", self.name, e)
+            self._lost = True
+            await asyncio.sleep(min(30, 2 ** self._failures))
+            self._failures += 1
+
+    # -------- storage --------
+    async def get_many(self, namespace: str, keys) -> dict:
+        return {}
+
+    async def set_many(self, namespace: str, items: dict, ttl: float):
+        pass
+
+    async def delete(self, namespace: str, key: str = None):
+        """
+        Drop `key`, or every key of `namespace` when `key` is None.
+        """
+
+    async def publish(self, namespace: str, key: str = None):
+        pass
+
+    # -------- lifecycle --------
+    async def start(self):
+        if self.loop is not None:
+            return
+        self.loop = asyncio.get_running_loop()
+        if self.shared:
+            self._task = self.loop.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.loop = None
+
+
+class RedisBackend(CacheBackend):
+    """
+    L2 in any Redis-protocol server (Redis, Valkey, KeyDB, Dragonfly, ...):
+    plain string keys with a TTL, invalidations over PUBLISH/SUBSCRIBE.
+    """
+
+    name = "redis"
+    shared = True
+
+    def __init__(self, url: str, prefix: str = "", channel: str = "cache-invalidation"):
+        super().__init__()
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package") from e
+        # Connections are opened on first command, not here
+        self.client = aioredis.from_url(url)
+        self.prefix = prefix
+        self.channel = prefix + channel
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}{namespace}:{key}"
+
+    async def get_many(self, namespace: str, keys) -> dict:
+        values = await self.client.mget([self._key(namespace, k) for k in keys])
+        return {k: json.loads(v) for k, v in zip(keys, values) if v is not None}
+
+    async def set_many(self, namespace: str, items: dict, ttl: float):
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.set(self._key(namespace, key), value, px=max(1, int(ttl * 1000)))
+            await pipe.execute()
+
+    async def delete(self, namespace: str, key: str = None):
+        if key is not None:
+            await self.client.delete(self._key(namespace, key))
+            return
+        batch = []
+        async for name in self.client.scan_iter(match=self._key(namespace, "*"), count=500):
+            batch.append(name)
+            if len(batch) >= 500:
+                await self.client.delete(*batch)
+                batch = []
+        if batch:
+            await self.client.delete(*batch)
+
+    async def publish(self, namespace: str, key: str = None):
+        await self.client.publish(self.channel, self._message(namespace, key))
+
+    async def _listen(self):
+        pubsub = self.client.pubsub()
+        try:
+            await pubsub.subscribe(self.channel)
+            self._subscribed()
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    self._deliver(json.loads(message["data"]))
+        finally:
+            await pubsub.aclose()
+
+    async def stop(self):
+        await super().stop()
+        await self.client.aclose()
+
+
+class MongoBackend(CacheBackend):
+    """
+    L2 in the app's MongoDB: entries in `cache_entries` (expired by a TTL index and
+    on read), invalidations appended to the capped `cache_invalidations` collection
+    and followed with a tailable cursor. Needs no replica set.
+    """
+
+    name = "mongo"
+    shared = True
+
+    def __init__(self, entries: str = "cache_entries", invalidations: str = "cache_invalidations",
+                 channel_size: int = 1 << 20):
+        super().__init__()
+        self.entries_name = entries
+        self.invalidations_name = invalidations
+        self.channel_size = channel_size
+
+    def _db(self):
+        return get_async_db()
+
+    async def get_many(self, namespace: str, keys) -> dict:
+        ids = {f"{namespace}:{k}": k for k in keys}
+        # The TTL monitor only runs once a minute
+        cursor = self._db()[self.entries_name].find(
+            {"_id": {"$in": list(ids)}, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+        )
+        return {ids[doc["_id"]]: json.loads(doc["value"]) async for doc in cursor}
+
+    async def set_many(self, namespace: str, items: dict, ttl: float):
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=ttl)
+        # Values stay JSON text: BSON can't hold uint256 ints
+        await self._db()[self.entries_name].bulk_write([
+            ReplaceOne({"_id": f"{namespace}:{key}"},
+                       {"ns": namespace, "value": value, "expires_at": expires_at}, upsert=True)
+            for key, value in items.items()
+        ], ordered=False)
+
+    async def delete(self, namespace: str, key: str = None):
+        entries = self._db()[self.entries_name]
+        if key is not None:
+            await entries.delete_one({"_id": f"{namespace}:{key}"})
+        else:
+            await entries.delete_many({"ns": namespace})
+
+    async def publish(self, namespace: str, key: str = None):
+        await self._db()[self.invalidations_name].insert_one({"message": self._message(namespace, key)})
+
+    async def _listen(self):
+        db = self._db()
+        await db[self.entries_name].create_index("expires_at", expireAfterSeconds=0)
+        try:
+            await db.create_collection(self.invalidations_name, capped=True, size=self.channel_size)
+        except CollectionInvalid:
+            pass
+        channel = db[self.invalidations_name]
+        last = await channel.find_one(sort=[("$natural", -1)])
+        self._subscribed()
+        last_id = last["_id"] if last else None
+        while True:
+            query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            cursor = channel.find(query, cursor_type=CursorType.TAILABLE_AWAIT)
+            async for doc in cursor:
+                last_id = doc["_id"]
+                self._deliver(json.loads(doc["message"]))
+            # Tailable cursors die on an empty collection; poll until there is something
+            await asyncio.sleep(1)
+
+
+class TieredCache:
+    """
+    Per-worker TTLCache (L1) in front of the shared backend (L2).
+
+    L1 misses are looked up in L2 before calling the loader, and loaded values
+    are written to both tiers, so a value read by one worker serves the fleet.
+    invalidate() / clear() also drop the entry from L2 and broadcast it to every
+    other worker's L1. L2 errors are logged and never fail a read.
+    """
+
+    def __init__(self, namespace: str, maxsize: int, ttl: float, backend: CacheBackend = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.l1 = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.backend = backend or cache_backend
+        self.backend.subscribe(namespace, self._on_remote)
+        self._epoch = 0  # bumped on every invalidation, so stale loads aren't shared
+        self._tasks = set()
+        self.l2_hits = 0
+        self.l2_misses = 0
+        _caches.append(self)
+
+    def __len__(self):
+        return len(self.l1)
+
+    def get(self, key, default=None):
+        return self.l1.get(key, default)
+
+    def set(self, key, value):
+        self.l1.set(key, value)
+        self._spawn(self._store({key: value}, self._epoch))
+
+    def invalidate(self, key):
+        self._epoch += 1
+        self.l1.invalidate(key)
+        self._spawn(self._drop(encode_key(key)))
+
+    def clear(self):
+        self._epoch += 1
+        self.l1.clear()
+        self._spawn(self._drop(None))
+
+    async def aget_or_load(self, key, loader):
+        async def load_one(keys):
+            return {key: await loader()}
+        return (await self.aget_many_or_load([key], load_one))[key]
+
+    async def aget_many_or_load(self, keys, loader):
+        """
+        TTLCache.aget_many_or_load with L2 between L1 and `loader(missing_keys)`.
+        """
+        async def load(missing):
+            epoch = self._epoch
+            found = await self._fetch(missing)
+            rest = [key for key in missing if key not in found]
+            if rest:
+                loaded = await loader(rest)
+                loaded = {key: loaded[key] for key in rest}
+                self._spawn(self._store(loaded, epoch))
+                found.update(loaded)
+            return found
+        return await self.l1.aget_many_or_load(keys, load)
+
+    def stats(self) -> dict:
+        return {"size": len(self.l1), "l2Hits": self.l2_hits, "l2Misses": self.l2_misses}
+
+    # -------- L2 --------
+    def _on_remote(self, key):
+        if key is None:
+            self.l1.clear()
+        else:
+            self.l1.invalidate(key)
+
+    async def _fetch(self, keys) -> dict:
+        if not self.backend.shared:
+            return {}
+        await self.backend.start()
+        encoded = {encode_key(key): key for key in keys}
+        try:
+            found = await self.backend.get_many(self.namespace, list(encoded))
+        except Exception as e:
+            logger.warning("Shared cache read failed (%s): %s", self.namespace, e)
+            return {}
+        self.l2_hits += len(found)
+        self.l2_misses += len(keys) - len(found)
+        return {encoded[k]: value for k, value in found.items()}
+
+    async def _store(self, items: dict, epoch: int):
+        # An invalidation during the load means the values may predate it
+        if epoch != self._epoch:
+            return
+        try:
+            encoded = {encode_key(key): json.dumps(value) for key, value in items.items()}
+            await self.backend.set_many(self.namespace, encoded, self.ttl)
+        except Exception as e:
+            logger.warning("Shared cache write failed (%s): %s", self.namespace, e)
+
+    async def _drop(self, key):
+        try:
+            await self.backend.delete(self.namespace, key)
+            await self.backend.publish(self.namespace, key)
+        except Exception as e:
+            logger.warning("Shared cache invalidation failed (%s): %s", self.namespace, e)
+
+    def _spawn(self, coro):
+        """
+        Run an L2 write in the backend's loop without waiting for it; callable from
+        indexer threads as well as request handlers.
+        """
+        loop = self.backend.loop
+        if not self.backend.shared or loop is None or loop.is_closed():
+            coro.close()
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task = loop.create_task(coro)
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(coro, loop)
+
+
+def build_backend(kind: str) -> CacheBackend:
+    if kind == "redis":
+        return RedisBackend(config.CACHE_REDIS_URL, prefix=config.CACHE_KEY_PREFIX)
+    if kind == "mongo":
+        return MongoBackend()
+    if kind != "memory":
+        raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+    return CacheBackend()
+
+
+cache_backend = build_backend(config.CACHE_BACKEND)
+_caches = []
+
+
+def cache_stats() -> dict:
+    return {"backend": cache_backend.name, "caches": {c.namespace: c.stats() for c in _caches}}
@@ -1,51 +1,197 @@
 # app/services/comment_service.py
-from app.services.web3_utils import get_contract, build_signed_tx, send_signed_transaction
+from bisect import bisect_right
+from app.services.web3_utils import (
+    w3, contract, async_contract, async_build_signed_tx, async_send_signed_transaction,
+    async_batch_call,
+)
+from app.services.tx_tracker import tx_tracker
+from app.services.cache import TTLCache
+from app.services.event_indexer import EventIndexer
 from app import config
 
-COMMENT_ADDRESS = config.COMMENT_ADDRESS
-comment_contract = get_contract(COMMENT_ADDRESS, "Comment")
+comment_contract = contract("Comment")
+async_comment_contract = async_contract("Comment")
 
-def create_comment(post_id: int, content: str, media_hash: str = ""):
+# ----------------- COMMENT CACHE -----------------
+# comment id -> post id, for events that only carry the comment id. Only covers
+# comments of cached posts: entries go when their post leaves the cache.
+comment_post_ids = {}
+
+def _forget_post(post_id, entry):
+    for c in entry["comments"]:
+        if comment_post_ids.get(c["id"]) == post_id:
+            del comment_post_ids[c["id"]]
+
+# post id -> {"comments": all, "live": existing sorted by id, "ids": ids of live}
+comment_cache = TTLCache(maxsize=config.COMMENT_CACHE_SIZE, ttl=config.COMMENT_CACHE_TTL,
+                         on_evict=_forget_post)
+comment_indexer = EventIndexer(comment_contract, name="Comment",
+                               poll_interval=config.INDEXER_POLL_INTERVAL,
+                               confirmations=config.INDEXER_CONFIRMATIONS)
+
+def _call_args(event, fn_name: str):
+    """
+    Arguments of the `fn_name` call that emitted `event`, read from its transaction
+    (the body isn't in the log). None if the transaction isn't a direct call to it,
+    e.g. one routed through another contract.
+    """
+    try:
+        tx = w3.eth.get_transaction(event["transactionHash"])
+        fn, args = comment_contract.decode_function_input(tx["input"])
+    except Exception:
+        return None
+    return args if fn.fn_name == fn_name else None
+
+def _on_comment_created(event):
+    post_id = event["args"]["postId"]
+    comment_id = event["args"]["commentId"]
+    entry = comment_cache.get(post_id)
+    if entry is None:
+        return
+    args = _call_args(event, "createComment")
+    if args is None or args["postId"] != post_id:
+        comment_cache.invalidate(post_id)
+        return
+    comment = {
+        "id": comment_id,
+        "postId": post_id,
+        "author": event["args"]["author"],
+        "content": args["content"],
+        "mediaHash": args["mediaHash"],
+        "timestamp": w3.eth.get_block(event["blockNumber"])["timestamp"],
+        "exists": True,
+    }
+    comments = [c for c in entry["comments"] if c["id"] != comment_id] + [comment]
+    comment_post_ids[comment_id] = post_id
+    comment_cache.set(post_id, _make_entry(comments))
+
+def _on_comment_updated(event):
+    comment_id = event["args"]["commentId"]
+    post_id = comment_post_ids.get(comment_id)
+    entry = comment_cache.get(post_id) if post_id is not None else None
+    if entry is None:
+        return
+    args = _call_args(event, "updateComment")
+    if args is None or args["commentId"] != comment_id:
+        comment_cache.invalidate(post_id)
+        return
+    comments = [dict(c, content=args["content"], mediaHash=args["mediaHash"]) if c["id"] == comment_id else c
+                for c in entry["comments"]]
+    comment_cache.set(post_id, _make_entry(comments))
+
+def _on_comment_deleted(event):
+    comment_id = event["args"]["commentId"]
+    post_id = comment_post_ids.get(comment_id)
+    entry = comment_cache.get(post_id) if post_id is not None else None
+    if entry is None:
+        return
+    # Tombstone the comment in place, no reload needed
+    comments = [dict(c, exists=False) if c["id"] == comment_id else c for c in entry["comments"]]
+    comment_cache.set(post_id, _make_entry(comments))
+
+comment_indexer.subscribe("CommentCreated", _on_comment_created)
+comment_indexer.subscribe("CommentUpdated", _on_comment_updated)
+comment_indexer.subscribe("CommentDeleted", _on_comment_deleted)
+comment_indexer.on_rollback(lambda block: comment_cache.clear())
+
+@comment_indexer.on_seed
+def _on_comment_seed(block):
+    # Deep reorg or contract address change: nothing cached is trustworthy
+    comment_cache.clear()
+    comment_post_ids.clear()
+
+def _comment_from_tuple(c):
+    return {
+        "id": c[0],
+        "postId": c[1],
+        "author": c[2],
+        "content": c[3],
+        "mediaHash": c[4],
+        "timestamp": c[5],
+        "exists": c[6]
+    }
+
+def _make_entry(comments):
+    live = sorted((c for c in comments if c["exists"]), key=lambda c: c["id"])
+    return {"comments": comments, "live": live, "ids": [c["id"] for c in live]}
+
+def _entry_from_result(res):
+    comments = [_comment_from_tuple(c) for c in res]
+    for c in comments:
+        comment_post_ids[c["id"]] = c["postId"]
+    return _make_entry(comments)
+
+async def _load_entries(post_ids):
+    results = await async_batch_call([async_comment_contract.functions.getComments(pid) for pid in post_ids])
+    return {pid: _entry_from_result(res) for pid, res in zip(post_ids, results)}
+
+async def _get_entries(post_ids):
+    comment_indexer.start()
+    return await comment_cache.aget_many_or_load(post_ids, _load_entries)
+
+async def create_comment(post_id: int, content: str, media_hash: str = "", wait: bool = True):
     try:
-        fn = comment_contract.functions.createComment(post_id, content, media_hash)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_comment_contract.functions.createComment(post_id, content, media_hash)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise Exception(f"Error creating comment: {str(e)}")
 
-def update_comment(comment_id: int, content: str, media_hash: str = ""):
+async def update_comment(comment_id: int, content: str, media_hash: str = "", wait: bool = True):
     try:
-        fn = comment_contract.functions.updateComment(comment_id, content, media_hash)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_comment_contract.functions.updateComment(comment_id, content, media_hash)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise Exception(f"Error updating comment: {str(e)}")
 
-def delete_comment(comment_id: int):
+async def delete_comment(comment_id: int, wait: bool = True):
     try:
-        fn = comment_contract.functions.deleteComment(comment_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_comment_contract.functions.deleteComment(comment_id)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise Exception(f"Error deleting comment: {str(e)}")
 
-def get_comments(post_id: int):
+async def get_comments(post_id: int):
     try:
-        res = comment_contract.functions.getComments(post_id).call()
-        comments = []
-        for c in res:
-            comments.append({
-                "id": c[0],
-                "postId": c[1],
-                "author": c[2],
-                "content": c[3],
-                "mediaHash": c[4],
-                "timestamp": c[5],
-                "exists": c[6]
-            })
-        return comments
+        entry = (await _get_entries([post_id]))[post_id]
+        return [dict(c) for c in entry["comments"]]
     except Exception as e:
         raise Exception(f"Error fetching comments: {str(e)}")
+
+async def get_comments_page(post_id: int, cursor: int = None, limit: int = 20):
+    """
+    Existing comments of a post with id > cursor, oldest first.
+    Returns {"comments": [...], "next_cursor": id to pass as cursor, or None at the end}.
+    """
+    try:
+        entry = (await _get_entries([post_id]))[post_id]
+        start = 0 if cursor is None else bisect_right(entry["ids"], cursor)
+        page = entry["live"][start:start + limit]
+        has_more = start + limit < len(entry["live"])
+        return {
+            "comments": [dict(c) for c in page],
+            "next_cursor": page[-1]["id"] if has_more and page else None,
+        }
+    except Exception as e:
+        raise Exception(f"Error fetching comments: {str(e)}")
+
+async def get_comment_counts(post_ids):
+    """
+    Number of existing comments per post; all uncached posts are loaded in one batch.
+    """
+    try:
+        entries = await _get_entries(list(post_ids))
+        return {pid: len(entry["live"]) for pid, entry in entries.items()}
+    except Exception as e:
+        raise Exception(f"Error fetching comment counts: {str(e)}")
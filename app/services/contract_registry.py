@@ -0,0 +1,225 @@
+# app/services/contract_registry.py
+import json
+import logging
+import threading
+from pathlib import Path
+
+from eth_abi.codec import ABICodec
+from eth_utils import function_abi_to_4byte_selector, to_checksum_address
+from eth_utils.abi import abi_to_signature, get_abi_input_types, get_abi_output_types
+from web3._utils.abi import build_strict_registry, map_abi_data
+from web3._utils.normalizers import (
+    BASE_RETURN_NORMALIZERS, abi_address_to_hex, abi_bytes_to_bytes, abi_string_to_text,
+)
+
+logger = logging.getLogger(__name__)
+
+ABI_DIR = Path(__file__).resolve().parents[1] / "abis"
+
+# Same argument normalization web3 applies before encoding a call
+_INPUT_NORMALIZERS = (abi_address_to_hex, abi_bytes_to_bytes, abi_string_to_text)
+
+_codec = ABICodec(build_strict_registry())
+
+
+class FunctionSpec:
+    """
+    Precomputed selector and codecs for one contract function, built once per ABI
+    so batched reads skip web3's per-call ABI lookup.
+    """
+
+    def __init__(self, fn_abi: dict):
+        self.name = fn_abi["name"]
+        self.signature = abi_to_signature(fn_abi)
+        self.selector = function_abi_to_4byte_selector(fn_abi)
+        self.input_types = get_abi_input_types(fn_abi)
+        self.output_types = get_abi_output_types(fn_abi)
+
+    def encode(self, args) -> str:
+        args = map_abi_data(_INPUT_NORMALIZERS, self.input_types, list(args))
+        return "0x" + (self.selector + _codec.encode(self.input_types, args)).hex()
+
+    def decode(self, data: bytes):
+        """
+        Decode eth_call return data exactly like ContractFunction.call() does.
+        """
+        values = _codec.decode(self.output_types, data)
+        values = map_abi_data(BASE_RETURN_NORMALIZERS, self.output_types, values)
+        return values[0] if len(values) == 1 else values
+
+
+class ContractEntry:
+    """
+    One registered contract: address, parsed ABI, function specs and the web3
+    contract objects built from them (one per provider, on demand).
+    """
+
+    def __init__(self, name: str, abi_name: str, address: str, abi: list):
+        self.name = name
+        self.abi_name = abi_name
+        self.address = to_checksum_address(address) if address else None
+        self.abi = abi
+        specs = [FunctionSpec(item) for item in abi if item.get("type") == "function"]
+        names = [spec.name for spec in specs]
+        # Overloaded names are left to web3's argument matching
+        self.functions = {spec.name: spec for spec in specs if names.count(spec.name) == 1}
+        self._contracts = {}  # id(web3) -> contract
+        self._lock = threading.Lock()
+
+    def contract_for(self, web3):
+        contract = self._contracts.get(id(web3))
+        if contract is None:
+            if self.address is None:
+                raise RuntimeError(f"No address configured for contract {self.name}")
+            with self._lock:
+                contract = self._contracts.get(id(web3))
+                if contract is None:
+                    contract = self._contracts[id(web3)] = web3.eth.contract(
+                        address=self.address, abi=self.abi
+                    )
+        return contract
+
+
+class ContractHandle:
+    """
+    Shared, stable reference to a registered contract for one provider.
+
+    Attribute access (`.functions`, `.events`, `.address`, ...) is forwarded to the
+    registry's current web3 contract, so nothing is built until first use and a
+    hot-reloaded address or ABI is picked up without re-importing services.
+    """
+
+    def __init__(self, registry, name: str, web3):
+        self._registry = registry
+        self._name = name
+        self._web3 = web3
+
+    def resolve(self):
+        return self._registry.entry(self._name).contract_for(self._web3)
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+    def __repr__(self):
+        return f"<ContractHandle {self._name}>"
+
+
+class ContractRegistry:
+    """
+    Parses each ABI in `abi_dir` once and hands out shared contract handles by name.
+
+    set_address() swaps in a new entry (re-reading the ABI from disk) and notifies
+    on_change() listeners; existing handles follow the new entry automatically.
+    """
+
+    def __init__(self, abi_dir: Path = ABI_DIR):
+        self.abi_dir = Path(abi_dir)
+        self._abis = {}  # ABI name -> parsed ABI
+        self._entries = {}  # contract name -> ContractEntry
+        self._by_address = {}  # checksum address -> ContractEntry
+        self._handles = {}  # (contract name, id(web3)) -> ContractHandle
+        self._listeners = []
+        self._lock = threading.RLock()
+
+    # -------- ABIs --------
+    def _read_abi(self, abi_name: str) -> list:
+        with open(self.abi_dir / f"{abi_name}.json", "r", encoding="utf-8") as f:
+            abi = json.load(f)
+        # Accept Hardhat/Foundry artifacts as well as bare ABI arrays
+        return abi["abi"] if isinstance(abi, dict) else abi
+
+    def abi(self, abi_name: str) -> list:
+        abi = self._abis.get(abi_name)
+        if abi is None:
+            with self._lock:
+                abi = self._abis.get(abi_name)
+                if abi is None:
+                    abi = self._abis[abi_name] = self._read_abi(abi_name)
+        return abi
+
+    # -------- registration --------
+    def register(self, name: str, address: str, abi_name: str = None) -> ContractEntry:
+        abi_name = abi_name or name
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry.abi_name == abi_name and \
+                    entry.address == (to_checksum_address(address) if address else None):
+                return entry
+            return self._install(ContractEntry(name, abi_name, address, self.abi(abi_name)))
+
+    def _install(self, entry: ContractEntry) -> ContractEntry:
+        previous = self._entries.get(entry.name)
+        if previous is not None and previous.address is not None:
+            self._by_address.pop(previous.address, None)
+        self._entries[entry.name] = entry
+        if entry.address is not None:
+            self._by_address[entry.address] = entry
+        return entry
+
+    def entry(self, name: str) -> ContractEntry:
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Unknown contract: {name}")
+        return entry
+
+    def names(self):
+        return list(self._entries)
+
+    def handle(self, name: str, web3) -> ContractHandle:
+        key = (name, id(web3))
+        handle = self._handles.get(key)
+        if handle is None:
+            with self._lock:
+                handle = self._handles.setdefault(key, ContractHandle(self, name, web3))
+        return handle
+
+    # -------- fast-path lookups --------
+    def function(self, address: str, fn_name: str):
+        """
+        FunctionSpec of `fn_name` on the registered contract at `address`, or None.
+        """
+        entry = self._by_address.get(address)
+        return entry.functions.get(fn_name) if entry is not None else None
+
+    def resolve_all(self, web3_instances) -> int:
+        """
+        Build the web3 contract objects of every registered contract with an address.
+        """
+        count = 0
+        for entry in list(self._entries.values()):
+            if entry.address is None:
+                continue
+            for web3 in web3_instances:
+                entry.contract_for(web3)
+            count += 1
+        return count
+
+    # -------- hot reload --------
+    def on_change(self, listener):
+        """
+        `listener(name, entry)` is called after a contract's address or ABI changes.
+        """
+        self._listeners.append(listener)
+        return listener
+
+    def set_address(self, name: str, address: str) -> bool:
+        """
+        Point `name` at a new address, re-reading its ABI from disk (a redeployed
+        contract may ship a new ABI). Returns False when nothing changed.
+        """
+        with self._lock:
+            current = self.entry(name)
+            new_address = to_checksum_address(address) if address else None
+            if new_address == current.address:
+                return False
+            self._abis[current.abi_name] = self._read_abi(current.abi_name)
+            entry = self._install(
+                ContractEntry(name, current.abi_name, address, self._abis[current.abi_name])
+            )
+        logger.info("Contract %s moved %s -> %s", name, current.address, entry.address)
+        for listener in self._listeners:
+            try:
+                listener(name, entry)
+            except Exception as e:
+                logger.exception("Contract change listener failed: %s", e)
+        return True
@@ -1,99 +1,132 @@
 # app/services/dao_service.py
+import asyncio
 from web3 import Web3
-from app.services.web3_utils import get_contract, build_signed_tx, send_signed_transaction
 from app import config
+from app.services.web3_utils import (
+    contract, async_contract, async_build_signed_tx, async_send_signed_transaction,
+)
+from app.services.tx_tracker import tx_tracker
+from app.services.view_cache import view_cache, cached_view, BLOCK, EVENTS
+from app.services.proposal_index import (
+    ProposalStore, build_proposal_index, fetch_proposals, proposal_from_tuple,
+)
+from app.services.tally_stream import TallyHub
 
-DAO_ADDRESS = config.DAO_ADDRESS
-dao_contract = get_contract(DAO_ADDRESS, "DAO")
+dao_contract = contract("DAO")
+async_dao_contract = async_contract("DAO")
+
+# Local proposal table fed by DAO events; reads fall back to RPC until it is seeded
+proposal_index = build_proposal_index(dao_contract)
+
+# Stored proposal fields and votes only change through DAO transactions
+view_cache.watch_events("DAO", proposal_index.indexer)
+# Pushes live tallies to /dao/{id}/stream viewers off the same log subscription
+tally_hub = TallyHub(proposal_index, queue_size=config.TALLY_STREAM_QUEUE_SIZE)
+
+
+def _indexed_reads() -> bool:
+    if not config.DAO_INDEX_ENABLED:
+        return False
+    proposal_index.start()
+    return proposal_index.ready
+
+
+@cached_view("DAO", EVENTS)
+async def _read_proposal(proposal_id: int):
+    return await async_dao_contract.functions.getProposal(proposal_id).call()
+
+
+@cached_view("DAO", EVENTS)
+async def _read_user_proposals(user_address: str):
+    return await async_dao_contract.functions.getUserProposals(user_address).call()
+
+
+# Which proposals are ongoing depends on the block timestamp
+@cached_view("DAO", BLOCK)
+async def _read_ongoing_proposals_excluding(user_address: str):
+    return await async_dao_contract.functions.getOngoingProposalsExcluding(user_address).call()
+
+
+@cached_view("DAO", EVENTS)
+async def _read_user_vote(proposal_id: int, user_address: str):
+    return await async_dao_contract.functions.getUserVote(proposal_id, user_address).call()
 
 
 # ----------------- PROPOSAL CREATION -----------------
-def create_proposal(description: str, duration: int):
+async def create_proposal(description: str, duration: int, wait: bool = True):
     """
     Creates a new DAO proposal.
     """
     try:
-        fn = dao_contract.functions.createProposal(description, duration)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_dao_contract.functions.createProposal(description, duration)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise e
 
 
 # ----------------- VOTING -----------------
-def vote(proposal_id: int, support: bool):
+async def vote(proposal_id: int, support: bool, wait: bool = True):
     """
     Cast a vote on a proposal.
     support = True -> Yes
     support = False -> No
     """
     try:
-        fn = dao_contract.functions.vote(proposal_id, support)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_dao_contract.functions.vote(proposal_id, support)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise e
 
 
-def execute_proposal(proposal_id: int):
+async def execute_proposal(proposal_id: int, wait: bool = True):
     """
     Executes a proposal after voting period ends.
     """
     try:
-        fn = dao_contract.functions.executeProposal(proposal_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_dao_contract.functions.executeProposal(proposal_id)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise e
 
 
 # ----------------- GET SINGLE PROPOSAL -----------------
-def get_proposal(proposal_id: int):
+async def get_proposal(proposal_id: int):
     """
     Fetches a single proposal by ID and returns a structured object.
     """
     try:
-        p = dao_contract.functions.getProposal(proposal_id).call()
-        return {
-            "id": p[0],
-            "proposer": p[1],
-            "description": p[2],
-            "startTime": p[3],
-            "endTime": p[4],
-            "yesVotes": p[5],
-            "noVotes": p[6],
-            "executed": p[7],
-        }
+        proposal = proposal_index.store.get(proposal_id) if _indexed_reads() else None
+        if proposal is None:
+            proposal = proposal_from_tuple(await _read_proposal(proposal_id))
+        return proposal
     except Exception as e:
         raise e
 
 
 # ----------------- GET USER PROPOSALS -----------------
-def get_user_proposals(user_address: str):
+async def get_user_proposals(user_address: str):
     """
     Fetches all proposals created by a specific user.
     Returns a list of structured objects.
     """
     try:
         user_address = Web3.to_checksum_address(user_address)
-        raw_proposals = dao_contract.functions.getUserProposals(user_address).call()
-
-        proposals = []
-        for p in raw_proposals:
-            proposals.append({
-                "id": p[0],
-                "proposer": p[1],
-                "description": p[2],
-                "startTime": p[3],
-                "endTime": p[4],
-                "yesVotes": p[5],
-                "noVotes": p[6],
-                "executed": p[7],
-            })
-        return proposals
+        if _indexed_reads():
+            return proposal_index.store.by_proposer(user_address)
+        raw_proposals = await _read_user_proposals(user_address)
+        return [proposal_from_tuple(p) for p in raw_proposals]
 
     except Exception as e:
         if "checksum" in str(e):
@@ -102,27 +135,16 @@ def get_user_proposals(user_address: str):
 
 
 # ----------------- GET LIVE PROPOSALS (EXCLUDING USER) -----------------
-def get_live_proposals_excluding(user_address: str):
+async def get_live_proposals_excluding(user_address: str):
     """
     Returns ongoing proposals excluding those created by the given user.
     """
     try:
         user_address = Web3.to_checksum_address(user_address)
-        raw_proposals = dao_contract.functions.getOngoingProposalsExcluding(user_address).call()
-
-        proposals = []
-        for p in raw_proposals:
-            proposals.append({
-                "id": p[0],
-                "proposer": p[1],
-                "description": p[2],
-                "startTime": p[3],
-                "endTime": p[4],
-                "yesVotes": p[5],
-                "noVotes": p[6],
-                "executed": p[7],
-            })
-        return proposals
+        if _indexed_reads():
+            return proposal_index.store.live_excluding(user_address)
+        raw_proposals = await _read_ongoing_proposals_excluding(user_address)
+        return [proposal_from_tuple(p) for p in raw_proposals]
 
     except Exception as e:
         if "checksum" in str(e):
@@ -131,16 +153,67 @@ def get_live_proposals_excluding(user_address: str):
 
 
 # ----------------- GET USER VOTE -----------------
-def get_user_vote(proposal_id: int, user_address: str):
+async def get_user_vote(proposal_id: int, user_address: str):
     """
     Returns the vote of a user for a given proposal.
     0 = no vote, 1 = yes, 2 = no
     """
     try:
         user_address = Web3.to_checksum_address(user_address)
-        vote_type = dao_contract.functions.getUserVote(proposal_id, user_address).call()
+        vote_type = await _read_user_vote(proposal_id, user_address)
         return vote_type
     except Exception as e:
         if "checksum" in str(e):
             raise ValueError("Invalid address format. Please provide a valid checksum address.")
         raise e
+
+
+# ----------------- QUERY PROPOSALS -----------------
+async def query_proposals(proposer: str = None, status: str = None, sort: str = "id",
+                          order: str = "desc", cursor: str = None, limit: int = 20):
+    """
+    Filtered, sorted page of proposals from the local index.
+    Returns {"proposals": [...], "next_cursor": cursor for the next page, or None at the end}.
+    """
+    try:
+        if proposer is not None:
+            proposer = Web3.to_checksum_address(proposer)
+        if _indexed_reads():
+            store = proposal_index.store
+        else:
+            # Until the index is seeded: one batched scan of every proposal
+            store = ProposalStore()
+            store.reset(await asyncio.to_thread(fetch_proposals, dao_contract))
+        proposals, next_cursor = store.query(proposer, status, sort, order == "desc", cursor, limit)
+        return {"proposals": proposals, "next_cursor": next_cursor}
+    except Exception as e:
+        if "checksum" in str(e):
+            raise ValueError("Invalid address format. Please provide a valid checksum address.")
+        raise e
+
+
+# ----------------- LIVE TALLIES -----------------
+async def watch_proposal(proposal_id: int):
+    """
+    Async generator of (event, data) for one proposal: a `snapshot` of the whole
+    proposal, then a `vote` (with the new totals) per Voted log and `executed` at
+    the end; `snapshot` again after a reorg or when this viewer fell too far
+    behind (ending the stream if it shows the proposal executed). Yields None when
+    nothing happened for TALLY_STREAM_HEARTBEAT seconds, so the caller can keep the
+    connection alive.
+    """
+    # Subscribe before the snapshot so no vote falls between the two
+    async with tally_hub.subscribe(proposal_id) as subscription:
+        proposal = await get_proposal(proposal_id)
+        yield "snapshot", proposal
+        if proposal["executed"]:
+            return
+        while True:
+            message = await subscription.get(config.TALLY_STREAM_HEARTBEAT)
+            if message is None:
+                yield None
+                continue
+            yield message["event"], message["data"]
+            if message["event"] == "executed" or \
+                    (message["event"] == "snapshot" and message["data"].get("executed")):
+                return
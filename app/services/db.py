@@ -1,4 +1,6 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, AsyncMongoClient
+from functools import lru_cache
+import asyncio
 import os
 from dotenv import load_dotenv
 
@@ -7,5 +9,32 @@ load_dotenv()
 MONGODB_URI = os.getenv("MONGODB_URI")
 DB_NAME = os.getenv("DB_NAME")
 
-client = MongoClient(MONGODB_URI)
-db = client[DB_NAME]
+# Clients are created on first use: a mongodb+srv URI is resolved over DNS in the
+# constructor, which must not happen at import time.
+@lru_cache(maxsize=None)
+def get_client() -> MongoClient:
+    return MongoClient(MONGODB_URI)
+
+def get_db():
+    return get_client()[DB_NAME]
+
+# Non-blocking client for request handlers
+@lru_cache(maxsize=None)
+def get_async_client() -> AsyncMongoClient:
+    return AsyncMongoClient(MONGODB_URI)
+
+def get_async_db():
+    return get_async_client()[DB_NAME]
+
+async def warm_up():
+    """
+    Create the async client off the event loop (DNS/SRV lookup) and open a connection.
+    """
+    client = await asyncio.to_thread(get_async_client)
+    await client[DB_NAME].command("ping")
+
+async def close():
+    if get_async_client.cache_info().currsize:
+        await get_async_client().close()
+    if get_client.cache_info().currsize:
+        get_client().close()
@@ -0,0 +1,282 @@
+# app/services/event_indexer.py
+import logging
+import threading
+from collections import OrderedDict
+
+from app.services.web3_utils import w3
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+# ----------------- JOURNALED TABLE -----------------
+class JournaledTable:
+    """
+    In-memory key -> row table that records, per block, the previous value of every
+    row it overwrites so that the changes of orphaned blocks can be undone on a reorg.
+    """
+
+    def __init__(self, depth: int = 64):
+        self.depth = depth
+        self._rows = {}
+        self._journal = OrderedDict()  # block number -> [(key, previous row)]
+        self._trimmed = None  # newest block whose undo entries were dropped
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def get(self, key, default=None):
+        return self._rows.get(key, default)
+
+    def keys(self):
+        with self._lock:
+            return list(self._rows.keys())
+
+    def values(self):
+        with self._lock:
+            return list(self._rows.values())
+
+    def _record(self, key, block: int):
+        entries = self._journal.get(block)
+        if entries is None:
+            entries = self._journal[block] = []
+        entries.append((key, self._rows.get(key, _MISSING)))
+        # Blocks older than the reorg depth are final, drop their undo entries
+        while self._journal and next(iter(self._journal)) < block - self.depth:
+            self._trimmed = self._journal.popitem(last=False)[0]
+
+    def put(self, key, row, block: int):
+        with self._lock:
+            self._record(key, block)
+            self._rows[key] = row
+
+    def delete(self, key, block: int):
+        with self._lock:
+            if key not in self._rows:
+                return
+            self._record(key, block)
+            del self._rows[key]
+
+    def can_rollback(self, block: int) -> bool:
+        """
+        True when the journal still covers every block after `block`.
+        """
+        with self._lock:
+            return self._trimmed is None or block >= self._trimmed
+
+    def rollback(self, block: int):
+        """
+        Undo every change recorded for blocks strictly after `block`.
+        """
+        with self._lock:
+            while self._journal:
+                last = next(reversed(self._journal))
+                if last <= block:
+                    break
+                for key, previous in reversed(self._journal.pop(last)):
+                    if previous is _MISSING:
+                        self._rows.pop(key, None)
+                    else:
+                        self._rows[key] = previous
+
+    def reset(self, rows: dict):
+        with self._lock:
+            self._rows = dict(rows)
+            self._journal.clear()
+            self._trimmed = None
+
+
+# ----------------- EVENT INDEXER -----------------
+class EventIndexer:
+    """
+    Follows a contract's logs from a block checkpoint and dispatches decoded events
+    to subscribed handlers, in (blockNumber, logIndex) order.
+
+    - seed handlers build the initial state at a given block (first run / deep reorg)
+    - event handlers receive the decoded EventData of each log
+    - rollback handlers undo every change applied after a given block
+
+    Hashes of recently indexed blocks are kept so a reorg is detected by comparing
+    the checkpoint hash with the canonical chain before every poll.
+    """
+
+    def __init__(self, contract, name: str = None, poll_interval: float = 2.0,
+                 confirmations: int = 0, max_block_range: int = 2000, reorg_depth: int = 64):
+        self.contract = contract
+        self.name = name or contract.address
+        self.poll_interval = poll_interval
+        self.confirmations = confirmations
+        self.max_block_range = max_block_range
+        self.reorg_depth = reorg_depth
+
+        self.checkpoint = None
+        self._address = None  # contract address the checkpoint belongs to
+        self._block_hashes = OrderedDict()  # block number -> block hash
+        self._handlers = {}  # event name -> [handler]
+        self._seed_handlers = []
+        self._rollback_handlers = []
+        self._topics = None  # topic0 -> event name, built on first sync
+
+        self._sync_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------- registration --------
+    def on_seed(self, handler):
+        self._seed_handlers.append(handler)
+        return handler
+
+    def on_rollback(self, handler):
+        self._rollback_handlers.append(handler)
+        return handler
+
+    def subscribe(self, event_name: str, handler):
+        # Topics are computed lazily so registering at import doesn't parse the ABI
+        self._handlers.setdefault(event_name, []).append(handler)
+        self._topics = None
+        return handler
+
+    def _event_topics(self) -> dict:
+        if self._topics is None:
+            self._topics = {
+                getattr(self.contract.events, name)().topic: name for name in self._handlers
+            }
+        return self._topics
+
+    # -------- state --------
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def _remember_block(self, number: int, block_hash):
+        self._block_hashes[number] = bytes(block_hash)
+        self._block_hashes.move_to_end(number)
+        while len(self._block_hashes) > self.reorg_depth:
+            self._block_hashes.popitem(last=False)
+
+    def _seed(self, block: int):
+        for handler in self._seed_handlers:
+            handler(block)
+        self._block_hashes.clear()
+        self._remember_block(block, w3.eth.get_block(block)["hash"])
+        self.checkpoint = block
+        logger.info("%s indexer seeded at block %s", self.name, block)
+
+    # -------- reorg handling --------
+    def _find_common_ancestor(self):
+        for number in reversed(list(self._block_hashes.keys())):
+            if bytes(w3.eth.get_block(number)["hash"]) == self._block_hashes[number]:
+                return number
+        return None
+
+    def _check_reorg(self) -> bool:
+        expected = self._block_hashes.get(self.checkpoint)
+        if expected is None:
+            return False
+        if bytes(w3.eth.get_block(self.checkpoint)["hash"]) == expected:
+            return False
+
+        ancestor = self._find_common_ancestor()
+        if ancestor is None:
+            logger.warning("%s indexer: reorg deeper than %s blocks, reseeding", self.name, self.reorg_depth)
+            self._seed(w3.eth.block_number - self.confirmations)
+            return True
+
+        logger.warning("%s indexer: reorg detected, rolling back %s -> %s", self.name, self.checkpoint, ancestor)
+        for handler in self._rollback_handlers:
+            handler(ancestor)
+        for number in [n for n in self._block_hashes if n > ancestor]:
+            del self._block_hashes[number]
+        self.checkpoint = ancestor
+        return True
+
+    def _check_address(self):
+        # A hot-reloaded contract (new address and possibly ABI) starts over from a fresh seed
+        address = self.contract.address
+        if address != self._address:
+            if self._address is not None:
+                logger.warning("%s indexer: contract moved %s -> %s, reseeding",
+                               self.name, self._address, address)
+                self.checkpoint = None
+                self._block_hashes.clear()
+                self._topics = None
+            self._address = address
+
+    # -------- log processing --------
+    def _fetch_logs(self, from_block: int, to_block: int):
+        return w3.eth.get_logs({
+            "address": self.contract.address,
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "topics": [list(self._event_topics().keys())],
+        })
+
+    def _dispatch(self, log):
+        topic = log["topics"][0]
+        event_name = self._event_topics().get(w3.to_hex(topic))
+        if event_name is None:
+            return
+        event = getattr(self.contract.events, event_name)().process_log(log)
+        for handler in self._handlers[event_name]:
+            handler(event)
+
+    def sync_once(self) -> int:
+        """
+        Process all logs up to the current (confirmed) head.
+        Returns the number of dispatched logs.
+        """
+        with self._sync_lock:
+            self._check_address()
+            head = w3.eth.block_number - self.confirmations
+            if self.checkpoint is None:
+                self._seed(head)
+                self._ready.set()
+                return 0
+
+            self._check_reorg()
+
+            processed = 0
+            while self.checkpoint < head:
+                from_block = self.checkpoint + 1
+                to_block = min(head, from_block + self.max_block_range - 1)
+                logs = sorted(self._fetch_logs(from_block, to_block),
+                              key=lambda l: (l["blockNumber"], l["logIndex"]))
+                for log in logs:
+                    self._dispatch(log)
+                    self._remember_block(log["blockNumber"], log["blockHash"])
+                processed += len(logs)
+                self._remember_block(to_block, w3.eth.get_block(to_block)["hash"])
+                self.checkpoint = to_block
+
+            self._ready.set()
+            return processed
+
+    # -------- background loop --------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                logger.exception("%s indexer poll failed: %s", self.name, e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f"{self.name}-indexer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
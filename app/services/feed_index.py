@@ -0,0 +1,167 @@
+# app/services/feed_index.py
+import threading
+from bisect import bisect_left, insort
+
+from app import config
+from app.services.event_indexer import EventIndexer, JournaledTable
+
+
+def post_from_tuple(res):
+    """
+    Map a Feed.getPost() result tuple to the post dict returned by the API.
+    """
+    return {
+        "id": res[0],
+        "owner": res[1],  # changed from "author" to "owner"
+        "content": res[2],
+        "mediaHash": res[3],
+        "created_at": res[4],  # changed from "timestamp" to "created_at"
+        "likeCount": res[5],
+        "dislikeCount": res[6],
+        "exists": res[7],
+    }
+
+
+class FeedIndex:
+    """
+    Materialized post table kept current from Feed contract events.
+
+    The table is seeded from getLatestPosts() at the indexer's start block, then
+    PostCreated/PostUpdated fetch the post body once, like/dislike events adjust
+    the counters and PostDeleted drops the row. Every change is journaled per block
+    so a reorg rolls the table back before the canonical logs are replayed.
+
+    Live post IDs are also kept in a sorted list, so keyset pages ("posts before
+    ID x") are a bisect plus a slice of the page size.
+    """
+
+    def __init__(self, contract, poll_interval: float = 2.0, confirmations: int = 0):
+        self.contract = contract
+        self.posts = JournaledTable()
+        self._ids = []  # sorted IDs of live posts
+        self._ids_lock = threading.Lock()
+        self.indexer = EventIndexer(contract, name="Feed", poll_interval=poll_interval,
+                                    confirmations=confirmations)
+
+        self.indexer.on_seed(self._seed)
+        self.indexer.on_rollback(self._rollback)
+        self.indexer.subscribe("PostCreated", self._on_post_written)
+        self.indexer.subscribe("PostUpdated", self._on_post_written)
+        self.indexer.subscribe("PostDeleted", self._on_post_deleted)
+        self.indexer.subscribe("PostLiked", lambda e: self._adjust(e, "likeCount", 1))
+        self.indexer.subscribe("LikeRemoved", lambda e: self._adjust(e, "likeCount", -1))
+        self.indexer.subscribe("PostDisliked", lambda e: self._adjust(e, "dislikeCount", 1))
+        self.indexer.subscribe("DislikeRemoved", lambda e: self._adjust(e, "dislikeCount", -1))
+
+    @property
+    def ready(self) -> bool:
+        return self.indexer.ready
+
+    def start(self):
+        self.indexer.start()
+
+    def stop(self):
+        self.indexer.stop()
+
+    # -------- indexer callbacks --------
+    def _seed(self, block: int):
+        total = self.contract.functions.nextPostId().call(block_identifier=block)
+        res = self.contract.functions.getLatestPosts(total).call(block_identifier=block)
+        rows = {}
+        for i in range(len(res[0])):
+            rows[res[0][i]] = {
+                "id": res[0][i],
+                "owner": res[1][i],
+                "content": res[2][i],
+                "mediaHash": res[3][i],
+                "created_at": res[4][i],
+                "likeCount": res[5][i],
+                "dislikeCount": res[6][i],
+                "exists": True,
+            }
+        self.posts.reset(rows)
+        self._reload_ids()
+
+    def _rollback(self, block: int):
+        if not self.posts.can_rollback(block):
+            # Journal no longer covers the fork point, rebuild from the ancestor block
+            self._seed(block)
+            return
+        self.posts.rollback(block)
+        self._reload_ids()
+
+    def _reload_ids(self):
+        ids = sorted(self.posts.keys())
+        with self._ids_lock:
+            self._ids = ids
+
+    def _on_post_written(self, event):
+        post_id = event["args"]["postId"]
+        fresh = post_from_tuple(self.contract.functions.getPost(post_id).call())
+        if not fresh["exists"]:
+            # Already deleted further ahead, the PostDeleted log will follow
+            return
+        current = self.posts.get(post_id)
+        if current is not None:
+            # Counters are event-driven, only take the body from the chain
+            fresh["likeCount"] = current["likeCount"]
+            fresh["dislikeCount"] = current["dislikeCount"]
+        elif event["event"] == "PostCreated":
+            fresh["likeCount"] = 0
+            fresh["dislikeCount"] = 0
+        self.posts.put(post_id, fresh, event["blockNumber"])
+        if current is None:
+            with self._ids_lock:
+                # New IDs are increasing, so this is normally an append
+                insort(self._ids, post_id)
+
+    def _on_post_deleted(self, event):
+        post_id = event["args"]["postId"]
+        if post_id not in self.posts:
+            return
+        self.posts.delete(post_id, event["blockNumber"])
+        with self._ids_lock:
+            i = bisect_left(self._ids, post_id)
+            if i < len(self._ids) and self._ids[i] == post_id:
+                del self._ids[i]
+
+    def _adjust(self, event, field: str, delta: int):
+        post_id = event["args"]["postId"]
+        current = self.posts.get(post_id)
+        if current is None:
+            return
+        row = dict(current)
+        row[field] = max(0, row[field] + delta)
+        self.posts.put(post_id, row, event["blockNumber"])
+
+    # -------- reads --------
+    def get(self, post_id: int):
+        row = self.posts.get(post_id)
+        return dict(row) if row is not None else None
+
+    def page(self, before_id: int = None, limit: int = 20, hidden=()):
+        """
+        Up to `limit` posts with ID < before_id (newest first), and whether older ones exist.
+        IDs in `hidden` are skipped without shortening the page.
+        """
+        with self._ids_lock:
+            end = len(self._ids) if before_id is None else bisect_left(self._ids, before_id)
+            ids = []
+            start = end
+            while start > 0 and len(ids) < limit:
+                start -= 1
+                if self._ids[start] not in hidden:
+                    ids.append(self._ids[start])
+        rows = [self.posts.get(post_id) for post_id in ids]
+        return [dict(r) for r in rows if r is not None], start > 0
+
+    def latest(self, count: int, hidden=()):
+        return self.page(None, count, hidden)[0]
+
+
+def build_feed_index(contract) -> FeedIndex:
+    return FeedIndex(
+        contract,
+        poll_interval=config.INDEXER_POLL_INTERVAL,
+        confirmations=config.INDEXER_CONFIRMATIONS,
+    )
@@ -1,157 +1,266 @@
-from app.services.web3_utils import get_contract, send_signed_transaction, build_signed_tx
+import asyncio
+
+from app.services.web3_utils import (
+    contract, async_contract, async_build_signed_tx, async_send_signed_transaction, async_batch_call,
+)
+from app.services.tx_tracker import tx_tracker
+from app.services.reaction_batcher import ReactionBatcher
+from app.services.feed_index import build_feed_index, post_from_tuple
+from app.services.hidden_content import HiddenContent
+from app.services.moderation_service import moderation_index
 from app import config
 from web3 import Web3
 
-FEED_ADDRESS = config.FEED_ADDRESS
-feed_contract = get_contract(FEED_ADDRESS, "Feed")
+class PostRemoved(LookupError):
+    """Raised for a post that was deleted or removed by a moderator."""
+
+
+feed_contract = contract("Feed")
+async_feed_contract = async_contract("Feed")
+
+# Local post table fed by Feed events; reads fall back to RPC until it is seeded
+feed_index = build_feed_index(feed_contract)
+
+# Deleted and moderator-removed post IDs, filtered out of every read
+hidden_content = HiddenContent(feed_index, moderation_index,
+                               snapshot_interval=config.HIDDEN_SNAPSHOT_INTERVAL,
+                               deploy_block=config.MODERATION_DEPLOY_BLOCK)
+
+
+async def _require_hidden_content():
+    # Removed posts are only all known once the FlagResolved replay has run
+    hidden_content.start()
+    if hidden_content.ready:
+        return
+    if not await asyncio.to_thread(hidden_content.wait_ready, config.HIDDEN_READY_TIMEOUT):
+        raise RuntimeError("Moderation state is still syncing, try again shortly")
+
+
+def _indexed_reads() -> bool:
+    if not config.FEED_INDEX_ENABLED:
+        return False
+    feed_index.start()
+    return feed_index.ready
 
 
 # Create Post
-def create_post(content: str, media_hash: str = ""):
+async def create_post(content: str, media_hash: str = "", wait: bool = True):
     try:
-        fn = feed_contract.functions.createPost(content, media_hash)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_feed_contract.functions.createPost(content, media_hash)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
     except Exception as e:
         raise Exception(f"Error creating post: {str(e)}")
 
 
 # Update Post
-def update_post(post_id: int, content: str, media_hash: str = ""):
+async def update_post(post_id: int, content: str, media_hash: str = "", wait: bool = True):
     try:
-        fn = feed_contract.functions.updatePost(post_id, content, media_hash)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_feed_contract.functions.updatePost(post_id, content, media_hash)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
     except Exception as e:
         raise Exception(f"Error updating post: {str(e)}")
 
 
 # Delete Post
-def delete_post(post_id: int):
+async def delete_post(post_id: int, wait: bool = True):
     try:
-        fn = feed_contract.functions.deletePost(post_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_feed_contract.functions.deletePost(post_id)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
     except Exception as e:
         raise Exception(f"Error deleting post: {str(e)}")
 
 
+# ----------------- REACTIONS -----------------
+async def _build_reaction_tx(action: str, post_id: int):
+    return await async_build_signed_tx(getattr(async_feed_contract.functions, action)(post_id))
+
+
+# Reactions are coalesced over a short window and only net changes are sent
+reaction_batcher = ReactionBatcher(_build_reaction_tx, window=config.REACTION_BATCH_WINDOW)
+
+
+async def _react(action: str, post_id: int, wait: bool):
+    if config.REACTION_BATCHING_ENABLED:
+        return await reaction_batcher.submit(post_id, action, wait)
+    signed = await _build_reaction_tx(action, post_id)
+    if not wait:
+        return await tx_tracker.submit(signed)
+    receipt = await async_send_signed_transaction(signed)
+    return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
+
+
 # Like Post
-def like_post(post_id: int):
+async def like_post(post_id: int, wait: bool = True):
     try:
-        fn = feed_contract.functions.likePost(post_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
-        return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
+        return await _react("likePost", post_id, wait)
     except Exception as e:
         raise Exception(f"Error liking post: {str(e)}")
 
 
 # Remove Like
-def remove_like(post_id: int):
+async def remove_like(post_id: int, wait: bool = True):
     try:
-        fn = feed_contract.functions.removeLike(post_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
-        return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
+        return await _react("removeLike", post_id, wait)
     except Exception as e:
         raise Exception(f"Error removing like: {str(e)}")
 
 
 # Dislike Post
-def dislike_post(post_id: int):
+async def dislike_post(post_id: int, wait: bool = True):
     try:
-        fn = feed_contract.functions.dislikePost(post_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
-        return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
+        return await _react("dislikePost", post_id, wait)
     except Exception as e:
         raise Exception(f"Error disliking post: {str(e)}")
 
 
 # Remove Dislike
-def remove_dislike(post_id: int):
+async def remove_dislike(post_id: int, wait: bool = True):
     try:
-        fn = feed_contract.functions.removeDislike(post_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
-        return dict(txHash=receipt.transactionHash.hex(), status=receipt.status)
+        return await _react("removeDislike", post_id, wait)
     except Exception as e:
         raise Exception(f"Error removing dislike: {str(e)}")
 
 
+def _user_reaction_calls(post_ids, user_address: str):
+    """
+    likedBy/dislikedBy calls for every post, laid out as [liked..., disliked...].
+    """
+    return (
+        [async_feed_contract.functions.likedBy(pid, user_address) for pid in post_ids]
+        + [async_feed_contract.functions.dislikedBy(pid, user_address) for pid in post_ids]
+    )
+
+
 # Get a single post
-def get_post(post_id: int, user_address: str = None):
+async def get_post(post_id: int, user_address: str = None):
     try:
-        res = feed_contract.functions.getPost(post_id).call()
-        post = {
-            "id": res[0],
-            "owner": res[1],  # changed from "author" to "owner"
-            "content": res[2],
-            "mediaHash": res[3],
-            "created_at": res[4],  # changed from "timestamp" to "created_at"
-            "likeCount": res[5],
-            "dislikeCount": res[6],
-            "exists": res[7]
-        }
+        await _require_hidden_content()
+        post = feed_index.get(post_id) if _indexed_reads() else None
+        if post_id in hidden_content:
+            raise PostRemoved(f"Post {post_id} has been removed")
 
         if user_address:
             user_address = Web3.to_checksum_address(user_address)
-            liked = feed_contract.functions.likedBy(post_id, user_address).call()
-            disliked = feed_contract.functions.dislikedBy(post_id, user_address).call()
-            post["likedByUser"] = liked
-            post["dislikedByUser"] = disliked
+            calls = _user_reaction_calls([post_id], user_address)
+            if post is None:
+                calls.append(async_feed_contract.functions.getPost(post_id))
+            # Post body (if needed) and both flags in one round-trip
+            results = await async_batch_call(calls)
+            if post is None:
+                post = post_from_tuple(results[2])
+            post["likedByUser"] = results[0]
+            post["dislikedByUser"] = results[1]
         else:
+            if post is None:
+                post = post_from_tuple(await async_feed_contract.functions.getPost(post_id).call())
             post["likedByUser"] = False
             post["dislikedByUser"] = False
 
         return post
+    except PostRemoved:
+        raise
     except Exception as e:
         raise Exception(f"Error fetching post {post_id}: {str(e)}")
 
 
+def get_indexed_owner(post_id: int):
+    """
+    Owner of a post from the local index (no RPC), or None if it isn't indexed yet.
+    """
+    if not _indexed_reads():
+        return None
+    post = feed_index.get(post_id)
+    return post["owner"] if post else None
+
+
+async def _attach_user_flags(posts, user_address: str = None):
+    """
+    Set likedByUser/dislikedByUser on each post, fetching all flags in one batch.
+    """
+    if user_address and posts:
+        user_address = Web3.to_checksum_address(user_address)
+        post_ids = [post["id"] for post in posts]
+        flags = await async_batch_call(_user_reaction_calls(post_ids, user_address))
+        for i, post in enumerate(posts):
+            post["likedByUser"] = flags[i]
+            post["dislikedByUser"] = flags[len(post_ids) + i]
+    else:
+        for post in posts:
+            post["likedByUser"] = False
+            post["dislikedByUser"] = False
+    return posts
+
+
+def _posts_from_columns(res):
+    """
+    Post dicts from Feed.getLatestPosts() column arrays.
+    """
+    return [
+        {
+            "id": res[0][i],
+            "owner": res[1][i],  # changed from "author" to "owner"
+            "content": res[2][i],
+            "mediaHash": res[3][i],
+            "created_at": res[4][i],  # changed from "timestamp" to "created_at"
+            "likeCount": res[5][i],
+            "dislikeCount": res[6][i],
+        }
+        for i in range(len(res[0]))
+    ]
+
+
 # Get latest N posts
-def get_latest_posts(count: int = 10, user_address: str = None):
+async def get_latest_posts(count: int = 10, user_address: str = None):
     try:
-        res = feed_contract.functions.getLatestPosts(count).call()
-        posts = []
+        await _require_hidden_content()
+        if _indexed_reads():
+            posts = feed_index.latest(count, hidden_content)
+            for post in posts:
+                post.pop("exists", None)
+        else:
+            res = await async_feed_contract.functions.getLatestPosts(count).call()
+            posts = hidden_content.filter(_posts_from_columns(res))
+        return await _attach_user_flags(posts, user_address)
+    except Exception as e:
+        raise Exception(f"Error fetching latest posts: {str(e)}")
 
-        if user_address:
-            user_address = Web3.to_checksum_address(user_address)
 
-        post_ids = res[0]
-        authors = res[1]
-        contents = res[2]
-        mediaHashes = res[3]
-        timestamps = res[4]
-        likeCounts = res[5]
-        dislikeCounts = res[6]
+# Get a page of posts older than a cursor
+async def get_posts_page(before_id: int = None, limit: int = 20, user_address: str = None):
+    """
+    Keyset pagination: up to `limit` posts with id < before_id, newest first.
+    Returns {"posts": [...], "next_cursor": id to pass as before_id, or None at the end}.
+    """
+    try:
+        await _require_hidden_content()
+        if _indexed_reads():
+            posts, has_more = feed_index.page(before_id, limit, hidden_content)
+            for post in posts:
+                post.pop("exists", None)
+        else:
+            # Until the index is seeded: fetch enough of the newest posts to cover the page
+            next_id = await async_feed_contract.functions.nextPostId().call()
+            if before_id is None:
+                before_id = next_id
+            count = max(0, next_id - before_id) + limit + 1
+            res = await async_feed_contract.functions.getLatestPosts(count).call()
+            older = [p for p in hidden_content.filter(_posts_from_columns(res)) if p["id"] < before_id]
+            posts, has_more = older[:limit], len(older) > limit
 
-        liked_status = []
-        disliked_status = []
-        if user_address:
-            for pid in post_ids:
-                liked_status.append(feed_contract.functions.likedBy(pid, user_address).call())
-                disliked_status.append(feed_contract.functions.dislikedBy(pid, user_address).call())
-
-        for i in range(len(post_ids)):
-            post = {
-                "id": post_ids[i],
-                "owner": authors[i],  # changed from "author" to "owner"
-                "content": contents[i],
-                "mediaHash": mediaHashes[i],
-                "created_at": timestamps[i],  # changed from "timestamp" to "created_at"
-                "likeCount": likeCounts[i],
-                "dislikeCount": dislikeCounts[i],
-                "likedByUser": liked_status[i] if user_address else False,
-                "dislikedByUser": disliked_status[i] if user_address else False
-            }
-            posts.append(post)
-
-        return posts
+        await _attach_user_flags(posts, user_address)
+        next_cursor = posts[-1]["id"] if has_more and posts else None
+        return {"posts": posts, "next_cursor": next_cursor}
     except Exception as e:
-        raise Exception(f"Error fetching latest posts: {str(e)}")
-        raise Exception(f"Error fetching latest posts: {str(e)}")
+        raise Exception(f"Error fetching posts page: {str(e)}")
@@ -0,0 +1,272 @@
+# app/services/hidden_content.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from bson import Binary
+
+from app.services.db import get_db
+from app.services.web3_utils import w3
+
+logger = logging.getLogger(__name__)
+
+
+class HiddenSet:
+    """
+    Set of small non-negative integer IDs as a bitset: one bit per ID up to the
+    highest one added, O(1) membership with no hashing or false positives.
+
+    Additions are journaled per block (only IDs that weren't already set), so a
+    reorg can take back exactly what the orphaned blocks hid.
+    """
+
+    def __init__(self, depth: int = 64):
+        self.depth = depth
+        self._bits = bytearray()
+        self._count = 0
+        self._journal = OrderedDict()  # block number -> [ID]
+        self._trimmed = None  # newest block whose undo entries were dropped
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, content_id) -> bool:
+        # Lock-free: a single byte read
+        byte = content_id >> 3
+        return 0 <= byte < len(self._bits) and bool(self._bits[byte] >> (content_id & 7) & 1)
+
+    def _set_locked(self, content_id: int) -> bool:
+        byte = content_id >> 3
+        if byte >= len(self._bits):
+            # Grow geometrically; IDs are sequential so this is rare
+            self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+        mask = 1 << (content_id & 7)
+        if self._bits[byte] & mask:
+            return False
+        self._bits[byte] |= mask
+        self._count += 1
+        return True
+
+    def _clear_locked(self, content_id: int):
+        byte = content_id >> 3
+        mask = 1 << (content_id & 7)
+        if byte < len(self._bits) and self._bits[byte] & mask:
+            self._bits[byte] &= ~mask
+            self._count -= 1
+
+    def add(self, content_id: int, block: int = None):
+        with self._lock:
+            if self._set_locked(content_id) and block is not None:
+                self._journal.setdefault(block, []).append(content_id)
+                # Blocks older than the reorg depth are final, drop their undo entries
+                while self._journal and next(iter(self._journal)) < block - self.depth:
+                    self._trimmed = self._journal.popitem(last=False)[0]
+
+    def can_rollback(self, block: int) -> bool:
+        """
+        Whether every addition after `block` is still journaled.
+        """
+        with self._lock:
+            return self._trimmed is None or block >= self._trimmed
+
+    def rollback(self, block: int):
+        """
+        Un-hide every ID added in blocks strictly after `block`.
+        """
+        with self._lock:
+            while self._journal:
+                last = next(reversed(self._journal))
+                if last <= block:
+                    break
+                for content_id in self._journal.pop(last):
+                    self._clear_locked(content_id)
+
+    def reset(self, content_ids):
+        with self._lock:
+            self._bits, self._count = bytearray(), 0
+            self._journal.clear()
+            self._trimmed = None
+            for content_id in content_ids:
+                self._set_locked(content_id)
+
+    def to_bytes(self) -> bytes:
+        with self._lock:
+            return bytes(self._bits)
+
+    def merge_bytes(self, data: bytes):
+        """
+        Add every ID set in a to_bytes() snapshot.
+        """
+        with self._lock:
+            if len(data) > len(self._bits):
+                self._bits.extend(bytes(len(data) - len(self._bits)))
+            for byte, value in enumerate(data):
+                if value:
+                    self._bits[byte] |= value
+            self._count = sum(bin(b).count("1") for b in self._bits if b)
+
+
+class HiddenContent:
+    """
+    Post IDs that must never be served: deleted through Feed.deletePost or removed
+    by a moderator (FlagResolved with removed=true). Kept current from the Feed and
+    Moderation indexers' logs, one HiddenSet per source so each indexer's reorgs
+    only undo its own additions.
+
+    Deleted posts are exact after every Feed seed (IDs below nextPostId that
+    getLatestPosts no longer returns). Removals can't be recovered from contract
+    state, only from FlagResolved logs: every Moderation seed replays the logs not
+    yet applied (from `deploy_block` on a fresh start, otherwise from the block the
+    Mongo snapshot covers) before the indexer reports ready. The snapshot is
+    written on every removal (they're rare), and otherwise at most every
+    `snapshot_interval` seconds after a change, and restored at startup.
+    """
+
+    SOURCES = ("deleted", "removed")
+
+    def __init__(self, feed_index, moderation_index, snapshot_interval: float = 60,
+                 collection: str = "hidden_content", deploy_block: int = 0, log_range: int = 2000):
+        self.feed_index = feed_index
+        self.moderation_index = moderation_index
+        self.snapshot_interval = snapshot_interval
+        self.collection = collection
+        self.deploy_block = deploy_block
+        self.log_range = log_range
+        self.sets = {source: HiddenSet() for source in self.SOURCES}
+        self._removed_through = None  # last block whose FlagResolved logs are applied
+        self._dirty = False
+        self._snapshot_at = time.monotonic()
+        self._snapshot_lock = threading.Lock()
+
+        feed = feed_index.indexer
+        # Registered after the feed index's own seed handler, so its rows are loaded
+        feed.on_seed(self._seed_deleted)
+        feed.on_rollback(self._rollback_deleted)
+        feed.subscribe("PostDeleted", self._on_post_deleted)
+
+        moderation = moderation_index.indexer
+        moderation.on_seed(self._seed_removed)
+        moderation.on_rollback(lambda block: self.sets["removed"].rollback(block))
+        moderation.subscribe("FlagResolved", self._on_flag_resolved)
+
+    def __contains__(self, content_id) -> bool:
+        return any(content_id in hidden for hidden in self.sets.values())
+
+    @property
+    def ready(self) -> bool:
+        # Removals are complete once the Moderation seed has replayed its logs
+        return self.moderation_index.ready
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self.moderation_index.indexer.wait_ready(timeout)
+
+    def start(self):
+        # The feed index is started by feed reads (when enabled); with it off,
+        # getLatestPosts already leaves deleted posts out
+        self.moderation_index.start()
+
+    def filter(self, posts):
+        """
+        `posts` without the hidden ones.
+        """
+        return [post for post in posts if post["id"] not in self]
+
+    def stats(self) -> dict:
+        return {source: len(hidden) for source, hidden in self.sets.items()}
+
+    # -------- indexer callbacks --------
+    def _seed_deleted(self, block: int):
+        total = self.feed_index.contract.functions.nextPostId().call(block_identifier=block)
+        live = self.feed_index.posts
+        self.sets["deleted"].reset(i for i in range(total) if i not in live)
+        self._changed()
+
+    def _rollback_deleted(self, block: int):
+        if not self.sets["deleted"].can_rollback(block):
+            self._seed_deleted(block)
+            return
+        self.sets["deleted"].rollback(block)
+
+    def _on_post_deleted(self, event):
+        self.sets["deleted"].add(event["args"]["postId"], event["blockNumber"])
+        self._changed()
+
+    def _removed_block(self):
+        checkpoint = self.moderation_index.indexer.checkpoint
+        return checkpoint if checkpoint is not None else self._removed_through
+
+    def _seed_removed(self, block: int):
+        """
+        Replay FlagResolved logs from the last applied block (or the deployment
+        block) up to the seed block, in `log_range` chunks.
+        """
+        start = self._removed_block()
+        start = self.deploy_block if start is None else start + 1
+        contract = self.moderation_index.contract
+        event = contract.events.FlagResolved()
+        for from_block in range(start, block + 1, self.log_range):
+            to_block = min(block, from_block + self.log_range - 1)
+            logs = w3.eth.get_logs({"address": contract.address, "fromBlock": from_block,
+                                    "toBlock": to_block, "topics": [event.topic]})
+            for log in sorted(logs, key=lambda l: (l["blockNumber"], l["logIndex"])):
+                self._on_resolved_log(event.process_log(log))
+            self._removed_through = to_block
+            self._changed()
+        if start <= block:
+            logger.info("Hidden content: replayed FlagResolved logs %s-%s", start, block)
+        self._removed_through = block
+        self._changed(force=True)
+
+    def _on_resolved_log(self, event):
+        if event["args"]["removed"]:
+            self.sets["removed"].add(event["args"]["contentId"], event["blockNumber"])
+
+    def _on_flag_resolved(self, event):
+        if event["args"]["removed"]:
+            self._on_resolved_log(event)
+            # Only recoverable by replaying logs, so persisted right away
+            self._changed(force=True)
+
+    # -------- snapshot / restore --------
+    def _changed(self, force: bool = False):
+        self._dirty = True
+        if force or time.monotonic() - self._snapshot_at >= self.snapshot_interval:
+            try:
+                self.snapshot()
+            except Exception as e:
+                logger.warning("Hidden content snapshot failed: %s", e)
+
+    def snapshot(self):
+        """
+        Write both sets to Mongo (one document per source). Blocking.
+        """
+        with self._snapshot_lock:
+            if not self._dirty:
+                return
+            self._dirty = False
+            self._snapshot_at = time.monotonic()
+            coll = get_db()[self.collection]
+            # Read before the bits, so the block never claims more than they hold
+            removed_block = self._removed_block()
+            try:
+                for source, hidden in self.sets.items():
+                    doc = {"_id": source, "bits": Binary(hidden.to_bytes())}
+                    if source == "removed":
+                        doc["block"] = removed_block
+                    coll.replace_one({"_id": source}, doc, upsert=True)
+            except Exception:
+                self._dirty = True
+                raise
+
+    def restore(self):
+        """
+        Merge the last snapshot into the sets. Blocking; call before serving.
+        """
+        for doc in get_db()[self.collection].find({"_id": {"$in": list(self.SOURCES)}}):
+            self.sets[doc["_id"]].merge_bytes(bytes(doc["bits"]))
+            if doc["_id"] == "removed" and doc.get("block") is not None and self._removed_through is None:
+                # Logs up to this block are in the bits; the seed replays the rest
+                self._removed_through = doc["block"]
+        logger.info("Hidden content restored: %s", self.stats())
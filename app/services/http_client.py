@@ -0,0 +1,228 @@
+# app/services/http_client.py
+import asyncio
+import json
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+from app import config
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth another attempt; anything else is returned/raised as-is
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(Exception):
+    """Raised without contacting the upstream while its circuit is open."""
+
+
+class UpstreamHTTPError(Exception):
+    def __init__(self, upstream: str, status: int, body: str):
+        super().__init__(f"{upstream} returned HTTP {status}: {body[:500]}")
+        self.upstream = upstream
+        self.status = status
+        self.body = body
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `failure_threshold` failed attempts in a row the circuit opens and calls
+    fail fast for `reset_timeout` seconds. Then a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None  # when the half-open trial call was let through
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        # A trial that never reported back (e.g. cancelled) doesn't block forever
+        if state == "half-open" and (
+            self._trial_at is None or time.monotonic() - self._trial_at >= self.reset_timeout
+        ):
+            self._trial_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+        self._trial_at = None
+
+    def record_neutral(self):
+        # The upstream answered, but the outcome says nothing about its health
+        # (e.g. a 404); only frees the half-open trial slot
+        self._trial_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._trial_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                logger.warning("Circuit opened after %s failures", self._failures)
+            self._opened_at = time.monotonic()
+        self._trial_at = None
+
+
+class Upstream:
+    """
+    Per-upstream policy: timeouts, retry budget and circuit breaker.
+    """
+
+    def __init__(self, name: str, timeout: float, connect_timeout: float = 10,
+                 retries: int = 2, backoff: float = 0.5, max_backoff: float = 8,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        # Streams may legitimately run long; bound the gap between chunks instead
+        self.stream_timeout = aiohttp.ClientTimeout(
+            total=None, connect=connect_timeout, sock_read=timeout
+        )
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def delay(self, attempt: int) -> float:
+        # Full jitter, so clients retrying together spread out
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+class HttpResponse:
+    def __init__(self, status: int, body: bytes, headers):
+        self.status = status
+        self.body = body
+        self.headers = headers
+
+    @property
+    def text(self) -> str:
+        return self.body.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class HttpClient:
+    """
+    Shared outbound HTTP client: one keep-alive connection pool for all upstreams.
+
+    Connection errors, timeouts and RETRY_STATUSES are retried with jittered
+    exponential backoff and counted against the upstream's circuit breaker; while
+    the circuit is open calls raise CircuitOpenError immediately. Other non-2xx
+    responses raise UpstreamHTTPError without a retry; they don't count as a
+    success for the breaker, only 2xx/3xx do.
+    """
+
+    def __init__(self, pool_size: int = 100, keepalive_timeout: float = 30):
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size, keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    @asynccontextmanager
+    async def _attempts(self, upstream: Upstream, method: str, url: str, timeout, **kwargs):
+        """
+        Yield the first response worth handing to the caller, retrying per policy.
+        """
+        attempt = 0
+        while True:
+            if not upstream.breaker.allow():
+                raise CircuitOpenError(f"{upstream.name} circuit is open")
+            try:
+                response = await self._get_session().request(method, url, timeout=timeout, **kwargs)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                upstream.breaker.record_failure()
+                if attempt >= upstream.retries:
+                    raise
+                logger.warning("%s %s failed (%s), retrying", upstream.name, method, e)
+            else:
+                if response.status not in RETRY_STATUSES:
+                    if response.status < 400:
+                        upstream.breaker.record_success()
+                    else:
+                        # Neither proof of health nor of an outage: a run of 401s
+                        # mustn't reset the failures counted from 5xx responses
+                        upstream.breaker.record_neutral()
+                    try:
+                        if response.status >= 400:
+                            body = await response.text(errors="replace")
+                            raise UpstreamHTTPError(upstream.name, response.status, body)
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                upstream.breaker.record_failure()
+                if attempt >= upstream.retries:
+                    body = await response.text(errors="replace")
+                    response.release()
+                    raise UpstreamHTTPError(upstream.name, response.status, body)
+                response.release()
+                logger.warning("%s %s returned %s, retrying", upstream.name, method, response.status)
+            await asyncio.sleep(upstream.delay(attempt))
+            attempt += 1
+
+    async def request(self, upstream: Upstream, method: str, url: str, **kwargs) -> HttpResponse:
+        """
+        Send a request and read the whole body; raises UpstreamHTTPError on non-2xx.
+        """
+        async with self._attempts(upstream, method, url, upstream.timeout, **kwargs) as response:
+            body = await response.read()
+            return HttpResponse(response.status, body, response.headers)
+
+    def stream(self, upstream: Upstream, method: str, url: str, **kwargs):
+        """
+        Async context manager yielding the raw aiohttp response for incremental reads.
+        Only the request itself is retried; once the body is being read, errors propagate.
+        """
+        return self._attempts(upstream, method, url, upstream.stream_timeout, **kwargs)
+
+
+http_client = HttpClient(pool_size=config.HTTP_POOL_SIZE)
+
+openrouter = Upstream(
+    "openrouter",
+    timeout=config.OPENROUTER_TIMEOUT,
+    retries=config.HTTP_MAX_RETRIES,
+    backoff=config.HTTP_RETRY_BACKOFF,
+    failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+)
+pinata = Upstream(
+    "pinata",
+    timeout=config.PINATA_TIMEOUT,
+    retries=config.HTTP_MAX_RETRIES,
+    backoff=config.HTTP_RETRY_BACKOFF,
+    failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+    reset_timeout=config.CIRCUIT_RESET_TIMEOUT,
+)
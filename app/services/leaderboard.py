@@ -0,0 +1,236 @@
+# app/services/leaderboard.py
+import random
+import threading
+
+
+class _End:
+    """
+    Sentinel key past every real key, terminating each skip list level.
+    """
+
+    def __lt__(self, other):
+        return False
+
+    def __le__(self, other):
+        return other is self
+
+    def __gt__(self, other):
+        return other is not self
+
+    def __ge__(self, other):
+        return True
+
+
+_END = _End()
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, next_, width):
+        self.key = key
+        self.next = next_
+        self.width = width  # bottom-level steps to next[level]
+
+
+class RankedSet:
+    """
+    Indexable skip list: sorted distinct keys with O(log n) insert, remove, rank
+    and positional access, so a page costs O(log n + page size) at any size.
+    """
+
+    MAX_LEVELS = 32
+
+    def __init__(self):
+        self._size = 0
+        self._top = 1  # levels in use; above it the head links straight to the end
+        end = _Node(_END, [], [])
+        self._head = _Node(None, [end] * self.MAX_LEVELS, [1] * self.MAX_LEVELS)
+
+    def __len__(self):
+        return self._size
+
+    def _level(self) -> int:
+        level = 1
+        while level < self.MAX_LEVELS and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key):
+        chain = [self._head] * self.MAX_LEVELS
+        steps_at = [0] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self._top)):
+            while node.next[level].key <= key:
+                steps_at[level] += node.width[level]
+                node = node.next[level]
+            chain[level] = node
+        if node is not self._head and node.key == key:
+            return
+        depth = self._level()
+        self._top = max(self._top, depth)
+        new = _Node(key, [None] * depth, [None] * depth)
+        steps = 0
+        for level in range(depth):
+            prev = chain[level]
+            new.next[level] = prev.next[level]
+            prev.next[level] = new
+            new.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at[level]
+        for level in range(depth, self.MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> bool:
+        chain = [self._head] * self.MAX_LEVELS
+        node = self._head
+        for level in reversed(range(self._top)):
+            while node.next[level].key < key:
+                node = node.next[level]
+            chain[level] = node
+        target = chain[0].next[0]
+        if target.key is _END or target.key != key:
+            return False
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), self.MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+        return True
+
+    def count_below(self, key) -> int:
+        """
+        Number of keys < `key` (the 0-based rank of `key` when present).
+        """
+        position = 0
+        node = self._head
+        for level in reversed(range(self._top)):
+            while node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+        return position
+
+    def slice(self, start: int, count: int):
+        if start >= self._size or count <= 0:
+            return []
+        node = self._head
+        remaining = start + 1
+        for level in reversed(range(self._top)):
+            while node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+        keys = []
+        while node.key is not _END and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+class StreakLeaderboard:
+    """
+    Users with a live streak, ordered by streak (longest first, then address).
+
+    Fed by the streak projection: each completion or seed re-inserts the user in
+    O(log n). Entries hold the streak and the day its run ended, so they don't need
+    the projection to keep tracking the user: a run ending on day d breaks once the
+    day reaches d + 2, users are bucketed by that expiry day, and a day rollover
+    only touches the users whose streak is due to break. Tied users share a rank
+    (1 + users ahead).
+    """
+
+    def __init__(self):
+        self.today = None
+        self._ranked = RankedSet()
+        self._entries = {}  # address -> (key, expiry day)
+        self._expiring = {}  # expiry day -> set of addresses
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def _drop_locked(self, address: str):
+        entry = self._entries.pop(address, None)
+        if entry is None:
+            return
+        key, expires = entry
+        self._ranked.remove(key)
+        bucket = self._expiring.get(expires)
+        if bucket is not None:
+            bucket.discard(address)
+            if not bucket:
+                del self._expiring[expires]
+
+    def update(self, address: str, state):
+        """
+        Re-rank `address` from its StreakState. None (the projection evicted the
+        user) is ignored: the entry stays until its run expires.
+        """
+        if state is None:
+            return
+        with self._lock:
+            self._drop_locked(address)
+            if not state.bits & 1 or not state.run:
+                return
+            expires = state.last_day + 2
+            if self.today is not None and self.today >= expires:
+                return
+            key = (-state.run, address)
+            self._ranked.insert(key)
+            self._entries[address] = (key, expires)
+            self._expiring.setdefault(expires, set()).add(address)
+
+    def expiring(self, today: int):
+        """
+        Addresses whose streak breaks by `today` unless they completed since.
+        """
+        with self._lock:
+            return [a for day, bucket in self._expiring.items() if day <= today for a in bucket]
+
+    def rollover(self, today: int, chunk: int = 1000):
+        with self._lock:
+            previous, self.today = self.today, today
+            if previous is None or today <= previous:
+                # First day seen: expire everything already due
+                due = [day for day in self._expiring if day <= today]
+            else:
+                due = [day for day in range(previous + 1, today + 1) if day in self._expiring]
+            addresses = [a for day in due for a in self._expiring.get(day, ())]
+        # In chunks, so reads aren't held up while many streaks break at midnight
+        for start in range(0, len(addresses), chunk):
+            with self._lock:
+                for address in addresses[start:start + chunk]:
+                    entry = self._entries.get(address)
+                    # Skip users that completed a task since the list was taken
+                    if entry is not None and entry[1] <= today:
+                        self._drop_locked(address)
+
+    def page(self, offset: int = 0, limit: int = 50):
+        with self._lock:
+            keys = self._ranked.slice(offset, limit)
+            rows = []
+            for i, key in enumerate(keys):
+                if i and key[0] == keys[i - 1][0]:
+                    rank = rows[-1]["rank"]
+                elif i:
+                    # Everyone before this row on the page has a longer streak
+                    rank = offset + i + 1
+                else:
+                    rank = self._ranked.count_below((key[0], "")) + 1
+                rows.append({"rank": rank, "address": key[1], "streak": -key[0]})
+            return rows
+
+    def rank(self, address: str):
+        """
+        {"rank", "streak"} of `address`, or None when it has no live streak.
+        """
+        with self._lock:
+            entry = self._entries.get(address)
+            return self._row_locked(entry[0]) if entry is not None else None
+
+    def _row_locked(self, key):
+        streak, address = -key[0], key[1]
+        # Everyone with a strictly longer streak is ahead
+        return {"rank": self._ranked.count_below((key[0], "")) + 1, "address": address, "streak": streak}
@@ -0,0 +1,161 @@
+# app/services/learning_catalogue.py
+import logging
+import threading
+
+from app import config
+from app.services.event_indexer import EventIndexer
+from app.services.web3_utils import batch_call
+
+logger = logging.getLogger(__name__)
+
+
+def topic_from_tuple(res):
+    """
+    Map a Learning.getTopic() result (or one getAllTopics() column row) to the API dict.
+    """
+    return {"id": res[0], "title": res[1], "description": res[2], "totalModules": res[3]}
+
+
+def modules_from_columns(topic_id: int, res):
+    """
+    Live module dicts from Learning.getModulesByTopic() column arrays.
+    """
+    return tuple(
+        {
+            "id": res[0][i],
+            "topicId": topic_id,
+            "title": res[1][i],
+            "contentHash": res[2][i],
+            "questionCount": res[3][i],
+            "passScore": res[4][i],
+        }
+        for i in range(len(res[0]))
+        if res[5][i]
+    )
+
+
+class CatalogueSnapshot:
+    """
+    Read-only topic -> module tree as of one block. Never mutated once built:
+    changes produce a new snapshot, so readers holding one always see a
+    consistent tree. Rows handed out are copies.
+    """
+
+    __slots__ = ("block", "_topics")
+
+    def __init__(self, block, topics: dict):
+        self.block = block
+        self._topics = topics  # topic ID -> (topic dict, tuple of module dicts)
+
+    def __len__(self):
+        return len(self._topics)
+
+    def topic_ids(self):
+        return sorted(self._topics)
+
+    def topic(self, topic_id: int):
+        """
+        (topic, [module, ...]) or None for an unknown / deleted topic.
+        """
+        entry = self._topics.get(topic_id)
+        if entry is None:
+            return None
+        topic, modules = entry
+        return dict(topic), [dict(m) for m in modules]
+
+    def with_topic(self, block, topic_id: int, entry):
+        """
+        Copy with one topic replaced (entry None = removed). Modules of the other
+        topics are shared, not copied.
+        """
+        topics = dict(self._topics)
+        if entry is None:
+            topics.pop(topic_id, None)
+        else:
+            topics[topic_id] = entry
+        return CatalogueSnapshot(block, topics)
+
+
+def fetch_topic(contract, topic_id: int, block_identifier="latest"):
+    """
+    (topic, modules) of one topic in a single batch round-trip, or None if it doesn't exist.
+    """
+    fns = contract.functions
+    topic, modules = batch_call([fns.getTopic(topic_id), fns.getModulesByTopic(topic_id)],
+                                block_identifier=block_identifier)
+    if not topic[4]:
+        return None
+    return topic_from_tuple(topic), modules_from_columns(topic_id, modules)
+
+
+def fetch_catalogue(contract, block_identifier="latest") -> CatalogueSnapshot:
+    """
+    The whole tree as of `block_identifier`: getAllTopics, then every topic's
+    modules in batched RPC round-trips.
+    """
+    res = contract.functions.getAllTopics().call(block_identifier=block_identifier)
+    topics = [topic_from_tuple(row) for row, exists in zip(zip(*res[:4]), res[4]) if exists]
+    modules = batch_call([contract.functions.getModulesByTopic(t["id"]) for t in topics],
+                         block_identifier=block_identifier)
+    return CatalogueSnapshot(
+        block_identifier,
+        {t["id"]: (t, modules_from_columns(t["id"], m)) for t, m in zip(topics, modules)},
+    )
+
+
+class LearningCatalogue:
+    """
+    Learning contract catalogue kept as an immutable CatalogueSnapshot.
+
+    Loaded once at the indexer's start block; every topic/module event re-reads
+    only the affected topic at its block and swaps in a new snapshot (a single
+    reference assignment, so readers never see a half-applied change). Topics
+    and modules are few, so a reorg simply reloads the tree at the fork point.
+    """
+
+    TOPIC_EVENTS = ("TopicCreated", "TopicUpdated", "TopicDeleted",
+                    "ModuleAdded", "ModuleUpdated", "ModuleDeleted")
+
+    def __init__(self, contract, poll_interval: float = 2.0, confirmations: int = 0):
+        self.contract = contract
+        self.snapshot = None
+        self._swap_lock = threading.Lock()
+        self.indexer = EventIndexer(contract, name="Learning", poll_interval=poll_interval,
+                                    confirmations=confirmations)
+
+        self.indexer.on_seed(self._load)
+        self.indexer.on_rollback(self._load)
+        for event_name in self.TOPIC_EVENTS:
+            self.indexer.subscribe(event_name, self._on_topic_changed)
+
+    @property
+    def ready(self) -> bool:
+        return self.indexer.ready and self.snapshot is not None
+
+    def start(self):
+        self.indexer.start()
+
+    def stop(self):
+        self.indexer.stop()
+
+    # -------- indexer callbacks --------
+    def _load(self, block: int):
+        snapshot = fetch_catalogue(self.contract, block)
+        with self._swap_lock:
+            self.snapshot = snapshot
+        logger.info("Learning catalogue loaded at block %s: %s topics", block, len(snapshot))
+
+    def _on_topic_changed(self, event):
+        topic_id = event["args"]["topicId"]
+        block = event["blockNumber"]
+        entry = fetch_topic(self.contract, topic_id, block)
+        with self._swap_lock:
+            self.snapshot = self.snapshot.with_topic(block, topic_id, entry)
+
+
+def build_learning_catalogue(contract) -> LearningCatalogue:
+    return LearningCatalogue(
+        contract,
+        poll_interval=config.INDEXER_POLL_INTERVAL,
+        confirmations=config.INDEXER_CONFIRMATIONS,
+    )
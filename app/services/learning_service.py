@@ -1,31 +1,51 @@
 import os
 import json
+import asyncio
+import hashlib
 import logging
-import requests
-from app.services.db import db  # ✅ MongoDB Atlas connection
+from datetime import datetime, timezone
+from app.services.db import get_async_db  # ✅ MongoDB Atlas connection
+from app.services.cache_backend import TieredCache
+from app.services.web3_utils import contract
+from app.services.learning_catalogue import build_learning_catalogue, fetch_catalogue
+from app.services.http_client import http_client, openrouter
 from app import config
 
 logger = logging.getLogger(__name__)
 
 # ----------------- MongoDB -----------------
-modules_col = db["modules_content"]  # Stores AI-generated content and quizzes
+# Collections are looked up per call so importing this module doesn't connect
+def modules_col():
+    return get_async_db()["modules_content"]  # Stores AI-generated content and quizzes
+
+def quiz_cache_col():
+    return get_async_db()["quiz_cache"]  # Generated quizzes keyed by content hash
+
+_quiz_indexes_ready = False
 
 # ----------------- Web3 Contract -----------------
 LEARNING_ADDRESS = getattr(config, "LEARNING_ADDRESS", None)
-learning_contract = None
+learning_contract = contract("Learning")
+
+# Topic -> module tree fed by Learning events; reads load it directly until it is seeded
+learning_catalogue = build_learning_catalogue(learning_contract)
 
 # ----------------- AI Setup -----------------
 OPENROUTER_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+QUIZ_MODEL = "x-ai/grok-4-fast"
+
+# Memo in front of the Mongo quiz cache (shared between workers when an L2 is
+# configured); also coalesces concurrent generations
+quiz_memo = TieredCache("quizzes", maxsize=config.QUIZ_MEMO_SIZE, ttl=config.QUIZ_CACHE_TTL)
 
 
 # =====================================================
 # AI CONTENT & QUIZ GENERATION
 # =====================================================
-def generate_ai_content_simple(topic_id: int, module_title: str) -> str:
-    """Generate short, easy-to-read learning content."""
+def _content_prompt(topic_id: int, module_title: str) -> str:
     topic_name = f"Topic {topic_id}" if topic_id else "General"
-    prompt = f"""
+    return f"""
     Generate easy, beginner-friendly educational content for a module titled '{module_title}' under topic '{topic_name}'.
 
     Guidelines:
@@ -34,23 +54,66 @@ def generate_ai_content_simple(topic_id: int, module_title: str) -> str:
     - Keep tone positive and clear.
     """
 
-    if not OPENROUTER_KEY:
-        logger.warning("OPENROUTER_API_KEY not found. Returning placeholder content.")
-        return f"Learning content for {module_title} (placeholder - AI disabled)."
+def _quiz_prompt(content_text: str, question_count: int) -> str:
+    return f"""
+    Create {question_count} multiple-choice questions from this text.
+    Return valid JSON with:
+    - q: question string
+    - options: 4 choices
+    - answerIndex: 0-based index of correct option
 
+    Content:
+    {content_text}
+    """
+
+def _openrouter_request(prompt: str, model: str = QUIZ_MODEL, stream: bool = False):
     payload = {
-        "model": "x-ai/grok-4-fast",
+        "model": model,
         "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
     }
+    if stream:
+        payload["stream"] = True
 
     headers = {
         "Authorization": f"Bearer {OPENROUTER_KEY}",
         "Content-Type": "application/json",
     }
+    return payload, headers
+
+async def _stream_completion(prompt: str, model: str = QUIZ_MODEL):
+    """
+    Yield text deltas of an OpenRouter streamed chat completion as they arrive.
+    """
+    payload, headers = _openrouter_request(prompt, model, stream=True)
+    async with http_client.stream(openrouter, "POST", OPENROUTER_URL, headers=headers, json=payload) as response:
+        # Server-sent events, one per line; ": ..." lines are keep-alive comments
+        async for raw in response.content:
+            line = raw.decode("utf-8").strip()
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            chunk = json.loads(data)
+            if "error" in chunk:
+                raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+            choices = chunk.get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                yield delta
+
+async def generate_ai_content_simple(topic_id: int, module_title: str) -> str:
+    """Generate short, easy-to-read learning content."""
+    prompt = _content_prompt(topic_id, module_title)
+
+    if not OPENROUTER_KEY:
+        logger.warning("OPENROUTER_API_KEY not found. Returning placeholder content.")
+        return f"Learning content for {module_title} (placeholder - AI disabled)."
+
+    payload, headers = _openrouter_request(prompt)
 
     try:
-        response = requests.post(OPENROUTER_URL, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
+        response = await http_client.request(openrouter, "POST", OPENROUTER_URL, headers=headers, json=payload)
         result = response.json()
         text = result["choices"][0]["message"]["content"]
         if isinstance(text, list):
@@ -60,65 +123,250 @@ def generate_ai_content_simple(topic_id: int, module_title: str) -> str:
         logger.exception("AI content generation failed: %s", e)
         return f"Learning content for {module_title} (AI error)."
 
-def generate_quiz_ai(topic_id: int, module_id: int, question_count: int = 5):
-    """Generate multiple choice questions from module content."""
-    module_entry = modules_col.find_one({"topic_id": topic_id, "module_id": module_id})
-    content_text = module_entry["content"] if module_entry else "No content available."
-    print(content_text)
-    prompt = f"""
-    Create {question_count} multiple-choice questions from this text.
-    Return valid JSON with:
-    - q: question string
-    - options: 4 choices
-    - answerIndex: 0-based index of correct option
+async def stream_ai_content(topic_id: int, module_title: str):
+    """
+    Streaming variant of generate_ai_content_simple: yields content as it is generated.
+    """
+    if not OPENROUTER_KEY:
+        logger.warning("OPENROUTER_API_KEY not found. Returning placeholder content.")
+        yield f"Learning content for {module_title} (placeholder - AI disabled)."
+        return
 
-    Content:
-    {content_text}
+    async for delta in _stream_completion(_content_prompt(topic_id, module_title)):
+        yield delta
+
+def _placeholder_quiz(question_count: int):
+    return [{"q": f"Question {i+1}", "options": ["A", "B", "C", "D"], "answerIndex": 0} for i in range(question_count)]
+
+def quiz_cache_key(content_text: str, question_count: int) -> str:
+    """
+    Content-addressed key: editing the module text or bumping QUIZ_CACHE_VERSION
+    (prompt/model changes) yields a new key, so stale quizzes are never served.
     """
+    raw = f"{config.QUIZ_CACHE_VERSION}:{QUIZ_MODEL}:{question_count}:{content_text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
 
-    if not OPENROUTER_KEY:
-        return [{"q": f"Question {i+1}", "options": ["A", "B", "C", "D"], "answerIndex": 0} for i in range(question_count)]
+def _clean_question(q):
+    """
+    Normalized question dict, or None if the model's object is not a usable question.
+    """
+    if isinstance(q, dict) and "q" in q and "options" in q and "answerIndex" in q:
+        try:
+            return {
+                "q": q["q"],
+                "options": q["options"][:4],
+                "answerIndex": int(q["answerIndex"]),
+            }
+        except (TypeError, ValueError):
+            return None
+    return None
 
-    payload = {
-        "model": "x-ai/grok-4-fast",
-        "messages": [{"role": "user", "content": [{"type": "text", "text": prompt}]}],
-    }
+class QuizStreamParser:
+    """
+    Incremental parser for a streamed quiz: feed() text deltas and get back every
+    question object completed so far, without waiting for the closing bracket.
 
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_KEY}",
-        "Content-Type": "application/json",
-    }
+    Tracks string/escape state and nesting depth over the raw characters; each
+    {...} directly inside the first JSON array holding a question is decoded as
+    soon as it closes. Text before the array (prose, markdown fences, a wrapping
+    {"questions": ...}) is ignored, as is everything after it.
+    """
 
-    try:
-        response = requests.post(OPENROUTER_URL, headers=headers, data=json.dumps(payload))
-        response.raise_for_status()
-        result = response.json()
-        text = result["choices"][0]["message"]["content"]
+    def __init__(self):
+        self._depth = 0
+        self._array_depth = None
+        self._in_string = False
+        self._escape = False
+        self._current = None  # characters of the question object being read
+        self._found = False  # the current array has yielded a question
+        self._done = False
 
-        if isinstance(text, list):
-            text = "".join([c.get("text", "") for c in text])
+    def feed(self, text: str):
+        questions = []
+        if self._done:
+            return questions
+        for ch in text:
+            if self._current is not None:
+                self._current.append(ch)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+                if ch == "[" and self._array_depth is None:
+                    self._array_depth = self._depth
+                elif ch == "{" and self._current is None and self._array_depth is not None \
+                        and self._depth == self._array_depth + 1:
+                    self._current = [ch]
+            elif ch in "]}":
+                if ch == "}" and self._current is not None and self._depth == self._array_depth + 1:
+                    question = self._decode("".join(self._current))
+                    self._current = None
+                    if question is not None:
+                        questions.append(question)
+                        self._found = True
+                elif ch == "]" and self._depth == self._array_depth:
+                    # The array closed: the quiz is over, or it was prose like "[1]"
+                    self._current = None
+                    self._array_depth = None
+                    if self._found:
+                        self._done = True
+                        return questions
+                self._depth = max(0, self._depth - 1)
+        return questions
+
+    @staticmethod
+    def _decode(raw: str):
+        try:
+            return _clean_question(json.loads(raw))
+        except ValueError:
+            return None
+
+async def _request_quiz(content_text: str, question_count: int):
+    """
+    Ask OpenRouter for a quiz; raises if the request fails or yields no valid question.
+    """
+    payload, headers = _openrouter_request(_quiz_prompt(content_text, question_count))
+
+    response = await http_client.request(openrouter, "POST", OPENROUTER_URL, headers=headers, json=payload)
+    result = response.json()
+    text = result["choices"][0]["message"]["content"]
+
+    if isinstance(text, list):
+        text = "".join([c.get("text", "") for c in text])
+
+    quiz_list = json.loads(text)
+    valid_quiz = [q for q in map(_clean_question, quiz_list) if q is not None]
+    if not valid_quiz:
+        raise ValueError("AI returned no valid questions")
+    return valid_quiz
+
+async def ensure_quiz_indexes():
+    global _quiz_indexes_ready
+    if not _quiz_indexes_ready:
+        try:
+            await quiz_cache_col().create_index("created_at", expireAfterSeconds=config.QUIZ_CACHE_TTL)
+        except Exception as e:
+            # e.g. an existing index with another TTL; entries still expire by that one
+            logger.warning("Could not create quiz cache TTL index: %s", e)
+        _quiz_indexes_ready = True
 
-        quiz_list = json.loads(text)
-        valid_quiz = []
-        for q in quiz_list:
-            if "q" in q and "options" in q and "answerIndex" in q:
-                valid_quiz.append({
-                    "q": q["q"],
-                    "options": q["options"][:4],
-                    "answerIndex": int(q["answerIndex"]),
-                })
-        return valid_quiz or [{"q": f"Question {i+1}", "options": ["A", "B", "C", "D"], "answerIndex": 0} for i in range(question_count)]
+async def _store_quiz(key: str, topic_id: int, module_id: int, question_count: int, quiz):
+    await quiz_cache_col().replace_one(
+        {"_id": key},
+        {
+            "topic_id": topic_id,
+            "module_id": module_id,
+            "question_count": question_count,
+            "version": config.QUIZ_CACHE_VERSION,
+            "quiz": quiz,
+            "created_at": datetime.now(timezone.utc),
+        },
+        upsert=True,
+    )
 
+async def _load_or_generate_quiz(key: str, topic_id: int, module_id: int, content_text: str, question_count: int):
+    """
+    Mongo lookup, then generation on a miss; only successful generations are stored.
+    """
+    await ensure_quiz_indexes()
+    doc = await quiz_cache_col().find_one({"_id": key})
+    if doc:
+        return doc["quiz"]
+
+    quiz = await _request_quiz(content_text, question_count)
+    await _store_quiz(key, topic_id, module_id, question_count, quiz)
+    return quiz
+
+async def generate_quiz_ai(topic_id: int, module_id: int, question_count: int = 5):
+    """Generate multiple choice questions from module content."""
+    module_entry = await modules_col().find_one({"topic_id": topic_id, "module_id": module_id})
+    content_text = module_entry["content"] if module_entry else "No content available."
+
+    if not OPENROUTER_KEY:
+        return _placeholder_quiz(question_count)
+
+    key = quiz_cache_key(content_text, question_count)
+    try:
+        # Concurrent requests for the same key share one Mongo lookup / generation
+        quiz = await quiz_memo.aget_or_load(
+            key, lambda: _load_or_generate_quiz(key, topic_id, module_id, content_text, question_count)
+        )
+        return [dict(q) for q in quiz]
     except Exception as e:
         logger.exception("AI quiz generation failed: %s", e)
-        return [{"q": f"Question {i+1}", "options": ["A", "B", "C", "D"], "answerIndex": 0} for i in range(question_count)]
+        return _placeholder_quiz(question_count)
+
+async def stream_quiz_ai(topic_id: int, module_id: int, question_count: int = 5):
+    """
+    Streaming variant of generate_quiz_ai: yields each question as soon as it is complete.
+    Cached quizzes are replayed at once; a fully streamed quiz is stored in the cache.
+    """
+    module_entry = await modules_col().find_one({"topic_id": topic_id, "module_id": module_id})
+    content_text = module_entry["content"] if module_entry else "No content available."
+
+    if not OPENROUTER_KEY:
+        for q in _placeholder_quiz(question_count):
+            yield q
+        return
+
+    key = quiz_cache_key(content_text, question_count)
+    quiz = quiz_memo.get(key)
+    if quiz is None:
+        await ensure_quiz_indexes()
+        doc = await quiz_cache_col().find_one({"_id": key})
+        if doc:
+            quiz = doc["quiz"]
+            quiz_memo.set(key, quiz)
+    if quiz is not None:
+        for q in quiz:
+            yield dict(q)
+        return
+
+    parser = QuizStreamParser()
+    quiz = []
+    async for delta in _stream_completion(_quiz_prompt(content_text, question_count)):
+        for q in parser.feed(delta):
+            quiz.append(q)
+            yield dict(q)
+    if not quiz:
+        raise ValueError("AI returned no valid questions")
+    # Only store quizzes that streamed to completion
+    await _store_quiz(key, topic_id, module_id, question_count, quiz)
+    quiz_memo.set(key, quiz)
+
+async def pregenerate_quizzes(default_question_count: int = 5):
+    """
+    Warm the quiz cache for every module in modules_content.
+    Returns how many modules now have a cached quiz.
+    """
+    semaphore = asyncio.Semaphore(config.QUIZ_PREGENERATE_CONCURRENCY)
+
+    async def warm(doc):
+        async with semaphore:
+            question_count = doc.get("questionCount") or default_question_count
+            quiz = await generate_quiz_ai(doc["topic_id"], doc["module_id"], question_count)
+            return quiz != _placeholder_quiz(question_count)
+
+    docs = await modules_col().find(
+        {}, {"topic_id": 1, "module_id": 1, "questionCount": 1}
+    ).to_list(None)
+    results = await asyncio.gather(*(warm(doc) for doc in docs))
+    logger.info("Pre-generated quizzes for %s/%s modules", sum(results), len(docs))
+    return sum(results)
 
 async def get_module_content(topic_id: int, module_id: int):
     """
     Retrieve module content (title, markdown, etc.) from MongoDB for the given topic and module.
     """
-    collection = db["modules_content"]  # use your actual collection name
-    doc = collection.find_one({"topic_id": topic_id, "module_id": module_id})
+    doc = await modules_col().find_one({"topic_id": topic_id, "module_id": module_id})
 
     if not doc:
         return None
@@ -130,3 +378,60 @@ async def get_module_content(topic_id: int, module_id: int):
         "questionCount": doc.get("questionCount"),
         "passScore": doc.get("passScore"),
     }
+
+
+# =====================================================
+# CATALOGUE
+# =====================================================
+async def _catalogue_snapshot():
+    if config.LEARNING_CATALOGUE_ENABLED:
+        learning_catalogue.start()
+        if learning_catalogue.ready:
+            return learning_catalogue.snapshot
+    return await asyncio.to_thread(fetch_catalogue, learning_contract)
+
+async def _module_contents(topic_ids, module_ids):
+    """
+    {(topic_id, module_id): doc} for the given modules, in one Mongo query.
+    The markdown itself is left out; catalogue views only need the metadata.
+    """
+    if not module_ids:
+        return {}
+    docs = await modules_col().find(
+        {"topic_id": {"$in": list(set(topic_ids))}, "module_id": {"$in": list(set(module_ids))}},
+        {"content": 0},
+    ).to_list(None)
+    return {(doc["topic_id"], doc["module_id"]): doc for doc in docs}
+
+def _joined_modules(modules, contents):
+    for module in modules:
+        doc = contents.get((module["topicId"], module["id"]))
+        module["hasContent"] = doc is not None
+        module["moduleTitle"] = doc.get("module_title") if doc else None
+    return modules
+
+async def get_catalogue():
+    """
+    Every topic with its modules, each joined with its Mongo content metadata.
+    """
+    snapshot = await _catalogue_snapshot()
+    tree = [snapshot.topic(topic_id) for topic_id in snapshot.topic_ids()]
+    modules = [m for _, topic_modules in tree for m in topic_modules]
+    contents = await _module_contents([m["topicId"] for m in modules], [m["id"] for m in modules])
+    return {
+        "block": snapshot.block,
+        "topics": [dict(topic, modules=_joined_modules(topic_modules, contents))
+                   for topic, topic_modules in tree],
+    }
+
+async def get_catalogue_topic(topic_id: int):
+    """
+    One topic with its joined modules, or None if it doesn't exist.
+    """
+    snapshot = await _catalogue_snapshot()
+    entry = snapshot.topic(topic_id)
+    if entry is None:
+        return None
+    topic, modules = entry
+    contents = await _module_contents([topic_id], [m["id"] for m in modules])
+    return dict(topic, modules=_joined_modules(modules, contents))
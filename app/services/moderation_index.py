@@ -0,0 +1,212 @@
+# app/services/moderation_index.py
+import threading
+from bisect import bisect_left, insort
+
+from app import config
+from app.services.event_indexer import EventIndexer, JournaledTable
+from app.services.web3_utils import batch_call
+
+
+def flag_from_tuple(res):
+    """
+    Map a Moderation.getFlags() entry to the flag dict returned by the API.
+    """
+    return {"contentId": res[0], "flagger": res[1], "resolved": res[2]}
+
+
+def _content_row(content_id: int, flags, last_flagged_block: int, removed: bool = None):
+    return {
+        "contentId": content_id,
+        "flags": tuple(flags),
+        "unresolved": sum(1 for f in flags if not f["resolved"]),
+        "lastFlaggedBlock": last_flagged_block,
+        "removed": removed,  # outcome of the last resolution, None if never resolved
+    }
+
+
+class ModerationStore:
+    """
+    Flags per content ID (journaled for reorgs) plus two derived views: the queue
+    of content with unresolved flags, sorted by (unresolved count, last flag block,
+    content ID) descending, and flag counts per flagger.
+
+    Both views are adjusted by the difference between a content's old and new row
+    on every write, and rebuilt after a rollback.
+    """
+
+    def __init__(self):
+        self.rows = JournaledTable()
+        self._queue = []  # sorted queue keys, see _queue_key
+        self._flaggers = {}  # flagger -> {"flags", "unresolved"}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    @staticmethod
+    def _queue_key(row):
+        # Negated so an ascending list reads most-flagged, most-recent first
+        return (-row["unresolved"], -row["lastFlaggedBlock"], -row["contentId"])
+
+    def _apply_locked(self, row, sign: int):
+        if row["unresolved"]:
+            key = self._queue_key(row)
+            if sign > 0:
+                insort(self._queue, key)
+            else:
+                i = bisect_left(self._queue, key)
+                if i < len(self._queue) and self._queue[i] == key:
+                    del self._queue[i]
+        for flag in row["flags"]:
+            counts = self._flaggers.setdefault(flag["flagger"], {"flags": 0, "unresolved": 0})
+            counts["flags"] += sign
+            counts["unresolved"] += sign * (not flag["resolved"])
+            if not counts["flags"]:
+                del self._flaggers[flag["flagger"]]
+
+    # -------- writes --------
+    def reset(self, rows: dict):
+        self.rows.reset(rows)
+        self.reindex()
+
+    def rollback(self, block: int):
+        self.rows.rollback(block)
+        self.reindex()
+
+    def reindex(self):
+        with self._lock:
+            self._queue, self._flaggers = [], {}
+            for row in self.rows.values():
+                self._apply_locked(row, 1)
+
+    def put(self, row: dict, block: int):
+        with self._lock:
+            previous = self.rows.get(row["contentId"])
+            if previous is not None:
+                self._apply_locked(previous, -1)
+            self.rows.put(row["contentId"], row, block)
+            self._apply_locked(row, 1)
+
+    # -------- reads --------
+    def get(self, content_id: int):
+        row = self.rows.get(content_id)
+        return [dict(f) for f in row["flags"]] if row is not None else None
+
+    def get_many(self, content_ids):
+        """
+        {content ID: [flag, ...]}; content never flagged maps to an empty list.
+        """
+        return {i: self.get(i) or [] for i in content_ids}
+
+    def queue(self, offset: int = 0, limit: int = 50):
+        """
+        (page of content with unresolved flags, total queued).
+        """
+        with self._lock:
+            keys = self._queue[offset:offset + limit]
+            total = len(self._queue)
+        page = []
+        for key in keys:
+            row = self.rows.get(-key[2])
+            if row is None:
+                continue
+            page.append({
+                "contentId": row["contentId"],
+                "unresolved": row["unresolved"],
+                "totalFlags": len(row["flags"]),
+                "lastFlaggedBlock": row["lastFlaggedBlock"],
+                "flaggers": [f["flagger"] for f in row["flags"] if not f["resolved"]],
+            })
+        return page, total
+
+    def flagger_counts(self, flagger: str) -> dict:
+        with self._lock:
+            return dict(self._flaggers.get(flagger, {"flags": 0, "unresolved": 0}))
+
+
+def fetch_flags(contract, content_ids, block_identifier="latest") -> dict:
+    """
+    {content ID: [flag, ...]} for many content IDs, in batched RPC round-trips.
+    """
+    content_ids = list(content_ids)
+    results = batch_call([contract.functions.getFlags(i) for i in content_ids],
+                         block_identifier=block_identifier)
+    return {i: [flag_from_tuple(f) for f in res] for i, res in zip(content_ids, results)}
+
+
+class ModerationIndex:
+    """
+    ModerationStore kept current from Moderation contract events.
+
+    The contract can't enumerate flagged content, so the seed reads getFlags for
+    every Feed post ID at the indexer's start block (seeded rows all get that block
+    as their last flag block), in one chunked batch_call. ContentFlagged then
+    appends an unresolved flag locally; FlagResolved re-reads the content's flags,
+    since the event doesn't say which flags it resolved.
+    """
+
+    def __init__(self, contract, feed_contract, poll_interval: float = 2.0, confirmations: int = 0):
+        self.contract = contract
+        self.feed_contract = feed_contract
+        self.store = ModerationStore()
+        self.indexer = EventIndexer(contract, name="Moderation", poll_interval=poll_interval,
+                                    confirmations=confirmations)
+
+        self.indexer.on_seed(self._seed)
+        self.indexer.on_rollback(self._rollback)
+        self.indexer.subscribe("ContentFlagged", self._on_flagged)
+        self.indexer.subscribe("FlagResolved", self._on_resolved)
+
+    @property
+    def ready(self) -> bool:
+        return self.indexer.ready
+
+    def start(self):
+        self.indexer.start()
+
+    def stop(self):
+        self.indexer.stop()
+
+    # -------- indexer callbacks --------
+    def _seed(self, block: int):
+        total = self.feed_contract.functions.nextPostId().call(block_identifier=block)
+        flags = fetch_flags(self.contract, range(total), block)
+        self.store.reset({i: _content_row(i, f, block) for i, f in flags.items() if f})
+
+    def _rollback(self, block: int):
+        if not self.store.rows.can_rollback(block):
+            self._seed(block)
+            return
+        self.store.rollback(block)
+
+    def _on_flagged(self, event):
+        content_id = event["args"]["contentId"]
+        current = self.store.rows.get(content_id)
+        flags = list(current["flags"]) if current is not None else []
+        flags.append({"contentId": content_id, "flagger": event["args"]["flagger"], "resolved": False})
+        removed = current["removed"] if current is not None else None
+        self.store.put(_content_row(content_id, flags, event["blockNumber"], removed), event["blockNumber"])
+
+    def _on_resolved(self, event):
+        content_id = event["args"]["contentId"]
+        # Read at latest (the event's block may be pruned on a non-archive node). Flags
+        # are append-only, so keep the ones known at this event; later ones arrive
+        # with their own ContentFlagged.
+        res = self.contract.functions.getFlags(content_id).call()
+        current = self.store.rows.get(content_id)
+        if current is not None:
+            res = res[:len(current["flags"])]
+        last_flagged = current["lastFlaggedBlock"] if current is not None else event["blockNumber"]
+        self.store.put(
+            _content_row(content_id, [flag_from_tuple(f) for f in res], last_flagged, event["args"]["removed"]),
+            event["blockNumber"],
+        )
+
+
+def build_moderation_index(contract, feed_contract) -> ModerationIndex:
+    return ModerationIndex(
+        contract,
+        feed_contract,
+        poll_interval=config.INDEXER_POLL_INTERVAL,
+        confirmations=config.INDEXER_CONFIRMATIONS,
+    )
@@ -1,22 +1,49 @@
 # backend/app/services/moderation_service.py
 
-from app.services.web3_utils import get_contract, build_signed_tx, send_signed_transaction
+from web3 import Web3
 from app import config
+from app.services.web3_utils import (
+    contract, async_contract, async_build_signed_tx, async_send_signed_transaction,
+    async_batch_call,
+)
+from app.services.tx_tracker import tx_tracker
+from app.services.view_cache import view_cache, cached_view, EVENTS
+from app.services.moderation_index import build_moderation_index, flag_from_tuple
 
-MODERATION_ADDRESS = config.MODERATION_ADDRESS
 
 # Load the Moderation contract
-moderation_contract = get_contract(MODERATION_ADDRESS, "Moderation")
+moderation_contract = contract("Moderation")
+async_moderation_contract = async_contract("Moderation")
 
+# Local flag table fed by Moderation events; reads fall back to RPC until it is seeded
+moderation_index = build_moderation_index(moderation_contract, contract("Feed"))
 
-def flag_content(content_id: int):
+# Flags change only through ContentFlagged / FlagResolved
+view_cache.watch_events("Moderation", moderation_index.indexer)
+
+
+def _indexed_reads() -> bool:
+    if not config.MODERATION_INDEX_ENABLED:
+        return False
+    moderation_index.start()
+    return moderation_index.ready
+
+
+@cached_view("Moderation", EVENTS)
+async def _read_flags(content_id: int):
+    return await async_moderation_contract.functions.getFlags(content_id).call()
+
+
+async def flag_content(content_id: int, wait: bool = True):
     """
     Calls Moderation.flagContent(contentId)
     """
     try:
-        fn = moderation_contract.functions.flagContent(content_id)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_moderation_contract.functions.flagContent(content_id)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {
             "txHash": receipt.transactionHash.hex(),
             "status": receipt.status
@@ -25,14 +52,16 @@ def flag_content(content_id: int):
         raise Exception(f"Error flagging content: {str(e)}")
 
 
-def resolve_flag(content_id: int, remove: bool):
+async def resolve_flag(content_id: int, remove: bool, wait: bool = True):
     """
     Calls Moderation.resolveFlag(contentId, remove)
     """
     try:
-        fn = moderation_contract.functions.resolveFlag(content_id, remove)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_moderation_contract.functions.resolveFlag(content_id, remove)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
         return {
             "txHash": receipt.transactionHash.hex(),
             "status": receipt.status
@@ -41,12 +70,14 @@ def resolve_flag(content_id: int, remove: bool):
         raise Exception(f"Error resolving flag: {str(e)}")
 
 
-def get_flags(content_id: int):
+async def get_flags(content_id: int):
     """
     Calls Moderation.getFlags(contentId) → returns array of (contentId, flagger, resolved)
     """
     try:
-        flags = moderation_contract.functions.getFlags(content_id).call()
+        if _indexed_reads():
+            return moderation_index.store.get(content_id) or []
+        flags = await _read_flags(content_id)
         result = []
         for f in flags:
             result.append({
@@ -57,3 +88,45 @@ def get_flags(content_id: int):
         return result
     except Exception as e:
         raise Exception(f"Error retrieving flags: {str(e)}")
+
+
+async def get_flags_bulk(content_ids):
+    """
+    {content ID: [flag, ...]} for many content IDs, from the local index or one batched RPC.
+    """
+    try:
+        content_ids = list(dict.fromkeys(content_ids))
+        if _indexed_reads():
+            return moderation_index.store.get_many(content_ids)
+        fns = async_moderation_contract.functions
+        results = await async_batch_call([fns.getFlags(i) for i in content_ids])
+        return {i: [flag_from_tuple(f) for f in res] for i, res in zip(content_ids, results)}
+    except Exception as e:
+        raise Exception(f"Error retrieving flags: {str(e)}")
+
+
+def _require_index():
+    if not _indexed_reads():
+        raise RuntimeError("Moderation index is still syncing, try again shortly")
+
+
+async def get_queue(offset: int = 0, limit: int = 50):
+    """
+    Content with unresolved flags, most unresolved flags first, then most recently flagged.
+    """
+    _require_index()
+    items, total = moderation_index.store.queue(offset, limit)
+    next_offset = offset + len(items) if offset + len(items) < total else None
+    return {"items": items, "total": total, "next_offset": next_offset}
+
+
+async def get_flagger_counts(flagger: str):
+    """
+    Flags raised by one address: {"flags": total, "unresolved": still open}.
+    """
+    try:
+        flagger = Web3.to_checksum_address(flagger)
+    except Exception:
+        raise ValueError("Invalid address format. Please provide a valid checksum address.")
+    _require_index()
+    return dict(moderation_index.store.flagger_counts(flagger), flagger=flagger)
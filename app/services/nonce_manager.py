@@ -0,0 +1,96 @@
+# app/services/nonce_manager.py
+import asyncio
+import threading
+
+
+# Errors returned by nodes when a nonce is already used or behind the account's count
+NONCE_ERROR_MARKERS = (
+    "nonce too low",
+    "already known",
+    "replacement transaction underpriced",
+    "known transaction",
+    "invalid nonce",
+)
+
+
+def is_nonce_error(error: Exception) -> bool:
+    message = str(error).lower()
+    return any(marker in message for marker in NONCE_ERROR_MARKERS)
+
+
+class NonceManager:
+    """
+    Hands out consecutive nonces for a single sending account from local state, so
+    concurrent writes neither race for the same nonce nor pay a get_transaction_count
+    round-trip each.
+
+    The counter is (re)loaded from the chain's pending transaction count on first use
+    and whenever resync() is called, e.g. after a "nonce too low" rejection or when a
+    reserved nonce is released out of order and would otherwise leave a gap.
+    Counter changes happen under a short threading lock with no I/O held, and only one
+    chain fetch runs at a time, so the same instance is safe to share between threads
+    and the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next = None
+        # Only one chain fetch at a time; concurrent reservers wait for it
+        self._fetch_lock = threading.Lock()
+        self._async_fetch_lock = None
+
+    @property
+    def synced(self) -> bool:
+        return self._next is not None
+
+    def _take(self, chain_count=None) -> int:
+        with self._lock:
+            if self._next is None:
+                if chain_count is None:
+                    return None
+                self._next = chain_count
+            nonce = self._next
+            self._next += 1
+            return nonce
+
+    def reserve(self, fetch_count) -> int:
+        """
+        Reserve the next nonce; `fetch_count()` returns the pending count when a sync is needed.
+        """
+        nonce = self._take()
+        while nonce is None:
+            with self._fetch_lock:
+                nonce = self._take()
+                if nonce is None:
+                    nonce = self._take(fetch_count())
+        return nonce
+
+    async def areserve(self, fetch_count) -> int:
+        """
+        Async reserve(); `fetch_count()` is a coroutine function.
+        """
+        if self._async_fetch_lock is None:
+            self._async_fetch_lock = asyncio.Lock()
+        nonce = self._take()
+        while nonce is None:
+            async with self._async_fetch_lock:
+                nonce = self._take()
+                if nonce is None:
+                    nonce = self._take(await fetch_count())
+        return nonce
+
+    def release(self, nonce: int):
+        """
+        Give back a nonce whose transaction was never broadcast.
+        Only the most recent nonce can be handed out again; anything older leaves a
+        gap, so the next reservation reloads the count from the chain instead.
+        """
+        with self._lock:
+            if self._next is not None and nonce == self._next - 1:
+                self._next = nonce
+            else:
+                self._next = None
+
+    def resync(self):
+        with self._lock:
+            self._next = None
@@ -0,0 +1,50 @@
+# app/services/pinata_service.py
+import time
+
+from app import config
+from app.services.http_client import http_client, pinata
+from app.services.url_pool import SignedUrlPool
+
+PINATA_SIGN_URL = "https://uploads.pinata.cloud/v3/files/sign"
+
+
+async def request_signed_url(expires: int = None) -> str:
+    """
+    Ask Pinata for a presigned URL the frontend can upload a file to directly,
+    valid for `expires` seconds (PINATA_URL_EXPIRES by default).
+    """
+    headers = {
+        "Authorization": f"Bearer {config.PINATA_JWT}",
+        "Content-Type": "application/json"
+    }
+
+    payload = {
+        "expires": expires or config.PINATA_URL_EXPIRES,  # seconds
+        "name": "client_file",  # optional file name
+        "mimeTypes": ["image/*"],  # optional
+        "maxFileSize": 5000000,  # optional
+        "date": int(time.time())  # REQUIRED: current timestamp
+    }
+
+    response = await http_client.request(pinata, "POST", PINATA_SIGN_URL, json=payload, headers=headers)
+    url = response.json().get("data")
+    if not url:
+        raise ValueError("Pinata returned no signed URL")
+    return url
+
+
+async def request_pooled_url() -> str:
+    # Longer-lived than a direct URL: it may wait in the pool for up to the shelf life
+    return await request_signed_url(config.PINATA_URL_EXPIRES + config.PINATA_URL_SHELF_LIFE)
+
+
+signed_url_pool = SignedUrlPool(
+    request_pooled_url,
+    ttl=config.PINATA_URL_EXPIRES + config.PINATA_URL_SHELF_LIFE,
+    min_remaining=config.PINATA_URL_EXPIRES,
+    min_size=config.PINATA_POOL_MIN,
+    max_size=config.PINATA_POOL_MAX,
+    horizon=config.PINATA_POOL_HORIZON,
+    # Without a JWT every refill would be rejected; uploads then fail per request
+    enabled=lambda: bool(config.PINATA_JWT),
+)
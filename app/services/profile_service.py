@@ -1,44 +1,106 @@
 # backend/app/services/profile_service.py
 
-from app.services.web3_utils import get_contract, w3, build_signed_tx, send_signed_transaction
+from app.services.web3_utils import (
+    contract, async_contract, w3, async_build_signed_tx, async_send_signed_transaction,
+    async_batch_call, ACCOUNT,
+)
+from app.services.tx_tracker import tx_tracker
+from app.services.cache_backend import TieredCache
+from app.services.event_indexer import EventIndexer
+from app.services.view_cache import view_cache, cached_view, EVENTS
 from app import config
 
-PROFILE_ADDRESS = config.PROFILE_ADDRESS
-profile_contract = get_contract(PROFILE_ADDRESS, "Profile")
+profile_contract = contract("Profile")
+async_profile_contract = async_contract("Profile")
 
+# ----------------- PROFILE CACHE -----------------
+# Keyed by checksum address; ProfileCreated/Updated/Deleted events evict entries
+profile_cache = TieredCache("profiles", maxsize=config.PROFILE_CACHE_SIZE, ttl=config.PROFILE_CACHE_TTL)
+profile_indexer = EventIndexer(profile_contract, name="Profile",
+                               poll_interval=config.INDEXER_POLL_INTERVAL,
+                               confirmations=config.INDEXER_CONFIRMATIONS)
 
-def get_profile_by_address(address: str):
+
+def _invalidate_owner(event):
+    profile_cache.invalidate(w3.to_checksum_address(event["args"]["owner"]))
+
+
+profile_indexer.subscribe("ProfileCreated", _invalidate_owner)
+profile_indexer.subscribe("ProfileUpdated", _invalidate_owner)
+profile_indexer.subscribe("ProfileDeleted", _invalidate_owner)
+# Entries may have been filled from orphaned blocks
+profile_indexer.on_rollback(lambda block: profile_cache.clear())
+# Deep reorg or contract address change: nothing cached is trustworthy
+profile_indexer.on_seed(lambda block: profile_cache.clear())
+# Username ownership only changes through Profile events
+view_cache.watch_events("Profile", profile_indexer)
+
+
+def _profile_from_tuple(res):
+    return {
+        "owner": res[0],
+        "username": res[1],
+        "avatarURI": res[2],
+        "bio": res[3],
+        "updatedAt": res[4],
+        "exists": res[5]
+    }
+
+
+async def _load_profiles(addresses):
+    results = await async_batch_call([async_profile_contract.functions.getProfile(a) for a in addresses])
+    return {a: _profile_from_tuple(res) for a, res in zip(addresses, results)}
+
+
+async def _load_profile(address: str):
+    return _profile_from_tuple(await async_profile_contract.functions.getProfile(address).call())
+
+
+async def get_profile_by_address(address: str):
     """
     Read-only call to Profile.getProfile(address).
     """
     try:
         checksum_addr = w3.to_checksum_address(address)
-        res = profile_contract.functions.getProfile(checksum_addr).call()
-        return {
-            "owner": res[0],
-            "username": res[1],
-            "avatarURI": res[2],
-            "bio": res[3],
-            "updatedAt": res[4],
-            "exists": res[5]
-        }
+        profile_indexer.start()
+        profile = await profile_cache.aget_or_load(checksum_addr, lambda: _load_profile(checksum_addr))
+        return dict(profile)
     except Exception as e:
         # Bubble up informative error
         raise Exception(f"Error fetching profile: {str(e)}")
 
 
-def get_username_owner(username: str):
+async def get_profiles_by_addresses(addresses):
+    """
+    Profiles for many addresses, keyed by checksum address.
+    Each distinct address is looked up once; cache misses share one batched RPC.
+    """
+    try:
+        checksum_addrs = [w3.to_checksum_address(a) for a in addresses]
+        profile_indexer.start()
+        profiles = await profile_cache.aget_many_or_load(checksum_addrs, _load_profiles)
+        return {a: dict(p) for a, p in profiles.items()}
+    except Exception as e:
+        raise Exception(f"Error fetching profiles: {str(e)}")
+
+
+@cached_view("Profile", EVENTS)
+async def _read_username_owner(username: str):
+    return await async_profile_contract.functions.getUsernameOwner(username).call()
+
+
+async def get_username_owner(username: str):
     """
     Read-only call to check who owns a username.
     """
     try:
-        owner = profile_contract.functions.getUsernameOwner(username).call()
+        owner = await _read_username_owner(username)
         return {"owner": owner}
     except Exception as e:
         raise Exception(f"Error checking username owner: {str(e)}")
 
 
-def set_profile(username: str, avatarURI: str, bio: str):
+async def set_profile(username: str, avatarURI: str, bio: str, wait: bool = True):
     """
     Build, sign and send a transaction to call Profile.setProfile(username, avatarURI, bio).
     NOTE: This uses the server's private key (config.PRIVATE_KEY) to sign.
@@ -46,9 +108,13 @@ def set_profile(username: str, avatarURI: str, bio: str):
     Returns the transaction receipt.
     """
     try:
-        fn = profile_contract.functions.setProfile(username, avatarURI, bio)
-        signed = build_signed_tx(fn)
-        receipt = send_signed_transaction(signed)
+        fn = async_profile_contract.functions.setProfile(username, avatarURI, bio)
+        signed = await async_build_signed_tx(fn)
+        if not wait:
+            return await tx_tracker.submit(signed)
+        receipt = await async_send_signed_transaction(signed)
+        # Don't wait for the indexer to evict the signer's stale entry
+        profile_cache.invalidate(ACCOUNT.address)
         return {
             "txHash": receipt.transactionHash.hex(),
             "status": receipt.status,
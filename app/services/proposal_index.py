@@ -0,0 +1,256 @@
+# app/services/proposal_index.py
+import math
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+
+from app import config
+from app.services.event_indexer import EventIndexer, JournaledTable
+from app.services.web3_utils import batch_call
+
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+
+STATUSES = ("live", "ended", "executed")
+SORTS = ("id", "endTime")
+
+# DAO.getUserVote / Voted.voteType values
+VOTE_YES = 1
+VOTE_NO = 2
+
+
+def proposal_from_tuple(res):
+    """
+    Map a DAO proposal tuple (getProposal / proposals getter) to the API dict.
+    """
+    return {
+        "id": res[0],
+        "proposer": res[1],
+        "description": res[2],
+        "startTime": res[3],
+        "endTime": res[4],
+        "yesVotes": res[5],
+        "noVotes": res[6],
+        "executed": res[7],
+    }
+
+
+def proposal_status(proposal: dict, now: float) -> str:
+    if proposal["executed"]:
+        return "executed"
+    return "live" if now < proposal["endTime"] else "ended"
+
+
+class ProposalStore:
+    """
+    Proposal rows (journaled for reorgs) plus sorted secondary indexes: all IDs,
+    IDs per proposer and (endTime, id) pairs.
+
+    Proposer and end time never change after creation, so the indexes only grow
+    on ProposalCreated and are rebuilt after a rollback. Status depends on the
+    clock, so it is resolved at query time: live/ended is a bisect on the end-time
+    index at `now`, executed is checked per row.
+    """
+
+    def __init__(self):
+        self.rows = JournaledTable()
+        self._by_id = []
+        self._by_proposer = {}  # proposer -> sorted IDs
+        self._by_end = []  # sorted (endTime, id)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.rows)
+
+    # -------- writes --------
+    def reset(self, rows: dict):
+        self.rows.reset(rows)
+        self.reindex()
+
+    def rollback(self, block: int):
+        self.rows.rollback(block)
+        self.reindex()
+
+    def reindex(self):
+        rows = self.rows.values()
+        by_proposer = {}
+        for row in sorted(rows, key=lambda r: r["id"]):
+            by_proposer.setdefault(row["proposer"], []).append(row["id"])
+        by_id = sorted(row["id"] for row in rows)
+        by_end = sorted((row["endTime"], row["id"]) for row in rows)
+        with self._lock:
+            self._by_id, self._by_proposer, self._by_end = by_id, by_proposer, by_end
+
+    def put(self, row: dict, block: int):
+        known = row["id"] in self.rows
+        self.rows.put(row["id"], row, block)
+        if not known:
+            with self._lock:
+                # New IDs are increasing, so these are normally appends
+                insort(self._by_id, row["id"])
+                insort(self._by_proposer.setdefault(row["proposer"], []), row["id"])
+                insort(self._by_end, (row["endTime"], row["id"]))
+
+    def update(self, proposal_id: int, block: int, **changes):
+        current = self.rows.get(proposal_id)
+        if current is None:
+            return False
+        self.rows.put(proposal_id, dict(current, **changes), block)
+        return True
+
+    # -------- reads --------
+    def get(self, proposal_id: int):
+        row = self.rows.get(proposal_id)
+        return dict(row) if row is not None else None
+
+    def by_proposer(self, proposer: str):
+        with self._lock:
+            ids = list(self._by_proposer.get(proposer, ()))
+        return [dict(self.rows.get(i)) for i in ids if i in self.rows]
+
+    def live_excluding(self, user: str, now: float = None):
+        """
+        Live proposals not created by `user`, in ID order.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            ids = sorted(i for _, i in self._by_end[bisect_right(self._by_end, (now, math.inf)):])
+        rows = (self.rows.get(i) for i in ids)
+        return [dict(r) for r in rows if r is not None and not r["executed"] and r["proposer"] != user]
+
+    def query(self, proposer: str = None, status: str = None, sort: str = "id",
+              descending: bool = True, cursor: str = None, limit: int = 20, now: float = None):
+        """
+        Up to `limit` proposals matching the filters, ordered by `sort`, starting after
+        `cursor`. Returns (rows, next_cursor); next_cursor is None on the last page.
+        """
+        if status is not None and status not in STATUSES:
+            raise ValueError(f"Unknown status: {status}")
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        now = time.time() if now is None else now
+        after = _parse_cursor(cursor, sort)
+        rows = []
+        more = False
+        with self._lock:
+            if sort == "endTime":
+                keys, id_of = self._by_end, lambda key: key[1]
+                # Live/ended proposals are the two sides of `now` on the end-time index
+                split = bisect_right(keys, (now, math.inf))
+                lo, hi = {"live": (split, len(keys)), "ended": (0, split)}.get(status, (0, len(keys)))
+            else:
+                keys = self._by_proposer.get(proposer, []) if proposer else self._by_id
+                id_of = lambda key: key
+                lo, hi = 0, len(keys)
+            if after is not None:
+                if descending:
+                    hi = min(hi, bisect_left(keys, after))
+                else:
+                    lo = max(lo, bisect_right(keys, after))
+            positions = range(hi - 1, lo - 1, -1) if descending else range(lo, hi)
+            for i in positions:
+                row = self.rows.get(id_of(keys[i]))
+                if row is None or (proposer and row["proposer"] != proposer) or \
+                        (status and proposal_status(row, now) != status):
+                    continue
+                if len(rows) == limit:
+                    more = True
+                    break
+                rows.append(dict(row))
+        next_cursor = _cursor(rows[-1], sort) if more and rows else None
+        return rows, next_cursor
+
+
+def _cursor(row: dict, sort: str) -> str:
+    return str(row["id"]) if sort == "id" else f"{row['endTime']}:{row['id']}"
+
+
+def _parse_cursor(cursor: str, sort: str):
+    if cursor is None:
+        return None
+    try:
+        if sort == "id":
+            return int(cursor)
+        end_time, proposal_id = cursor.split(":")
+        return int(end_time), int(proposal_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def fetch_proposals(contract, block_identifier="latest") -> dict:
+    """
+    Every proposal as of `block_identifier`, keyed by ID, in batched RPC round-trips.
+    """
+    total = contract.functions.nextProposalId().call(block_identifier=block_identifier)
+    # The public getter returns an empty struct instead of reverting on unused IDs
+    results = batch_call([contract.functions.proposals(i) for i in range(total)],
+                         block_identifier=block_identifier)
+    rows = (proposal_from_tuple(res) for res in results)
+    return {row["id"]: row for row in rows if row["proposer"] != ZERO_ADDRESS}
+
+
+class ProposalIndex:
+    """
+    ProposalStore kept current from DAO contract events.
+
+    Seeded with every proposal at the indexer's start block; ProposalCreated
+    fetches the new proposal once, Voted adjusts the tallies and ProposalExecuted
+    sets the flag, all journaled per block for reorg rollback.
+    """
+
+    def __init__(self, contract, poll_interval: float = 2.0, confirmations: int = 0):
+        self.contract = contract
+        self.store = ProposalStore()
+        self.indexer = EventIndexer(contract, name="DAO", poll_interval=poll_interval,
+                                    confirmations=confirmations)
+
+        self.indexer.on_seed(self._seed)
+        self.indexer.on_rollback(self._rollback)
+        self.indexer.subscribe("ProposalCreated", self._on_created)
+        self.indexer.subscribe("Voted", self._on_voted)
+        self.indexer.subscribe("ProposalExecuted", self._on_executed)
+
+    @property
+    def ready(self) -> bool:
+        return self.indexer.ready
+
+    def start(self):
+        self.indexer.start()
+
+    def stop(self):
+        self.indexer.stop()
+
+    # -------- indexer callbacks --------
+    def _seed(self, block: int):
+        self.store.reset(fetch_proposals(self.contract, block))
+
+    def _rollback(self, block: int):
+        if not self.store.rows.can_rollback(block):
+            self._seed(block)
+            return
+        self.store.rollback(block)
+
+    def _on_created(self, event):
+        proposal_id = event["args"]["proposalId"]
+        res = self.contract.functions.proposals(proposal_id).call(block_identifier=event["blockNumber"])
+        # Tallies are event-driven from here on
+        self.store.put(dict(proposal_from_tuple(res), yesVotes=0, noVotes=0, executed=False),
+                       event["blockNumber"])
+
+    def _on_voted(self, event):
+        proposal_id = event["args"]["proposalId"]
+        row = self.store.rows.get(proposal_id)
+        if row is None:
+            return
+        field = "yesVotes" if event["args"]["voteType"] == VOTE_YES else "noVotes"
+        self.store.update(proposal_id, event["blockNumber"], **{field: row[field] + 1})
+
+    def _on_executed(self, event):
+        self.store.update(event["args"]["proposalId"], event["blockNumber"], executed=True)
+
+
+def build_proposal_index(contract) -> ProposalIndex:
+    return ProposalIndex(
+        contract,
+        poll_interval=config.INDEXER_POLL_INTERVAL,
+        confirmations=config.INDEXER_CONFIRMATIONS,
+    )
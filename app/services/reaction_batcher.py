@@ -0,0 +1,184 @@
+# app/services/reaction_batcher.py
+import asyncio
+import logging
+import time
+
+from app.services.tx_tracker import tx_tracker, CONFIRMED, FAILED
+
+logger = logging.getLogger(__name__)
+
+# Feed function -> (reaction dimension, direction)
+REACTIONS = {
+    "likePost": ("like", 1),
+    "removeLike": ("like", -1),
+    "dislikePost": ("dislike", 1),
+    "removeDislike": ("dislike", -1),
+}
+# (dimension, direction) -> Feed function
+_ACTIONS = {v: k for k, v in REACTIONS.items()}
+
+
+class _Intent:
+    def __init__(self, post_id: int, action: str, wait: bool):
+        self.post_id = post_id
+        self.action = action
+        self.wait = wait
+        self.future = asyncio.get_running_loop().create_future()
+
+
+class ReactionBatcher:
+    """
+    Coalesces like/dislike requests over a short window before sending transactions.
+
+    All reactions are sent from the server ACCOUNT, so for each (post, like|dislike)
+    pair only the net effect of the window matters: like + removeLike cancels out
+    and like + like is a single like. Net reactions are signed in arrival order and
+    broadcast together through the tx tracker, so a burst costs one nonce and one
+    transaction per net change instead of one per request.
+
+    `build_tx(action, post_id)` is a coroutine returning a signed transaction.
+    Results have the same shape as the unbatched path: {"txHash", "status"} with
+    wait, the tracker record without. A reaction netted away reports no txHash.
+    """
+
+    def __init__(self, build_tx, window: float = 0.25, max_batch: int = 200):
+        self.build_tx = build_tx
+        self.window = window
+        self.max_batch = max_batch
+        self._intents = []
+        self._timer = None
+        self._flushes = set()  # running flush tasks, kept referenced until done
+        self._waiters = set()  # receipt waits of wait=True requests
+
+    async def submit(self, post_id: int, action: str, wait: bool = True) -> dict:
+        if action not in REACTIONS:
+            raise ValueError(f"Unknown reaction: {action}")
+        intent = _Intent(post_id, action, wait)
+        self._intents.append(intent)
+        if len(self._intents) >= self.max_batch:
+            self._schedule_flush(0)
+        elif self._timer is None:
+            self._schedule_flush(self.window)
+        return await intent.future
+
+    def _schedule_flush(self, delay: float):
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = asyncio.get_running_loop().call_later(
+            delay, lambda: self._track(self._flushes, self.flush())
+        )
+
+    @staticmethod
+    def _track(tasks: set, coro):
+        task = asyncio.ensure_future(coro)
+        tasks.add(task)
+        task.add_done_callback(_task_done(tasks))
+        return task
+
+    async def stop(self):
+        """
+        Send anything still queued, wait for running flushes, and fail requests
+        still waiting on a receipt.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+        await self.flush()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+        for task in list(self._waiters):
+            task.cancel()
+        if self._waiters:
+            await asyncio.gather(*self._waiters, return_exceptions=True)
+
+    async def flush(self):
+        intents, self._intents = self._intents, []
+        self._timer = None
+        if not intents:
+            return
+        try:
+            await self._send(intents)
+        except Exception as e:
+            logger.exception("Reaction batch failed: %s", e)
+            for intent in intents:
+                _fail(intent, e)
+
+    async def _send(self, intents):
+        # Group by (post, dimension), ordered by each group's latest request
+        groups = {}
+        for intent in intents:
+            key = (intent.post_id, REACTIONS[intent.action][0])
+            members = groups.pop(key, [])
+            members.append(intent)
+            groups[key] = members
+
+        to_send = []
+        for (post_id, dimension), members in groups.items():
+            net = sum(REACTIONS[i.action][1] for i in members)
+            if net == 0:
+                for intent in members:
+                    _resolve(intent, _netted_result(intent))
+                continue
+            to_send.append((_ACTIONS[(dimension, 1 if net > 0 else -1)], post_id, members))
+
+        # Sign sequentially so nonces follow request order, then broadcast together
+        signed = []
+        for action, post_id, members in to_send:
+            try:
+                signed.append((await self.build_tx(action, post_id), members))
+            except Exception as e:
+                for intent in members:
+                    _fail(intent, e)
+        results = await asyncio.gather(
+            *(tx_tracker.submit(tx) for tx, _ in signed), return_exceptions=True
+        )
+        for (_, members), record in zip(signed, results):
+            if isinstance(record, Exception):
+                for intent in members:
+                    _fail(intent, record)
+                continue
+            for intent in members:
+                if intent.wait:
+                    self._track(self._waiters, _resolve_on_receipt(intent, record["txHash"]))
+                else:
+                    _resolve(intent, record)
+        logger.debug("Reaction batch: %s requests -> %s transactions", len(intents), len(signed))
+
+
+def _task_done(tasks: set):
+    def done(task):
+        tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Reaction batch task failed: %s", task.exception())
+    return done
+
+
+def _netted_result(intent: _Intent) -> dict:
+    # Nothing to send: a settled result with no transaction
+    if intent.wait:
+        return {"txHash": None, "status": 1}
+    return {"txHash": None, "state": CONFIRMED, "status": 1, "blockNumber": None,
+            "submittedAt": int(time.time())}
+
+
+def _resolve(intent: _Intent, result: dict):
+    if not intent.future.done():
+        intent.future.set_result(result)
+
+
+def _fail(intent: _Intent, error: Exception):
+    if not intent.future.done():
+        intent.future.set_exception(error)
+
+
+async def _resolve_on_receipt(intent: _Intent, tx_hash: str):
+    try:
+        record = await tx_tracker.wait(tx_hash)
+        if record["state"] not in (CONFIRMED, FAILED):
+            raise TimeoutError(f"Transaction {tx_hash} not mined in time")
+        # Same format as receipt.transactionHash.hex() on the unbatched path
+        _resolve(intent, {"txHash": tx_hash.removeprefix("0x"), "status": record["status"]})
+    except asyncio.CancelledError:
+        _fail(intent, RuntimeError(f"Stopped waiting for transaction {tx_hash}"))
+        raise
+    except Exception as e:
+        _fail(intent, e)
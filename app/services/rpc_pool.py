@@ -0,0 +1,229 @@
+# app/services/rpc_pool.py
+import asyncio
+import json
+import logging
+import random
+import threading
+import time
+
+import aiohttp
+import requests
+from web3 import AsyncHTTPProvider, HTTPProvider
+from web3.exceptions import ProviderConnectionError, TimeExhausted
+
+logger = logging.getLogger(__name__)
+
+# Methods that must hit the same node every time, so the pending nonce the node
+# reports always includes the transactions we broadcast through it
+WRITE_METHODS = {"eth_sendRawTransaction", "eth_sendTransaction", "eth_getTransactionCount"}
+
+# Transport-level failures, i.e. the node (not the request) is at fault: connection
+# errors, timeouts, HTTP error statuses and bodies that are not JSON at all. Reverts
+# and bad input come back as JSON-RPC error responses and never count against a node.
+NODE_ERRORS = (OSError, requests.RequestException, aiohttp.ClientError, asyncio.TimeoutError,
+               json.JSONDecodeError, ProviderConnectionError, TimeExhausted)
+
+
+class Endpoint:
+    def __init__(self, url: str):
+        self.url = url
+        self.latency = None  # EWMA of successful request latency, seconds
+        self.error_rate = 0.0  # EWMA of failures per request
+        self.failures = 0  # consecutive failures
+        self.ejections = 0  # consecutive ejections, for the cooldown backoff
+        self.ejected_until = 0.0
+        self.requests = 0
+
+    def available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+    @property
+    def score(self) -> float:
+        # Unmeasured nodes score 0 so they get tried (and measured) first, unless
+        # all they have done so far is fail
+        if self.latency is None:
+            return float("inf") if self.error_rate else 0.0
+        return self.latency * (1 + 10 * self.error_rate)
+
+    def as_dict(self, now: float) -> dict:
+        return {
+            "url": self.url,
+            "latencyMs": round(self.latency * 1000, 1) if self.latency is not None else None,
+            "errorRate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "ejected": not self.available(now),
+        }
+
+
+class EndpointPool:
+    """
+    Health-scored set of RPC endpoints shared by the sync and async providers.
+
+    Reads go to the healthy node with the best score (latency EWMA inflated by the
+    error-rate EWMA), with a small `explore` share sent elsewhere to keep every
+    node's score current. Writes stick to one pinned node until it is ejected.
+    `eject_after` consecutive failures eject a node for a cooldown that doubles on
+    every repeated ejection; once it expires the node is tried again, and a single
+    failure while on probation ejects it again.
+    """
+
+    def __init__(self, urls, eject_after: int = 3, cooldown: float = 10, max_cooldown: float = 300,
+                 explore: float = 0.05, alpha: float = 0.2, on_write_change=None):
+        if not urls:
+            raise ValueError("At least one RPC URL is required")
+        self.endpoints = [Endpoint(url) for url in urls]
+        self.eject_after = eject_after
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.explore = explore
+        self.alpha = alpha
+        self.on_write_change = on_write_change
+        self._write = None
+        self._lock = threading.Lock()
+
+    # -------- routing --------
+    def read_order(self):
+        """
+        Endpoints to try for a read, best first; ejected nodes only as a last resort.
+        """
+        now = time.monotonic()
+        with self._lock:
+            healthy = sorted((e for e in self.endpoints if e.available(now)), key=lambda e: e.score)
+            ejected = sorted((e for e in self.endpoints if not e.available(now)),
+                             key=lambda e: e.ejected_until)
+        if len(healthy) > 1 and random.random() < self.explore:
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        return healthy + ejected
+
+    def write_order(self):
+        """
+        The pinned write node first, then the remaining nodes in configured order.
+        """
+        now = time.monotonic()
+        previous = changed = None
+        with self._lock:
+            if self._write is None or not self._write.available(now):
+                # Prefer configured order so every worker converges on the same node
+                candidates = [e for e in self.endpoints if e.available(now)] or self.endpoints
+                if candidates[0] is not self._write:
+                    previous, changed = self._write, candidates[0]
+                    self._write = changed
+            pinned = self._write
+        if changed is not None:
+            logger.info("RPC writes pinned to %s", changed.url)
+            if previous is not None and self.on_write_change is not None:
+                self.on_write_change(changed.url)
+        return [pinned] + [e for e in self.endpoints if e is not pinned]
+
+    def order_for(self, methods):
+        if any(method in WRITE_METHODS for method in methods):
+            return self.write_order()
+        return self.read_order()
+
+    # -------- health --------
+    def record_success(self, endpoint: Endpoint, latency: float):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.latency = latency if endpoint.latency is None else \
+                endpoint.latency + self.alpha * (latency - endpoint.latency)
+            endpoint.error_rate *= 1 - self.alpha
+            if endpoint.failures >= self.eject_after:
+                logger.info("RPC endpoint %s re-admitted", endpoint.url)
+            endpoint.failures = 0
+            endpoint.ejections = 0
+
+    def record_failure(self, endpoint: Endpoint, error: Exception):
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.error_rate += self.alpha * (1 - endpoint.error_rate)
+            endpoint.failures += 1
+            if endpoint.failures < self.eject_after:
+                return
+            cooldown = min(self.max_cooldown, self.cooldown * 2 ** endpoint.ejections)
+            endpoint.ejections += 1
+            endpoint.ejected_until = time.monotonic() + cooldown
+        logger.warning("RPC endpoint %s ejected for %.0fs: %s", endpoint.url, cooldown, error)
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            pinned = self._write
+            return [dict(e.as_dict(now), writes=e is pinned) for e in self.endpoints]
+
+
+class MultiHTTPProvider(HTTPProvider):
+    """
+    Sync web3 provider that fails over between the endpoints of an EndpointPool,
+    each with its own pooled HTTP session.
+    """
+
+    def __init__(self, pool: EndpointPool, timeout: float = 10, max_attempts: int = 3, **kwargs):
+        super().__init__(pool.endpoints[0].url, **kwargs)
+        self.pool = pool
+        self.max_attempts = max_attempts
+        # Failover replaces web3's own same-node retries
+        self._providers = {
+            e.url: HTTPProvider(e.url, request_kwargs={"timeout": timeout},
+                                exception_retry_configuration=None)
+            for e in pool.endpoints
+        }
+
+    def _send(self, methods, send):
+        error = None
+        for endpoint in self.pool.order_for(methods)[:self.max_attempts]:
+            started = time.perf_counter()
+            try:
+                response = send(self._providers[endpoint.url])
+            except NODE_ERRORS as e:
+                self.pool.record_failure(endpoint, e)
+                error = e
+                continue
+            self.pool.record_success(endpoint, time.perf_counter() - started)
+            return response
+        raise error
+
+    def make_request(self, method, params):
+        return self._send((method,), lambda p: p.make_request(method, params))
+
+    def make_batch_request(self, batch_requests):
+        return self._send([m for m, _ in batch_requests], lambda p: p.make_batch_request(batch_requests))
+
+
+class AsyncMultiHTTPProvider(AsyncHTTPProvider):
+    """
+    Async counterpart of MultiHTTPProvider.
+    """
+
+    def __init__(self, pool: EndpointPool, timeout: float = 10, max_attempts: int = 3, **kwargs):
+        super().__init__(pool.endpoints[0].url, **kwargs)
+        self.pool = pool
+        self.max_attempts = max_attempts
+        self._providers = {
+            e.url: AsyncHTTPProvider(e.url, request_kwargs={"timeout": aiohttp.ClientTimeout(total=timeout)},
+                                     exception_retry_configuration=None)
+            for e in pool.endpoints
+        }
+
+    async def _send(self, methods, send):
+        error = None
+        for endpoint in self.pool.order_for(methods)[:self.max_attempts]:
+            started = time.perf_counter()
+            try:
+                response = await send(self._providers[endpoint.url])
+            except NODE_ERRORS as e:
+                self.pool.record_failure(endpoint, e)
+                error = e
+                continue
+            self.pool.record_success(endpoint, time.perf_counter() - started)
+            return response
+        raise error
+
+    async def make_request(self, method, params):
+        return await self._send((method,), lambda p: p.make_request(method, params))
+
+    async def make_batch_request(self, batch_requests):
+        return await self._send([m for m, _ in batch_requests], lambda p: p.make_batch_request(batch_requests))
+
+    async def disconnect(self):
+        for provider in self._providers.values():
+            await provider.disconnect()
@@ -0,0 +1,270 @@
+# app/services/streak_projection.py
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from app import config
+from app.services.web3_utils import batch_call
+
+logger = logging.getLogger(__name__)
+
+# Days the contract exposes through getLast7DaysStatus (index 0 = today)
+CHAIN_HISTORY_DAYS = 7
+
+
+class StreakState:
+    """
+    One user's completions as a day bitset: bit k set = day (last_day - k) completed.
+    `run` is the length of the completed run ending at last_day, so streaks longer
+    than the bitset stay exact.
+    """
+
+    __slots__ = ("last_day", "bits", "run")
+
+    def __init__(self, last_day: int, bits: int, run: int):
+        self.last_day = last_day
+        self.bits = bits
+        self.run = run
+
+    @classmethod
+    def from_chain(cls, day: int, streak: int, status, width: int):
+        bits = 0
+        for k, done in enumerate(status):
+            if done:
+                bits |= 1 << k
+        run_bits = (1 << min(streak, width)) - 1
+        if status[0]:
+            return cls(day, bits | run_bits, streak)
+        if streak and status[1]:
+            # Still alive from yesterday: the run ends one day back
+            return cls(day - 1, (bits >> 1) | run_bits, streak)
+        return cls(day, bits, streak)
+
+    def record(self, day: int, width: int):
+        if day > self.last_day:
+            self.run = self.run + 1 if day == self.last_day + 1 and self.bits & 1 else 1
+            self.bits = ((self.bits << (day - self.last_day)) | 1) & ((1 << width) - 1)
+            self.last_day = day
+        elif day == self.last_day and not self.bits & 1:
+            # First completion of last_day (seeded before it happened): the run
+            # is whatever ended yesterday plus today
+            prior = 0
+            while prior + 1 < width and self.bits >> (prior + 1) & 1:
+                prior += 1
+            self.run = prior + 1
+            self.bits |= 1
+        elif self.last_day - day < width:
+            # Same day again (or an older one, e.g. after a reseed): just set the bit
+            self.bits |= 1 << (self.last_day - day)
+
+    def streak(self, today: int) -> int:
+        # A run ending yesterday is still alive; one ending earlier is broken
+        return self.run if self.bits & 1 and self.last_day >= today - 1 else 0
+
+    def history(self, today: int, days: int):
+        shift = today - self.last_day
+        bits = self.bits << shift if shift >= 0 else self.bits >> -shift
+        return [bool(bits >> k & 1) for k in range(days)]
+
+
+def read_streaks(contract, addresses, block_identifier="latest"):
+    """
+    Current day plus (getCurrentStreak, getLast7DaysStatus) per address, in batched
+    RPC round-trips.
+    """
+    fns = contract.functions
+    results = batch_call(
+        [fns.getCurrentDay()]
+        + [fns.getCurrentStreak(a) for a in addresses]
+        + [fns.getLast7DaysStatus(a) for a in addresses],
+        block_identifier=block_identifier,
+    )
+    n = len(addresses)
+    return results[0], {a: (results[1 + i], results[1 + n + i]) for i, a in enumerate(addresses)}
+
+
+def _chain_view(state: StreakState, day: int):
+    # What getCurrentStreak / getLast7DaysStatus would return for this state
+    return state.streak(day), state.history(day, CHAIN_HISTORY_DAYS)
+
+
+class StreakProjection:
+    """
+    Local projection of Streak contract state, so streak reads cost no RPC.
+
+    The Streak contract emits no events, so there are no logs to follow. Users are
+    tracked from the first time they are asked about (seeded from a head-state
+    read), and every poll reads the current day plus the next `refresh_batch`
+    tracked users in rotation, at the latest block. A user whose chain state is one
+    completion ahead is advanced with StreakState.record, keeping history beyond
+    the 7 days the contract exposes; any other difference reseeds them. Day
+    rollover is a shift at read time, so a new day costs one getCurrentDay read.
+
+    Nothing is read at past blocks, so any node serves it. A completion shows up
+    within (tracked users / refresh_batch) polls.
+    """
+
+    def __init__(self, contract, poll_interval: float = 2.0, max_users: int = 100000,
+                 history_days: int = 64, refresh_batch: int = 500):
+        self.contract = contract
+        self.poll_interval = poll_interval
+        self.max_users = max_users
+        self.history_days = history_days
+        self.refresh_batch = refresh_batch
+
+        self.day = None  # contract day at the last poll
+        self._synced_at = None
+        self._change_listeners = []
+        self._day_listeners = []
+        self._users = OrderedDict()  # checksum address -> StreakState, LRU
+        self._lock = threading.Lock()
+        self._refresh_pos = 0
+        self.refreshed = 0  # users changed by refreshes
+
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -------- reads --------
+    @property
+    def ready(self) -> bool:
+        # Stale when polling has stopped keeping up
+        return self._synced_at is not None and \
+            time.monotonic() - self._synced_at < 3 * self.poll_interval + 10
+
+    # -------- listeners --------
+    def on_change(self, listener):
+        """
+        `listener(address, state)` after a user's StreakState changes; state is None
+        when the user is evicted. Called under the projection lock, in order.
+        """
+        self._change_listeners.append(listener)
+        return listener
+
+    def on_day(self, listener):
+        """
+        `listener(day)` whenever the contract day advances.
+        """
+        self._day_listeners.append(listener)
+        return listener
+
+    def _notify_locked(self, address: str, state):
+        for listener in self._change_listeners:
+            try:
+                listener(address, state)
+            except Exception as e:
+                logger.exception("Streak change listener failed: %s", e)
+
+    def _set_day(self, day: int):
+        with self._lock:
+            changed = day != self.day
+            self.day = day
+        if changed:
+            for listener in self._day_listeners:
+                try:
+                    listener(day)
+                except Exception as e:
+                    logger.exception("Streak day listener failed: %s", e)
+
+    def lookup(self, addresses, days: int = CHAIN_HISTORY_DAYS) -> dict:
+        """
+        {address: {"streak", "history"}} for the tracked addresses among `addresses`.
+        """
+        result = {}
+        with self._lock:
+            today = self.day
+            for address in addresses:
+                state = self._users.get(address)
+                if state is None:
+                    continue
+                self._users.move_to_end(address)
+                result[address] = {"streak": state.streak(today), "history": state.history(today, days)}
+        return result
+
+    def seed(self, day: int, rows: dict):
+        """
+        Track users from chain reads taken at contract day `day`:
+        rows is {address: (getCurrentStreak, getLast7DaysStatus)}.
+        """
+        with self._lock:
+            for address, (streak, status) in rows.items():
+                state = self._users[address] = StreakState.from_chain(day, streak, status, self.history_days)
+                self._users.move_to_end(address)
+                self._notify_locked(address, state)
+            while len(self._users) > self.max_users:
+                self._notify_locked(self._users.popitem(last=False)[0], None)
+
+    def apply(self, day: int, rows: dict) -> int:
+        """
+        Bring tracked users in line with chain reads taken at contract day `day`
+        (rows as in seed(); untracked users are skipped). Returns how many changed.
+        """
+        changed = 0
+        with self._lock:
+            for address, (streak, status) in rows.items():
+                state = self._users.get(address)
+                chain = (streak, list(status))
+                if state is None or _chain_view(state, day) == chain:
+                    continue
+                advanced = StreakState(state.last_day, state.bits, state.run)
+                advanced.record(day, self.history_days)
+                if _chain_view(advanced, day) != chain:
+                    advanced = StreakState.from_chain(day, streak, status, self.history_days)
+                self._users[address] = advanced
+                self._notify_locked(address, advanced)
+                changed += 1
+        return changed
+
+    def stats(self) -> dict:
+        return {"day": self.day, "users": len(self._users), "ready": self.ready,
+                "refreshed": self.refreshed}
+
+    # -------- polling --------
+    def refresh_once(self) -> int:
+        """
+        Read the current day and the next batch of tracked users at the head.
+        Returns how many users changed.
+        """
+        with self._lock:
+            users = list(self._users)
+        self._refresh_pos = self._refresh_pos % len(users) if users else 0
+        batch = users[self._refresh_pos:self._refresh_pos + self.refresh_batch]
+        self._refresh_pos += len(batch)
+
+        day, rows = read_streaks(self.contract, batch)
+        self._set_day(day)
+        changed = self.apply(day, rows)
+        self.refreshed += changed
+        self._synced_at = time.monotonic()
+        return changed
+
+    # -------- background loop --------
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_once()
+            except Exception as e:
+                logger.exception("Streak projection poll failed: %s", e)
+            self._stop.wait(self.poll_interval)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="Streak-projection", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.poll_interval + 1)
+
+
+def build_streak_projection(contract) -> StreakProjection:
+    return StreakProjection(
+        contract,
+        poll_interval=config.INDEXER_POLL_INTERVAL,
+        max_users=config.STREAK_PROJECTION_SIZE,
+        history_days=config.STREAK_HISTORY_DAYS,
+        refresh_batch=config.STREAK_REFRESH_BATCH,
+    )
@@ -1,36 +1,130 @@
 # app/services/streak_service.py
+import asyncio
+import logging
+
 from web3 import Web3
-from app.services.web3_utils import get_contract, build_signed_tx, send_signed_transaction
 from app import config
+from app.services.web3_utils import (
+    contract, async_contract, async_build_signed_tx, async_send_signed_transaction,
+    async_batch_call,
+)
+from app.services.tx_tracker import tx_tracker, CONFIRMED
+from app.services.view_cache import cached_view, BLOCK
+from app.services.streak_projection import (
+    CHAIN_HISTORY_DAYS, StreakState, build_streak_projection, read_streaks,
+)
+from app.services.leaderboard import StreakLeaderboard
+
+logger = logging.getLogger(__name__)
+
+streak_contract = contract("Streak")
+async_streak_contract = async_contract("Streak")
+
+# Per-user day bitsets refreshed from head-state reads; reads fall back to RPC until it is polling
+streak_projection = build_streak_projection(streak_contract)
+
+# Live streaks ranked incrementally from the projection's updates
+streak_leaderboard = StreakLeaderboard()
+streak_projection.on_change(streak_leaderboard.update)
+
+
+@streak_projection.on_day
+def _revalidate_and_rollover(day: int):
+    """
+    Re-read users whose streak is due to break at the head before expiring them:
+    the projection may have stopped tracking them, and completions it didn't see
+    keep their streak alive.
+    """
+    due = streak_leaderboard.expiring(day)
+    if due:
+        try:
+            day, rows = read_streaks(streak_contract, due)
+        except Exception as e:
+            # Expire them anyway; tracked users come back on their next refresh
+            logger.warning("Streak leaderboard revalidation failed: %s", e)
+            rows = {}
+        for address, (streak, status) in rows.items():
+            streak_leaderboard.update(
+                address, StreakState.from_chain(day, streak, status, streak_projection.history_days))
+        streak_projection.apply(day, rows)
+    streak_leaderboard.rollover(day)
+
+
+def _projected_reads() -> bool:
+    if not config.STREAK_PROJECTION_ENABLED:
+        return False
+    streak_projection.start()
+    return streak_projection.ready
+
+
+# Streaks depend on the block timestamp (day rollover), so they're cached per block
+@cached_view("Streak", BLOCK)
+async def _read_current_streak(user_address: str):
+    return await async_streak_contract.functions.getCurrentStreak(user_address).call()
 
-STREAK_ADDRESS = config.STREAK_ADDRESS
-streak_contract = get_contract(STREAK_ADDRESS, "Streak")
+
+@cached_view("Streak", BLOCK)
+async def _read_last_7_days_status(user_address: str):
+    return await async_streak_contract.functions.getLast7DaysStatus(user_address).call()
 
 
 # ----------------- COMPLETE TASK -----------------
-def complete_task(user_address: str):
+_refresh_tasks = set()  # post-confirmation refreshes of wait=False completions
+
+
+async def _refresh_user(user_address: str):
+    """
+    Re-read a user at the head into the projection, rather than leaving the change
+    to their next turn in the refresh rotation.
+    """
+    if not config.STREAK_PROJECTION_ENABLED:
+        return
+    try:
+        day, rows = await _read_streaks([user_address])
+        streak_projection.apply(day, rows)
+    except Exception as e:
+        logger.warning("Streak refresh of %s failed: %s", user_address, e)
+
+
+async def _refresh_when_mined(tx_hash: str, user_address: str):
+    record = await tx_tracker.wait(tx_hash)
+    if record is not None and record["state"] == CONFIRMED:
+        await _refresh_user(user_address)
+
+
+async def complete_task(user_address: str, wait: bool = True):
     """
     Marks today's task as completed for the given user.
     """
     try:
         # Convert address to checksum (optional, for consistency)
-        Web3.to_checksum_address(user_address)
+        user_address = Web3.to_checksum_address(user_address)
 
-        fn = streak_contract.functions.completeTask()  # no extra parameters
-        signed = build_signed_tx(fn)  # remove user_address argument
-        receipt = send_signed_transaction(signed)
+        fn = async_streak_contract.functions.completeTask()  # no extra parameters
+        signed = await async_build_signed_tx(fn)  # remove user_address argument
+        if not wait:
+            record = await tx_tracker.submit(signed)
+            task = asyncio.ensure_future(_refresh_when_mined(record["txHash"], user_address))
+            _refresh_tasks.add(task)
+            task.add_done_callback(_refresh_tasks.discard)
+            return record
+        receipt = await async_send_signed_transaction(signed)
+        if receipt.status == 1:
+            await _refresh_user(user_address)
         return {"txHash": receipt.transactionHash.hex(), "status": receipt.status}
     except Exception as e:
         raise e
     
 # ----------------- GET CURRENT STREAK -----------------
-def get_current_streak(user_address: str):
+async def get_current_streak(user_address: str):
     """
     Returns the current streak count for the given user.
     """
     try:
         user_address = Web3.to_checksum_address(user_address)
-        streak = streak_contract.functions.getCurrentStreak(user_address).call()
+        if _projected_reads():
+            return (await get_streaks([user_address]))[user_address]["streak"]
+        streak = await _read_current_streak(user_address)
         return streak
     except Exception as e:
         if "checksum" in str(e):
@@ -39,15 +133,101 @@ def get_current_streak(user_address: str):
 
 
 # ----------------- GET LAST 7 DAYS STATUS -----------------
-def get_last_7_days_status(user_address: str):
+async def get_last_7_days_status(user_address: str):
     """
     Returns a boolean array representing completion status for the last 7 days.
     """
     try:
         user_address = Web3.to_checksum_address(user_address)
-        status = streak_contract.functions.getLast7DaysStatus(user_address).call()
+        if _projected_reads():
+            return (await get_streaks([user_address]))[user_address]["history"]
+        status = await _read_last_7_days_status(user_address)
         return status
     except Exception as e:
         if "checksum" in str(e):
             raise ValueError("Invalid address format. Please provide a valid checksum address.")
         raise e
+
+
+# ----------------- BULK STREAKS -----------------
+async def _read_streaks(addresses):
+    """
+    Current day plus streak and 7-day status of each address, in batched RPC round-trips.
+    """
+    fns = async_streak_contract.functions
+    results = await async_batch_call(
+        [fns.getCurrentDay()]
+        + [fns.getCurrentStreak(a) for a in addresses]
+        + [fns.getLast7DaysStatus(a) for a in addresses]
+    )
+    n = len(addresses)
+    return results[0], {a: (results[1 + i], results[1 + n + i]) for i, a in enumerate(addresses)}
+
+
+async def get_streaks(addresses, days: int = CHAIN_HISTORY_DAYS):
+    """
+    {checksum address: {"streak": int, "history": [bool] * days}} for many users.
+    history[0] is today. Users the projection already tracks cost no RPC; the rest
+    are read in one batch and tracked from then on. Beyond the 7 days the contract
+    exposes, history only holds days known from the streak length or seen locally.
+    """
+    try:
+        addresses = list(dict.fromkeys(Web3.to_checksum_address(a) for a in addresses))
+        projected = _projected_reads()
+        result = streak_projection.lookup(addresses, days) if projected else {}
+        missing = [a for a in addresses if a not in result]
+        if missing:
+            day, rows = await _read_streaks(missing)
+            if projected:
+                streak_projection.seed(day, rows)
+                result.update(streak_projection.lookup(missing, days))
+            else:
+                for a, (streak, status) in rows.items():
+                    history = list(status)[:days]
+                    result[a] = {"streak": streak, "history": history + [False] * (days - len(history))}
+        return {a: result[a] for a in addresses}
+    except Exception as e:
+        if "checksum" in str(e):
+            raise ValueError("Invalid address format. Please provide a valid checksum address.")
+        raise e
+
+
+# ----------------- LEADERBOARD -----------------
+# The Streak contract emits no events and can't enumerate users, so the leaderboard
+# only ranks users this service has seen (read through any streak endpoint or
+# completed a task through it). Responses say so in "scope".
+LEADERBOARD_SCOPE = "tracked"
+
+
+def _require_leaderboard():
+    if not _projected_reads():
+        raise RuntimeError("Streak leaderboard is still syncing, try again shortly")
+
+
+async def get_leaderboard(offset: int = 0, limit: int = 50):
+    """
+    A page of tracked users with a live streak, longest first; tied users share a rank.
+    """
+    _require_leaderboard()
+    entries = streak_leaderboard.page(offset, limit)
+    total = len(streak_leaderboard)
+    next_offset = offset + len(entries) if offset + len(entries) < total else None
+    return {"entries": entries, "total": total, "next_offset": next_offset, "scope": LEADERBOARD_SCOPE}
+
+
+async def get_leaderboard_rank(user_address: str):
+    """
+    Rank and streak of one user among tracked users; rank is None without a live
+    streak. A user seen for the first time is read and ranked from then on.
+    """
+    try:
+        user_address = Web3.to_checksum_address(user_address)
+    except Exception:
+        raise ValueError("Invalid address format. Please provide a valid checksum address.")
+    _require_leaderboard()
+    entry = streak_leaderboard.rank(user_address)
+    if entry is None:
+        # Users the projection doesn't track yet are read (and tracked) once
+        streak = (await get_streaks([user_address]))[user_address]["streak"]
+        entry = streak_leaderboard.rank(user_address) or {"rank": None, "address": user_address, "streak": streak}
+    return dict(entry, scope=LEADERBOARD_SCOPE)
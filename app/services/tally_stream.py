@@ -0,0 +1,152 @@
+# app/services/tally_stream.py
+import asyncio
+import threading
+from collections import deque
+from contextlib import asynccontextmanager
+
+from app.services.proposal_index import ProposalIndex
+
+_TALLY_FIELDS = ("yesVotes", "noVotes", "executed")
+
+
+class Subscription:
+    """
+    One viewer's queue of tally messages. When a slow viewer falls `maxsize`
+    messages behind, the backlog is replaced by a single `snapshot` of the
+    proposal's current state (from `snapshot()`), so the viewer resyncs instead
+    of silently missing votes.
+    """
+
+    def __init__(self, proposal_id: int, loop, maxsize: int = 256, snapshot=None):
+        self.proposal_id = proposal_id
+        self.loop = loop
+        self.maxsize = maxsize
+        self.overflows = 0
+        self._snapshot = snapshot
+        self._messages = deque()
+        self._ready = asyncio.Event()
+
+    def push(self, message: dict):
+        if len(self._messages) >= self.maxsize:
+            self.overflows += 1
+            data = self._snapshot() if self._snapshot is not None else None
+            if data is not None:
+                # The store already includes `message`, so the snapshot covers it too
+                self._messages.clear()
+                message = {"event": "snapshot", "data": data}
+            else:
+                self._messages.popleft()
+        self._messages.append(message)
+        self._ready.set()
+
+    async def get(self, timeout: float = None):
+        """
+        Next message, or None if none arrived within `timeout` seconds.
+        """
+        if not self._messages:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        return self._messages.popleft()
+
+
+class TallyHub:
+    """
+    Fans DAO vote tallies out to live subscribers.
+
+    Rides on the proposal index's event indexer, so the whole process follows
+    Voted / ProposalExecuted logs once however many viewers are connected. The
+    index applies each event first; the hub then pushes the event with the
+    updated totals to the subscribers of that proposal. After a reorg or reseed
+    every watched proposal gets a fresh snapshot instead, and so does a single
+    viewer whose queue overflows.
+    """
+
+    def __init__(self, index: ProposalIndex, queue_size: int = 256):
+        self.index = index
+        self.queue_size = queue_size
+        self._subscribers = {}  # proposal ID -> set of Subscription
+        self._lock = threading.Lock()
+
+        # Registered after the index's own handlers, so the store is already updated
+        index.indexer.subscribe("Voted", self._on_voted)
+        index.indexer.subscribe("ProposalExecuted", self._on_executed)
+        index.indexer.on_rollback(self._resnapshot)
+        index.indexer.on_seed(self._resnapshot)
+
+    # -------- subscribers --------
+    @asynccontextmanager
+    async def subscribe(self, proposal_id: int):
+        self.index.start()
+        subscription = Subscription(proposal_id, asyncio.get_running_loop(), self.queue_size,
+                                    snapshot=lambda: self.index.store.get(proposal_id))
+        with self._lock:
+            self._subscribers.setdefault(proposal_id, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(proposal_id)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[proposal_id]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "proposals": len(self._subscribers),
+                "subscribers": sum(len(s) for s in self._subscribers.values()),
+            }
+
+    # -------- publishing (indexer thread) --------
+    def _publish(self, proposal_id: int, event: str, data: dict):
+        with self._lock:
+            subscribers = self._subscribers.get(proposal_id)
+            loops = {s.loop for s in subscribers} if subscribers else ()
+        message = {"event": event, "data": data}
+        # One hop per event loop, not per viewer
+        for loop in loops:
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(self._fan_out, loop, proposal_id, message)
+
+    def _fan_out(self, loop, proposal_id: int, message: dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(proposal_id, ()))
+        for subscription in subscribers:
+            if subscription.loop is loop:
+                subscription.push(message)
+
+    def _tally(self, proposal_id: int):
+        row = self.index.store.get(proposal_id)
+        if row is None:
+            return None
+        return {"proposalId": proposal_id, **{field: row[field] for field in _TALLY_FIELDS}}
+
+    def _on_voted(self, event):
+        proposal_id = event["args"]["proposalId"]
+        tally = self._tally(proposal_id)
+        if tally is None:
+            return
+        self._publish(proposal_id, "vote", dict(
+            tally,
+            voter=event["args"]["voter"],
+            voteType=event["args"]["voteType"],
+            blockNumber=event["blockNumber"],
+        ))
+
+    def _on_executed(self, event):
+        proposal_id = event["args"]["proposalId"]
+        tally = self._tally(proposal_id)
+        if tally is not None:
+            self._publish(proposal_id, "executed", dict(tally, blockNumber=event["blockNumber"]))
+
+    def _resnapshot(self, block: int):
+        with self._lock:
+            watched = list(self._subscribers)
+        for proposal_id in watched:
+            row = self.index.store.get(proposal_id)
+            if row is not None:
+                self._publish(proposal_id, "snapshot", row)
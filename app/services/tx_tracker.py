@@ -0,0 +1,149 @@
+# app/services/tx_tracker.py
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+
+from app import config
+from app.services.web3_utils import aw3, async_broadcast
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+CONFIRMED = "confirmed"
+FAILED = "failed"
+TIMEOUT = "timeout"
+
+
+class TxTracker:
+    """
+    Tracks transactions submitted without waiting for their receipt.
+
+    A single background task polls every pending hash in one JSON-RPC batch of
+    eth_getTransactionReceipt per round, updates the tracked records and notifies
+    subscribers (e.g. the /tx SSE stream) whenever a record changes.
+    """
+
+    def __init__(self, poll_interval: float = 2.0, timeout: float = 600, max_records: int = 10000):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.max_records = max_records
+        self._records = OrderedDict()  # tx hash -> record
+        self._subscribers = {}  # tx hash -> set of asyncio.Queue
+        self._task = None
+
+    # -------- records --------
+    def _store(self, record: dict):
+        tx_hash = record["txHash"]
+        self._records[tx_hash] = record
+        self._records.move_to_end(tx_hash)
+        while len(self._records) > self.max_records:
+            oldest, old_record = next(iter(self._records.items()))
+            if old_record["state"] == PENDING:
+                break
+            del self._records[oldest]
+        for queue in self._subscribers.get(tx_hash, ()):
+            queue.put_nowait(dict(record))
+
+    def get(self, tx_hash: str):
+        record = self._records.get(_normalize(tx_hash))
+        return dict(record) if record is not None else None
+
+    def pending_hashes(self):
+        return [h for h, r in self._records.items() if r["state"] == PENDING]
+
+    # -------- submission --------
+    async def submit(self, signed_tx) -> dict:
+        """
+        Broadcast a signed transaction and start tracking it; returns immediately.
+        """
+        tx_hash = _normalize((await async_broadcast(signed_tx)).hex())
+        self._store({
+            "txHash": tx_hash,
+            "state": PENDING,
+            "status": None,
+            "blockNumber": None,
+            "submittedAt": int(time.time()),
+        })
+        self.start()
+        return self.get(tx_hash)
+
+    # -------- subscriptions --------
+    def subscribe(self, tx_hash: str) -> asyncio.Queue:
+        queue = asyncio.Queue()
+        self._subscribers.setdefault(_normalize(tx_hash), set()).add(queue)
+        return queue
+
+    def unsubscribe(self, tx_hash: str, queue: asyncio.Queue):
+        tx_hash = _normalize(tx_hash)
+        queues = self._subscribers.get(tx_hash)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[tx_hash]
+
+    async def wait(self, tx_hash: str, timeout: float = None) -> dict:
+        """
+        Wait until a tracked transaction leaves the pending state; returns its record.
+        """
+        queue = self.subscribe(tx_hash)
+        try:
+            record = self.get(tx_hash)
+            while record is not None and record["state"] == PENDING:
+                record = await asyncio.wait_for(queue.get(), timeout or self.timeout)
+            return record
+        finally:
+            self.unsubscribe(tx_hash, queue)
+
+    # -------- polling --------
+    async def poll_once(self):
+        pending = self.pending_hashes()
+        chunk_size = config.BATCH_CALL_CHUNK_SIZE
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start:start + chunk_size]
+            responses = await aw3.provider.make_batch_request(
+                [("eth_getTransactionReceipt", [h]) for h in chunk]
+            )
+            if not isinstance(responses, list):
+                # Whole batch rejected (single error object), retry next round
+                logger.warning("Receipt batch failed: %s", responses)
+                continue
+            responses = sorted(responses, key=lambda r: r.get("id") or 0)
+            now = time.time()
+            for tx_hash, response in zip(chunk, responses):
+                record = self._records.get(tx_hash)
+                if record is None:
+                    continue
+                receipt = response.get("result")
+                if receipt:
+                    status = int(receipt["status"], 16)
+                    self._store({
+                        **record,
+                        "state": CONFIRMED if status == 1 else FAILED,
+                        "status": status,
+                        "blockNumber": int(receipt["blockNumber"], 16),
+                    })
+                elif now - record["submittedAt"] > self.timeout:
+                    self._store({**record, "state": TIMEOUT})
+
+    async def _run(self):
+        while self.pending_hashes():
+            try:
+                await self.poll_once()
+            except Exception as e:
+                logger.exception("Receipt polling failed: %s", e)
+            await asyncio.sleep(self.poll_interval)
+        self._task = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+
+def _normalize(tx_hash: str) -> str:
+    tx_hash = tx_hash.lower()
+    return tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash
+
+
+tx_tracker = TxTracker(poll_interval=config.TX_POLL_INTERVAL, timeout=config.TX_TIMEOUT)
+
@@ -0,0 +1,162 @@
+# app/services/url_pool.py
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class SignedUrlPool:
+    """
+    In-memory pool of pre-signed, single-use upload URLs refilled in the background.
+
+    `fetch()` is a coroutine returning a fresh URL valid for `ttl` seconds. take()
+    pops from a deque in O(1); URLs with less than `min_remaining` seconds left are
+    never served. The refill task keeps `target` URLs on hand, where the target
+    follows demand: the number of URLs taken over the last `window` seconds,
+    scaled to `horizon` seconds of supply and clamped to [min_size, max_size].
+    URLs about to drop below `min_remaining` are replaced ahead of time, so a
+    steady stream of uploads never waits on the signer.
+
+    The refill task only starts when `enabled()` is true (e.g. credentials are
+    configured). A round where every fetch fails (signer down, credentials
+    rejected) backs off exponentially up to `max_backoff` seconds.
+    """
+
+    def __init__(self, fetch, ttl: float, min_remaining: float = 15, min_size: int = 2,
+                 max_size: int = 50, horizon: float = 10, window: float = 60,
+                 refill_interval: float = 1, concurrency: int = 4, max_backoff: float = 300,
+                 enabled=None):
+        self.fetch = fetch
+        self.enabled = enabled
+        self.ttl = ttl
+        self.min_remaining = min_remaining
+        self.min_size = min_size
+        self.max_size = max_size
+        self.horizon = horizon
+        self.window = window
+        self.refill_interval = refill_interval
+        self.concurrency = concurrency
+        self.max_backoff = max_backoff
+        self.failures = 0  # refill rounds failed in a row
+        self._urls = deque()  # (url, expires_at), oldest first
+        self._takes = deque()  # monotonic times of recent take() calls
+        self._wakeup = None
+        self._task = None
+        self.hits = 0
+        self.misses = 0
+
+    # -------- serving --------
+    def _expire(self, margin: float):
+        # Entries are appended in fetch order, so the stalest are at the left
+        cutoff = time.monotonic() + margin
+        while self._urls and self._urls[0][1] < cutoff:
+            self._urls.popleft()
+
+    def take(self):
+        """
+        Pop a URL with at least `min_remaining` seconds left, or None if the pool is dry.
+        """
+        now = time.monotonic()
+        self._takes.append(now)
+        self._expire(self.min_remaining)
+        if self._urls:
+            self.hits += 1
+            url = self._urls.popleft()[0]
+        else:
+            self.misses += 1
+            url = None
+        self._kick()
+        return url
+
+    async def get(self):
+        """
+        A URL from the pool, or a freshly fetched one when the pool is empty.
+        """
+        url = self.take()
+        if url is None:
+            url = await self.fetch()
+        return url
+
+    # -------- sizing --------
+    @property
+    def target(self) -> int:
+        cutoff = time.monotonic() - self.window
+        while self._takes and self._takes[0] < cutoff:
+            self._takes.popleft()
+        wanted = math.ceil(len(self._takes) * self.horizon / self.window)
+        return max(self.min_size, min(self.max_size, wanted))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._urls),
+            "target": self.target,
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+    # -------- refilling --------
+    async def refill_once(self):
+        # Anything that would go stale before the next round is dropped and replaced now
+        self._expire(self.min_remaining + self.refill_interval)
+        missing = self.target - len(self._urls)
+        while missing > 0:
+            batch = min(missing, self.concurrency)
+            expires_at = time.monotonic() + self.ttl
+            results = await asyncio.gather(
+                *(self.fetch() for _ in range(batch)), return_exceptions=True
+            )
+            urls = [r for r in results if not isinstance(r, BaseException) and r]
+            errors = [r for r in results if isinstance(r, BaseException)]
+            if errors and not urls:
+                # Nothing signed at all: let the loop back off
+                raise errors[0]
+            for e in errors:
+                logger.warning("Signed URL refill failed: %s", e)
+            # Expiry counted from before the request, so it is never overestimated
+            self._urls.extend((url, expires_at) for url in urls)
+            if len(urls) < batch:
+                break
+            missing -= batch
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refill_once()
+                self.failures = 0
+            except Exception as e:
+                self.failures += 1
+                delay = min(self.max_backoff, self.refill_interval * 2 ** self.failures)
+                logger.warning("Signed URL refill failed (%s in a row), retrying in %.0f s: %s",
+                               self.failures, delay, e)
+                # Demand doesn't cut the back-off short
+                await asyncio.sleep(delay)
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.refill_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    def _kick(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+        if self.enabled is None or self.enabled():
+            self.start()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
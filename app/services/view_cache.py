@@ -0,0 +1,310 @@
+# app/services/view_cache.py
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from app import config
+from app.services.cache_backend import CacheBackend, cache_backend, encode_key
+from app.services.event_indexer import EventIndexer
+from app.services.web3_utils import aw3, contract, registry
+
+logger = logging.getLogger(__name__)
+
+BLOCK = "block"
+EVENTS = "events"
+
+_MISSING = object()
+
+
+class HeadTracker:
+    """
+    Latest block number, polled once per interval for the whole process.
+    `head` is None until the first poll and whenever polling has gone stale.
+    `reorgs` counts the times the head went backwards.
+    """
+
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self.reorgs = 0
+        self._head = None
+        self._seen_at = 0.0
+        self._task = None
+
+    @property
+    def head(self):
+        if self._head is None or time.monotonic() - self._seen_at > 3 * self.poll_interval:
+            return None
+        return self._head
+
+    async def _run(self):
+        while True:
+            try:
+                head = await aw3.eth.block_number
+                if self._head is not None and head < self._head:
+                    self.reorgs += 1
+                self._head = head
+                self._seen_at = time.monotonic()
+            except Exception as e:
+                logger.warning("Block number poll failed: %s", e)
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+
+class ViewCache:
+    """
+    Bounded LRU cache of contract view-call results keyed by (contract, function, args).
+
+    Two freshness modes:
+    - BLOCK: an entry is valid while the chain head is the block it was read at
+      and no reorg has been seen since (the head going backwards, or a rollback of
+      any watched contract). For reads that depend on block time (streaks,
+      ongoing proposals).
+    - EVENTS: an entry is valid until any event of its contract is indexed (or
+      `event_ttl` passes). For reads that only change through transactions.
+
+    While the head is unknown or the contract's event indexer hasn't caught up,
+    results are passed through uncached. Concurrent misses for a key share one call.
+
+    With a shared backend, misses are looked up there under their freshness tag
+    before reaching the node. Tags agree between workers: the block number, or the
+    position of the contract's last indexed event. Until a worker has indexed an
+    event since it (re)seeded, its EVENTS reads stay local.
+    """
+
+    block_ttl = 30  # L2 lifetime of BLOCK entries; they stop matching once the head moves
+
+    def __init__(self, maxsize: int = 10000, event_ttl: float = 300, head: HeadTracker = None,
+                 backend: CacheBackend = None):
+        self.maxsize = maxsize
+        self.event_ttl = event_ttl
+        self.head = head or HeadTracker()
+        self.backend = backend or cache_backend
+        self._entries = OrderedDict()  # key -> (value, block, generation, expires_at)
+        # contract name -> "block:logIndex" of the last event, or "local:N" after a
+        # rollback/seed/manual invalidation
+        self._generations = {}
+        self._local = 0
+        self._reorgs = 0  # rollbacks seen by watched indexers; part of BLOCK generations
+        self._indexers = {}  # contract name -> EventIndexer driving invalidation
+        self._flights = {}  # key -> asyncio.Future
+        self._lock = threading.Lock()
+        self._stats = {}  # "Contract.function" -> [hits, misses, coalesced]
+
+    # -------- invalidation --------
+    def watch_events(self, contract_name: str, indexer: EventIndexer = None) -> EventIndexer:
+        """
+        Invalidate EVENTS entries of `contract_name` on each of its events.
+        Reuses `indexer` when the service already follows the contract.
+        """
+        if contract_name in self._indexers:
+            return self._indexers[contract_name]
+        if indexer is None:
+            indexer = EventIndexer(contract(contract_name), name=f"{contract_name}-views",
+                                   poll_interval=config.INDEXER_POLL_INTERVAL,
+                                   confirmations=config.INDEXER_CONFIRMATIONS)
+        bump = lambda *_: self.invalidate_contract(contract_name)
+
+        def rollback(_block):
+            # A reorg also replaces blocks that BLOCK entries of any contract were read at
+            self.invalidate_contract(contract_name)
+            self.invalidate_blocks()
+
+        on_event = lambda event: self.invalidate_contract(
+            contract_name, f"{event['blockNumber']}:{event['logIndex']}"
+        )
+        for item in registry.abi(registry.entry(contract_name).abi_name):
+            if item.get("type") == "event":
+                indexer.subscribe(item["name"], on_event)
+        indexer.on_rollback(rollback)
+        indexer.on_seed(bump)
+        self._indexers[contract_name] = indexer
+        return indexer
+
+    def invalidate_contract(self, contract_name: str, position: str = None):
+        """
+        Start a new generation of `contract_name`: at an indexed event's `position`,
+        or a worker-local one. Entries carry the generation they were read at, so
+        changing it drops them lazily.
+        """
+        with self._lock:
+            if position is None:
+                self._local += 1
+                position = f"local:{self._local}"
+            self._generations[contract_name] = position
+
+    def invalidate_blocks(self):
+        """
+        Drop every BLOCK entry, e.g. after a reorg that kept the head's height.
+        """
+        with self._lock:
+            self._reorgs += 1
+
+    def _generation(self, contract_name: str, mode: str) -> str:
+        if mode == BLOCK:
+            return f"reorg:{self._reorgs + self.head.reorgs}"
+        return self._generations.get(contract_name, "local:0")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # -------- lookups --------
+    def _fill_tag(self, contract_name: str, mode: str):
+        """
+        Freshness tag to store a result read now under, or None if it can't be cached.
+        """
+        if mode == BLOCK:
+            self.head.start()
+            block = self.head.head
+            return None if block is None else (block, self._generation(contract_name, mode))
+        indexer = self._indexers.get(contract_name)
+        if indexer is None:
+            return None
+        indexer.start()
+        if not indexer.ready:
+            return None
+        return None, self._generation(contract_name, mode)
+
+    def _lookup_locked(self, key, contract_name: str, mode: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        value, block, generation, expires_at = entry
+        valid = generation == self._generation(contract_name, mode)
+        if mode == BLOCK:
+            valid = valid and block == self.head.head
+        else:
+            valid = valid and time.monotonic() < expires_at
+        if not valid:
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _count(self, key, outcome: int):
+        counts = self._stats.setdefault(f"{key[0]}.{key[1]}", [0, 0, 0, 0])
+        counts[outcome] += 1
+
+    async def get_or_load(self, key, mode: str, loader):
+        contract_name = key[0]
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            value = self._lookup_locked(key, contract_name, mode)
+            if value is not _MISSING:
+                self._count(key, 0)
+                return value
+            future = self._flights.get(key)
+            owner = future is None
+            # Misses that join a pending read don't reach the node either
+            self._count(key, 1 if owner else 2)
+            if owner:
+                future = self._flights[key] = loop.create_future()
+        if not owner:
+            return await asyncio.shield(future)
+
+        tag = self._fill_tag(contract_name, mode)
+        try:
+            value = await self._load_shared(key, mode, tag, loader)
+        except BaseException as e:
+            with self._lock:
+                self._flights.pop(key, None)
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()
+            raise
+        with self._lock:
+            self._flights.pop(key, None)
+            # An event or reorg seen while we were reading may postdate what we read
+            if tag is not None and tag[1] == self._generation(contract_name, mode):
+                self._entries[key] = (value, tag[0], tag[1], time.monotonic() + self.event_ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        future.set_result(value)
+        return value
+
+    # -------- shared tier --------
+    @staticmethod
+    def _shared_key(key, tag):
+        if tag is None:
+            return None
+        block, generation = tag
+        if block is not None:
+            return encode_key([*key, block])
+        # Local generations mean nothing to other workers
+        if generation.startswith("local:"):
+            return None
+        return encode_key([*key, generation])
+
+    async def _load_shared(self, key, mode: str, tag, loader):
+        shared_key = self._shared_key(key, tag) if self.backend.shared else None
+        if shared_key is None:
+            return await loader()
+        await self.backend.start()
+        try:
+            found = await self.backend.get_many("views", [shared_key])
+        except Exception as e:
+            logger.warning("Shared view cache read failed: %s", e)
+            found = {}
+        if shared_key in found:
+            self._count(key, 3)
+            return found[shared_key]
+        value = await loader()
+        try:
+            ttl = self.block_ttl if mode == BLOCK else self.event_ttl
+            await self.backend.set_many("views", {shared_key: json.dumps(value)}, ttl)
+        except Exception as e:
+            # e.g. bytes results, which aren't JSON; they stay per-worker
+            logger.debug("Shared view cache write skipped: %s", e)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            functions = {name: {"hits": h, "misses": m, "coalesced": c, "sharedHits": s}
+                         for name, (h, m, c, s) in self._stats.items()}
+            hits, misses, coalesced, shared = (sum(counts[i] for counts in self._stats.values()) for i in range(4))
+            total = hits + misses + coalesced
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": hits,
+                "misses": misses,
+                "coalesced": coalesced,
+                # Misses answered by another worker's read through the shared tier
+                "sharedHits": shared,
+                # Share of reads that never reached the RPC node
+                "hitRate": round((hits + coalesced + shared) / total, 3) if total else None,
+                "functions": functions,
+            }
+
+
+view_cache = ViewCache(
+    maxsize=config.VIEW_CACHE_SIZE,
+    event_ttl=config.VIEW_CACHE_EVENT_TTL,
+    head=HeadTracker(poll_interval=config.HEAD_POLL_INTERVAL),
+)
+
+
+def cached_view(contract_name: str, mode: str = BLOCK, cache: ViewCache = None):
+    """
+    Read-through cache for an async service read of `contract_name`, keyed by
+    (contract, function name, positional args). Arguments must be hashable and
+    normalized by the caller (e.g. checksum addresses). Results are shared between
+    callers, so they must not be mutated.
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args):
+            target = cache or view_cache
+            return await target.get_or_load((contract_name, fn.__name__, args), mode, lambda: fn(*args))
+        return wrapper
+    return decorator
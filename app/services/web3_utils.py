@@ -1,55 +1,354 @@
 # app/services/web3_utils.py
-import json
-from web3 import Web3
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from dotenv import load_dotenv
+from web3 import Web3, AsyncWeb3
 from eth_account import Account
-from pathlib import Path
 from app import config
+from app.services.cache import TTLCache
+from app.services.contract_registry import ContractRegistry
+from app.services.rpc_pool import EndpointPool, MultiHTTPProvider, AsyncMultiHTTPProvider
+from app.services.nonce_manager import NonceManager, is_nonce_error
 
-# Setup web3 provider
-w3 = Web3(Web3.HTTPProvider(config.HELA_RPC))
-if not w3.is_connected():
-    # Fail fast with a clear message
-    raise RuntimeError("Unable to connect to HeLa RPC at " + str(config.HELA_RPC))
+logger = logging.getLogger(__name__)
+
+# Setup web3 providers over every configured node (no network I/O until the first
+# request; see warm_up()). Both share one health-scored endpoint pool.
+rpc_pool = EndpointPool(
+    config.HELA_RPC_URLS,
+    eject_after=config.RPC_EJECT_AFTER,
+    cooldown=config.RPC_EJECT_COOLDOWN,
+    # Another node may report a different pending count for ACCOUNT
+    on_write_change=lambda url: nonce_manager.resync(),
+)
+w3 = Web3(MultiHTTPProvider(rpc_pool, timeout=config.RPC_REQUEST_TIMEOUT,
+                            max_attempts=config.RPC_MAX_ATTEMPTS))
+
+# Non-blocking provider for request handlers; the sync `w3` stays for background threads
+aw3 = AsyncWeb3(AsyncMultiHTTPProvider(rpc_pool, timeout=config.RPC_REQUEST_TIMEOUT,
+                                       max_attempts=config.RPC_MAX_ATTEMPTS))
 
 # Server account (used to sign transactions from backend)
 ACCOUNT = Account.from_key(config.PRIVATE_KEY)
-CHAIN_ID = w3.eth.chain_id
+
+# Fetched once, on first use
+_chain_id = None
+
+
+# Local nonce allocation for ACCOUNT and a short-lived gas price, shared by sync and async paths
+nonce_manager = NonceManager()
+_gas_price_cache = TTLCache(maxsize=1, ttl=config.GAS_PRICE_TTL)
+
+# Build arguments of signed-but-unsent txs with an auto-assigned nonce, by tx hash,
+# so a send rejected for its nonce can be rebuilt once with a resynced one
+_rebuild_args = OrderedDict()
+_REBUILD_ARGS_MAX = 1024
+
+
+def _remember_rebuild(signed, nonce, contract_function, tx_params, value):
+    _rebuild_args[signed.hash] = (nonce, (contract_function, tx_params, value))
+    while len(_rebuild_args) > _REBUILD_ARGS_MAX:
+        _rebuild_args.popitem(last=False)
+
+def get_chain_id() -> int:
+    global _chain_id
+    if _chain_id is None:
+        _chain_id = w3.eth.chain_id
+    return _chain_id
+
+async def async_get_chain_id() -> int:
+    global _chain_id
+    if _chain_id is None:
+        _chain_id = await aw3.eth.chain_id
+    return _chain_id
+
+# ----------------- CONTRACT REGISTRY -----------------
+# Config attribute holding each known contract's address, by contract name
+CONTRACT_ADDRESS_SETTINGS = {
+    "Feed": "FEED_ADDRESS",
+    "Comment": "COMMENT_ADDRESS",
+    "DAO": "DAO_ADDRESS",
+    "Profile": "PROFILE_ADDRESS",
+    "Streak": "STREAK_ADDRESS",
+    "Moderation": "MODERATION_ADDRESS",
+    "Learning": "LEARNING_ADDRESS",
+    "LearningBadges": "LEARNING_BADGE_ADDRESS",
+}
+
+registry = ContractRegistry()
+for _name, _setting in CONTRACT_ADDRESS_SETTINGS.items():
+    registry.register(_name, getattr(config, _setting))
 
 def load_abi(name: str):
-    p = Path(__file__).resolve().parents[1] / "abis" / f"{name}.json"
-    with open(p, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return registry.abi(name)
+
+def contract(name: str):
+    """
+    Shared handle to a registered contract (e.g. "Feed") on the sync provider.
+    """
+    return registry.handle(name, w3)
+
+def async_contract(name: str):
+    """
+    Shared handle to a registered contract on the async provider.
+    """
+    return registry.handle(name, aw3)
 
 def get_contract(address: str, abi_name: str):
-    abi = load_abi(abi_name)
-    return w3.eth.contract(address=w3.to_checksum_address(address), abi=abi)
+    registry.register(f"{abi_name}@{address}", address, abi_name)
+    return registry.handle(f"{abi_name}@{address}", w3)
+
+def get_async_contract(address: str, abi_name: str):
+    registry.register(f"{abi_name}@{address}", address, abi_name)
+    return registry.handle(f"{abi_name}@{address}", aw3)
+
+def resolve_contracts() -> int:
+    """
+    Build every registered contract object up front, so it isn't done during the
+    first request. Returns how many contracts were resolved.
+    """
+    return registry.resolve_all((w3, aw3))
+
+def reload_contract_addresses() -> list:
+    """
+    Re-read contract addresses from the environment (and .env) and hot-swap the
+    ones that changed. Returns the names of the contracts that moved.
+    """
+    load_dotenv(override=True)
+    return [
+        name for name, setting in CONTRACT_ADDRESS_SETTINGS.items()
+        if registry.set_address(name, os.getenv(setting))
+    ]
+
+async def warm_up():
+    """
+    Open the RPC connection and prefetch chain id and gas price, concurrently.
+    """
+    chain_id, gas_price = await asyncio.gather(async_get_chain_id(), _async_gas_price())
+    _gas_price_cache.set("gasPrice", gas_price)
+    logger.info("Connected to chain %s via %s", chain_id, ", ".join(config.HELA_RPC_URLS))
 
 def build_signed_tx(contract_function, tx_params=None, value=0):
     """
     Build and sign a transaction for the given contract function using the server ACCOUNT.
+    The nonce comes from the local nonce_manager unless given in tx_params.
     Returns the signed transaction object.
     """
     if tx_params is None:
         tx_params = {}
     # default tx fields
-    nonce = w3.eth.get_transaction_count(ACCOUNT.address)
-    tx_defaults = {
-        "chainId": CHAIN_ID,
-        "gas": tx_params.get("gas", 600000),
-        "gasPrice": tx_params.get("gasPrice", w3.eth.gas_price),
-        "nonce": tx_params.get("nonce", nonce),
-        "value": int(value)
-    }
-    built = contract_function.build_transaction(tx_defaults)
-    signed = Account.sign_transaction(built, config.PRIVATE_KEY)
+    auto_nonce = "nonce" not in tx_params
+    if auto_nonce:
+        nonce = nonce_manager.reserve(lambda: w3.eth.get_transaction_count(ACCOUNT.address, "pending"))
+    else:
+        nonce = tx_params["nonce"]
+    try:
+        gas_price = tx_params.get("gasPrice")
+        if gas_price is None:
+            gas_price = _gas_price_cache.get_or_load("gasPrice", lambda: w3.eth.gas_price)
+        tx_defaults = {
+            "chainId": get_chain_id(),
+            "gas": tx_params.get("gas", 600000),
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "value": int(value)
+        }
+        built = contract_function.build_transaction(tx_defaults)
+        signed = Account.sign_transaction(built, config.PRIVATE_KEY)
+    except Exception:
+        if auto_nonce:
+            nonce_manager.release(nonce)
+        raise
+    if auto_nonce:
+        _remember_rebuild(signed, nonce, contract_function, tx_params, value)
     return signed
 
+def _call_specs(chunk):
+    """
+    Registry FunctionSpecs for a chunk of bound calls, or None if any call needs web3's
+    own argument matching (unregistered contract, overloaded name, keyword args).
+    """
+    specs = []
+    for call in chunk:
+        spec = None if call.kwargs else registry.function(call.address, call.fn_name)
+        if spec is None:
+            return None
+        specs.append(spec)
+    return specs
+
+def _eth_call_requests(chunk, specs, block_identifier="latest"):
+    block = hex(block_identifier) if isinstance(block_identifier, int) else block_identifier
+    return [
+        ("eth_call", [{"to": call.address, "data": spec.encode(call.args)}, block])
+        for call, spec in zip(chunk, specs)
+    ]
+
+def _decode_batch(specs, responses):
+    if not isinstance(responses, list):
+        # Whole batch rejected with a single error object
+        raise RuntimeError(f"Batch request failed: {responses}")
+    if len(responses) != len(specs):
+        raise RuntimeError(f"Batch returned {len(responses)} results for {len(specs)} calls")
+    results = []
+    for spec, response in zip(specs, sorted(responses, key=lambda r: r.get("id") or 0)):
+        if "error" in response:
+            raise RuntimeError(f"{spec.signature} failed: {response['error']}")
+        results.append(spec.decode(bytes.fromhex(response["result"][2:])))
+    return results
+
+def batch_call(calls, chunk_size: int = None, block_identifier="latest"):
+    """
+    Execute many read-only contract calls as JSON-RPC batch requests.
+    `calls` is a list of bound contract functions (e.g. contract.functions.likedBy(1, addr)).
+    Calls are sent in chunks of `chunk_size` per HTTP round-trip and results are
+    returned decoded, in the same order as `calls`, as of `block_identifier`.
+    """
+    calls = list(calls)
+    chunk_size = chunk_size or config.BATCH_CALL_CHUNK_SIZE
+    results = []
+    for start in range(0, len(calls), chunk_size):
+        chunk = calls[start:start + chunk_size]
+        specs = _call_specs(chunk)
+        if specs is not None:
+            results.extend(_decode_batch(
+                specs, w3.provider.make_batch_request(_eth_call_requests(chunk, specs, block_identifier))
+            ))
+            continue
+        if block_identifier != "latest":
+            # web3's batch API has no block parameter
+            results.extend(call.call(block_identifier=block_identifier) for call in chunk)
+            continue
+        with w3.batch_requests() as batch:
+            for call in chunk:
+                batch.add(call)
+            responses = batch.execute()
+        if len(responses) != len(chunk):
+            raise RuntimeError(f"Batch returned {len(responses)} results for {len(chunk)} calls")
+        results.extend(responses)
+    return results
+
+def _broadcast(signed_tx):
+    """
+    send_raw_transaction with nonce recovery: a nonce rejection resyncs the nonce
+    manager and, for txs built with an auto-assigned nonce, retries once re-signed.
+    """
+    rebuild = _rebuild_args.pop(signed_tx.hash, None)
+    try:
+        return w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Exception as e:
+        if not is_nonce_error(e):
+            if rebuild is not None:
+                nonce_manager.release(rebuild[0])
+            raise
+        if "already known" in str(e).lower():
+            return signed_tx.hash
+        nonce_manager.resync()
+        if rebuild is None:
+            raise
+        retry = build_signed_tx(*rebuild[1])
+        _rebuild_args.pop(retry.hash, None)
+        return w3.eth.send_raw_transaction(retry.raw_transaction)
+
 def send_signed_transaction(signed_tx):
     """
     Send signed raw transaction and wait for receipt (with a timeout).
     Returns the transaction receipt.
     """
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    tx_hash = _broadcast(signed_tx)
     # wait for receipt (polling)
     receipt = w3.eth.wait_for_transaction_receipt(tx_hash, timeout=600)
     return receipt
+
+
+# ----------------- ASYNC VARIANTS -----------------
+async def async_batch_call(calls, chunk_size: int = None):
+    """
+    Async counterpart of batch_call for contracts from get_async_contract.
+    """
+    calls = list(calls)
+    chunk_size = chunk_size or config.BATCH_CALL_CHUNK_SIZE
+    results = []
+    for start in range(0, len(calls), chunk_size):
+        chunk = calls[start:start + chunk_size]
+        specs = _call_specs(chunk)
+        if specs is not None:
+            results.extend(_decode_batch(
+                specs, await aw3.provider.make_batch_request(_eth_call_requests(chunk, specs))
+            ))
+            continue
+        async with aw3.batch_requests() as batch:
+            for call in chunk:
+                batch.add(call)
+            responses = await batch.async_execute()
+        if len(responses) != len(chunk):
+            raise RuntimeError(f"Batch returned {len(responses)} results for {len(chunk)} calls")
+        results.extend(responses)
+    return results
+
+async def async_build_signed_tx(contract_function, tx_params=None, value=0):
+    """
+    Async counterpart of build_signed_tx for contracts from get_async_contract.
+    """
+    if tx_params is None:
+        tx_params = {}
+    auto_nonce = "nonce" not in tx_params
+    if auto_nonce:
+        nonce = await nonce_manager.areserve(lambda: aw3.eth.get_transaction_count(ACCOUNT.address, "pending"))
+    else:
+        nonce = tx_params["nonce"]
+    try:
+        gas_price = tx_params.get("gasPrice")
+        if gas_price is None:
+            gas_price = await _gas_price_cache.aget_or_load("gasPrice", _async_gas_price)
+        tx_defaults = {
+            "chainId": await async_get_chain_id(),
+            "gas": tx_params.get("gas", 600000),
+            "gasPrice": gas_price,
+            "nonce": nonce,
+            "value": int(value)
+        }
+        built = await contract_function.build_transaction(tx_defaults)
+        signed = Account.sign_transaction(built, config.PRIVATE_KEY)
+    except BaseException:
+        if auto_nonce:
+            nonce_manager.release(nonce)
+        raise
+    if auto_nonce:
+        _remember_rebuild(signed, nonce, contract_function, tx_params, value)
+    return signed
+
+async def _async_gas_price():
+    return await aw3.eth.gas_price
+
+async def async_broadcast(signed_tx):
+    """
+    Async counterpart of _broadcast; returns the tx hash without waiting for a receipt.
+    """
+    rebuild = _rebuild_args.pop(signed_tx.hash, None)
+    try:
+        return await aw3.eth.send_raw_transaction(signed_tx.raw_transaction)
+    except Exception as e:
+        if not is_nonce_error(e):
+            if rebuild is not None:
+                nonce_manager.release(rebuild[0])
+            raise
+        if "already known" in str(e).lower():
+            return signed_tx.hash
+        nonce_manager.resync()
+        if rebuild is None:
+            raise
+        retry = await async_build_signed_tx(*rebuild[1])
+        _rebuild_args.pop(retry.hash, None)
+        return await aw3.eth.send_raw_transaction(retry.raw_transaction)
+
+async def async_send_signed_transaction(signed_tx):
+    """
+    Send signed raw transaction and await its receipt without blocking the event loop.
+    Nonces are allocated locally, so many transactions can be awaited concurrently.
+    Returns the transaction receipt.
+    """
+    tx_hash = await async_broadcast(signed_tx)
+    receipt = await aw3.eth.wait_for_transaction_receipt(tx_hash, timeout=600, poll_latency=1)
+    return receipt
@@ -0,0 +1,51 @@
+"""
+Cold-start benchmark: time `import app.main` in fresh interpreters.
+
+    python scripts/bench_startup.py [--runs 10] [--module app.main]
+
+Each run is a new process, so nothing is shared between runs except the OS page
+cache and compiled .pyc files. Importing must not touch the network; the script
+fails if it does not finish within --timeout seconds.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SNIPPET = """
+import time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+"""
+
+
+def run_once(module: str, timeout: float) -> float:
+    out = subprocess.run(
+        [sys.executable, "-c", SNIPPET.format(module=module)],
+        cwd=ROOT, env={**os.environ, "PYTHONPATH": str(ROOT)},
+        capture_output=True, text=True, timeout=timeout, check=True,
+    )
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--timeout", type=float, default=60)
+    args = parser.parse_args()
+
+    run_once(args.module, args.timeout)  # compile .pyc files first
+    times = [run_once(args.module, args.timeout) for _ in range(args.runs)]
+    print(f"import {args.module}: {args.runs} runs, "
+          f"min {min(times) * 1000:.0f} ms, median {statistics.median(times) * 1000:.0f} ms, "
+          f"max {max(times) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
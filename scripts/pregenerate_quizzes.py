@@ -0,0 +1,33 @@
+"""
+Generate and cache quizzes for every module in modules_content.
+
+    python scripts/pregenerate_quizzes.py [--question-count 5]
+
+Calls the AI provider once per module without a cached quiz, so it runs as an
+operator job (deploy step or one-off) rather than behind the public API. Uses
+the same environment as the app (MONGODB_URI, AI keys, QUIZ_PREGENERATE_CONCURRENCY).
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.services.learning_service import pregenerate_quizzes  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--question-count", type=int, default=5,
+                        help="questions per quiz for modules that don't set questionCount")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    cached = asyncio.run(pregenerate_quizzes(args.question_count))
+    print(f"{cached} modules have a cached quiz")
+
+
+if __name__ == "__main__":
+    main()
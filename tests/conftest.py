@@ -0,0 +1,95 @@
+# tests/conftest.py
+import os
+
+# Services are imported without a node or database: clients are created lazily,
+# but a URI must be set before app.services.db reads it
+os.environ.setdefault("MONGODB_URI", "mongodb://localhost:1")
+
+import pytest
+
+
+class FakeEvent:
+    def __init__(self, name):
+        self.topic = name
+
+    def process_log(self, log):
+        return {
+            "event": self.topic,
+            "args": log["args"],
+            "blockNumber": log["blockNumber"],
+            "logIndex": log["logIndex"],
+            "blockHash": log["blockHash"],
+        }
+
+
+class _Events:
+    def __getattr__(self, name):
+        return lambda: FakeEvent(name)
+
+
+class FakeContract:
+    """
+    Contract stand-in for EventIndexer: `events.X()` gives topic "X", and
+    `functions` is whatever the test needs.
+    """
+
+    def __init__(self, functions=None, address="0x00000000000000000000000000000000000000C0"):
+        self.address = address
+        self.events = _Events()
+        self.functions = functions
+
+
+class FakeChain:
+    """
+    Minimal w3 stand-in: block hashes, a head and logs. fork() replaces every block
+    from a height on with new hashes (and drops their logs), like a reorg.
+    """
+
+    def __init__(self, head: int = 0):
+        self.eth = self
+        self.block_number = 0
+        self.logs = []
+        self._hashes = {}
+        self._fork = 0
+        self.mine(head)
+
+    def _hash(self, number):
+        return f"{number}:{self._fork}".encode()
+
+    def mine(self, count: int = 1, logs=()):
+        for _ in range(count):
+            self.block_number += 1
+            self._hashes[self.block_number] = self._hash(self.block_number)
+        for i, (name, args) in enumerate(logs):
+            self.logs.append({
+                "address": FakeContract().address, "topics": [name], "args": args,
+                "blockNumber": self.block_number, "logIndex": i,
+                "blockHash": self._hashes[self.block_number],
+            })
+
+    def fork(self, from_block: int):
+        self._fork += 1
+        for number in range(from_block, self.block_number + 1):
+            self._hashes[number] = self._hash(number)
+        self.logs = [l for l in self.logs if l["blockNumber"] < from_block]
+        self.block_number = from_block - 1
+
+    def get_block(self, number):
+        return {"hash": self._hashes.get(number, b"genesis")}
+
+    def get_logs(self, params):
+        return [l for l in self.logs
+                if params["fromBlock"] <= l["blockNumber"] <= params["toBlock"]
+                and l["topics"][0] in params["topics"][0]]
+
+    @staticmethod
+    def to_hex(value):
+        return value
+
+
+@pytest.fixture
+def chain(monkeypatch):
+    from app.services import event_indexer
+    fake = FakeChain()
+    monkeypatch.setattr(event_indexer, "w3", fake)
+    return fake
@@ -0,0 +1,52 @@
+# tests/test_auth.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import config
+from app.auth import require_api_key
+from app.routers import comment, dao, feed, moderation, profile, streak
+
+# POST routes that only read, so they take a request body
+READ_POSTS = {"/comment/counts", "/moderation/flags", "/streak/bulk"}
+
+
+def _check(key):
+    return asyncio.run(require_api_key(key))
+
+
+def test_write_routes_are_off_without_a_configured_key(monkeypatch):
+    monkeypatch.setattr(config, "API_KEY", None)
+    with pytest.raises(HTTPException) as e:
+        _check("anything")
+    assert e.value.status_code == 503
+
+
+@pytest.mark.parametrize("key", [None, "", "wrong", "secret "])
+def test_wrong_or_missing_key_is_rejected(monkeypatch, key):
+    monkeypatch.setattr(config, "API_KEY", "secret")
+    with pytest.raises(HTTPException) as e:
+        _check(key)
+    assert e.value.status_code == 401
+
+
+def test_configured_key_is_accepted(monkeypatch):
+    monkeypatch.setattr(config, "API_KEY", "secret")
+    assert _check("secret") is None
+
+
+@pytest.mark.parametrize("module", [comment, dao, feed, moderation, profile, streak])
+def test_every_signing_route_requires_the_key(module):
+    for route in module.router.routes:
+        guarded = require_api_key in [d.call for d in route.dependant.dependencies]
+        writes = route.methods & {"POST", "PUT", "DELETE"} and route.path not in READ_POSTS
+        assert guarded == bool(writes), route.path
+
+
+def test_all_routers_are_mounted():
+    from app.main import app
+    paths = app.openapi()["paths"]
+    for prefix in ("/feed", "/comment", "/profile", "/dao", "/moderation", "/streak",
+                   "/learning", "/pinata", "/tx"):
+        assert any(path.startswith(prefix) for path in paths), prefix
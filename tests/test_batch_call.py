@@ -0,0 +1,129 @@
+# tests/test_batch_call.py
+import asyncio
+import random
+
+import pytest
+from web3 import Web3
+
+from app.services import web3_utils
+from app.services.contract_registry import _codec
+
+
+def _user(i):
+    return Web3.to_checksum_address(f"0x{i + 1:040x}")
+
+
+def _streak_calls(count, contract=None):
+    contract = contract or web3_utils.contract("Streak")
+    return [contract.functions.getCurrentStreak(_user(i)) for i in range(count)]
+
+
+class FakeNode:
+    """
+    Answers batched eth_calls for Streak.getCurrentStreak with the caller's index,
+    numbered like a JSON-RPC provider but returned in shuffled order.
+    """
+
+    def __init__(self, errors=()):
+        self.batches = []
+        self.errors = set(errors)  # indexes (across all batches) answered with an error
+        self._seen = 0
+        self._id = 100
+
+    def respond(self, batch_requests):
+        self.batches.append(batch_requests)
+        responses = []
+        for method, params in batch_requests:
+            assert method == "eth_call"
+            index, self._seen, self._id = self._seen, self._seen + 1, self._id + 1
+            if index in self.errors:
+                responses.append({"jsonrpc": "2.0", "id": self._id,
+                                  "error": {"code": 3, "message": "execution reverted"}})
+                continue
+            # getCurrentStreak(_user(i)) is answered with i * 10
+            user = int(params[0]["data"][-40:], 16) - 1
+            data = _codec.encode(["uint256"], [user * 10])
+            responses.append({"jsonrpc": "2.0", "id": self._id, "result": "0x" + data.hex()})
+        random.Random(len(self.batches)).shuffle(responses)
+        return responses
+
+    async def arespond(self, batch_requests):
+        return self.respond(batch_requests)
+
+
+@pytest.fixture
+def node(monkeypatch):
+    fake = FakeNode()
+    monkeypatch.setattr(web3_utils.w3.provider, "make_batch_request", fake.respond)
+    monkeypatch.setattr(web3_utils.aw3.provider, "make_batch_request", fake.arespond)
+    return fake
+
+
+def test_results_follow_call_order_not_response_order(node):
+    results = web3_utils.batch_call(_streak_calls(7))
+    assert results == [i * 10 for i in range(7)]
+    assert len(node.batches) == 1
+
+
+@pytest.mark.parametrize("count, chunk_size, sizes", [
+    (6, 3, [3, 3]),
+    (7, 3, [3, 3, 1]),
+    (3, 3, [3]),
+    (1, 3, [1]),
+])
+def test_chunk_boundaries(node, count, chunk_size, sizes):
+    results = web3_utils.batch_call(_streak_calls(count), chunk_size=chunk_size)
+    assert results == [i * 10 for i in range(count)]
+    assert [len(batch) for batch in node.batches] == sizes
+
+
+def test_chunk_size_defaults_to_config(node, monkeypatch):
+    monkeypatch.setattr(web3_utils.config, "BATCH_CALL_CHUNK_SIZE", 4)
+    web3_utils.batch_call(_streak_calls(9))
+    assert [len(batch) for batch in node.batches] == [4, 4, 1]
+
+
+def test_no_calls_sends_nothing(node):
+    assert web3_utils.batch_call([]) == []
+    assert node.batches == []
+
+
+def test_block_identifier_is_sent_as_hex(node):
+    web3_utils.batch_call(_streak_calls(2), block_identifier=255)
+    assert {params[1] for _, params in node.batches[0]} == {"0xff"}
+
+
+def test_error_inside_a_batch_names_the_failing_call(node):
+    node.errors = {4}
+    with pytest.raises(RuntimeError, match=r"getCurrentStreak\(address\) failed: .*execution reverted"):
+        web3_utils.batch_call(_streak_calls(6), chunk_size=3)
+    assert len(node.batches) == 2  # the first chunk was fine; nothing after the failing one
+
+
+def test_batch_rejected_as_a_whole(monkeypatch):
+    monkeypatch.setattr(web3_utils.w3.provider, "make_batch_request",
+                        lambda requests: {"jsonrpc": "2.0", "id": None, "error": {"code": -32600}})
+    with pytest.raises(RuntimeError, match="Batch request failed"):
+        web3_utils.batch_call(_streak_calls(2))
+
+
+def test_missing_responses_are_an_error(monkeypatch):
+    fake = FakeNode()
+    monkeypatch.setattr(web3_utils.w3.provider, "make_batch_request",
+                        lambda requests: fake.respond(requests)[:-1])
+    with pytest.raises(RuntimeError, match="1 results for 2 calls"):
+        web3_utils.batch_call(_streak_calls(2))
+
+
+def test_async_batch_call_orders_and_chunks(node):
+    calls = _streak_calls(5, web3_utils.async_contract("Streak"))
+    results = asyncio.run(web3_utils.async_batch_call(calls, chunk_size=2))
+    assert results == [i * 10 for i in range(5)]
+    assert [len(batch) for batch in node.batches] == [2, 2, 1]
+
+
+def test_async_error_inside_a_batch(node):
+    node.errors = {1}
+    calls = _streak_calls(3, web3_utils.async_contract("Streak"))
+    with pytest.raises(RuntimeError, match="getCurrentStreak"):
+        asyncio.run(web3_utils.async_batch_call(calls))
@@ -0,0 +1,89 @@
+# tests/test_cache.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.services.cache import TTLCache
+
+
+def test_entries_expire_and_lru_evicts():
+    cache = TTLCache(maxsize=2, ttl=0.05)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)  # "b" is least recently used
+    assert cache.get("b") is None and cache.get("a") == 1
+
+    time.sleep(0.06)
+    assert cache.get("a") is None and cache.get("c") is None
+
+
+def test_on_evict_sees_every_entry_that_leaves():
+    evicted = []
+    cache = TTLCache(maxsize=2, ttl=0.05, on_evict=lambda k, v: evicted.append((k, v)))
+    cache.set("a", 1)
+    cache.set("a", 2)  # overwrite, not an eviction
+    cache.set("b", 3)
+    cache.set("c", 4)
+    cache.invalidate("b")
+    assert evicted == [("a", 2), ("b", 3)]
+
+    time.sleep(0.06)
+    cache.get("c")
+    cache.set("d", 5)
+    cache.clear()
+    assert evicted[2:] == [("c", 4), ("d", 5)]
+
+
+def test_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    calls = []
+    gate = threading.Event()
+
+    def loader(keys):
+        calls.append(keys)
+        gate.wait(1)
+        return {k: k * 2 for k in keys}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_many_or_load([1, 2], loader)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [[1, 2]]
+    assert results == [{1: 2, 2: 4}] * 8
+
+
+def test_failed_load_is_raised_to_waiters_and_not_cached():
+    cache = TTLCache()
+
+    def loader(keys):
+        raise RuntimeError("rpc down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", lambda: loader(["k"]))
+    assert cache.get_or_load("k", lambda: "ok") == "ok"
+
+
+def test_async_concurrent_misses_share_one_load():
+    cache = TTLCache()
+    calls = []
+
+    async def loader(keys):
+        calls.append(keys)
+        await asyncio.sleep(0.01)
+        return {k: str(k) for k in keys}
+
+    async def main():
+        return await asyncio.gather(*(cache.aget_many_or_load([1, 2, 3], loader) for _ in range(20)))
+
+    results = asyncio.run(main())
+    assert calls == [[1, 2, 3]]
+    assert all(r == {1: "1", 2: "2", 3: "3"} for r in results)
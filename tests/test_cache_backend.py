@@ -0,0 +1,124 @@
+# tests/test_cache_backend.py
+import asyncio
+import json
+
+from app.services.cache_backend import CacheBackend, TieredCache
+
+
+class SharedStore:
+    """
+    What a Redis/Mongo server would hold: entries plus a broadcast to every worker.
+    """
+
+    def __init__(self):
+        self.data = {}
+        self.backends = []
+        self.fail_reads = False
+
+
+class FakeBackend(CacheBackend):
+    name = "fake"
+    shared = True
+
+    def __init__(self, store: SharedStore):
+        super().__init__()
+        self.store = store
+        store.backends.append(self)
+
+    async def get_many(self, namespace, keys):
+        if self.store.fail_reads:
+            raise ConnectionError("down")
+        return {k: json.loads(self.store.data[namespace, k]) for k in keys if (namespace, k) in self.store.data}
+
+    async def set_many(self, namespace, items, ttl):
+        for key, value in items.items():
+            self.store.data[namespace, key] = value
+
+    async def delete(self, namespace, key=None):
+        for ns, k in list(self.store.data):
+            if ns == namespace and key in (None, k):
+                del self.store.data[ns, k]
+
+    async def publish(self, namespace, key=None):
+        for backend in self.store.backends:
+            backend._deliver(json.loads(self._message(namespace, key)))
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+
+
+def _workers(store, count=2):
+    return [TieredCache("test", maxsize=10, ttl=60, backend=FakeBackend(store)) for _ in range(count)]
+
+
+async def _settle(*caches):
+    await asyncio.sleep(0)
+    for cache in caches:
+        await asyncio.gather(*cache._tasks)
+
+
+def _loader(calls):
+    async def load(keys):
+        calls.append(list(keys))
+        return {k: {"value": k} for k in keys}
+    return load
+
+
+def test_values_loaded_by_one_worker_are_served_to_others_from_l2():
+    async def run():
+        store = SharedStore()
+        a, b = _workers(store)
+        calls = []
+        await a.aget_many_or_load([1, 2], _loader(calls))
+        await _settle(a)
+        found = await b.aget_many_or_load([1, 2, 3], _loader(calls))
+        return calls, found, b
+
+    calls, found, b = asyncio.run(run())
+    assert calls == [[1, 2], [3]]
+    assert found == {1: {"value": 1}, 2: {"value": 2}, 3: {"value": 3}}
+    assert (b.l2_hits, b.l2_misses) == (2, 1)
+
+
+def test_invalidate_drops_l2_and_other_workers_l1():
+    async def run():
+        store = SharedStore()
+        a, b = _workers(store)
+        await a.aget_many_or_load([1, 2], _loader([]))
+        await _settle(a)
+        await b.aget_many_or_load([1, 2], _loader([]))
+        a.invalidate(1)
+        await _settle(a)
+        return store, b
+
+    store, b = asyncio.run(run())
+    assert ("test", "1") not in store.data and ("test", "2") in store.data
+    assert b.get(1) is None and b.get(2) == {"value": 2}
+
+
+def test_load_racing_an_invalidation_is_not_written_to_l2():
+    async def run():
+        store = SharedStore()
+        (a,) = _workers(store, 1)
+
+        async def load(keys):
+            a.invalidate(keys[0])  # e.g. an event for the key arrives mid-load
+            return {k: "stale" for k in keys}
+
+        await a.aget_many_or_load([5], load)
+        await _settle(a)
+        return store
+
+    assert asyncio.run(run()).data == {}
+
+
+def test_l2_read_errors_fall_back_to_the_loader():
+    async def run():
+        store = SharedStore()
+        store.fail_reads = True
+        (a,) = _workers(store, 1)
+        calls = []
+        return await a.aget_many_or_load([7], _loader(calls)), calls
+
+    found, calls = asyncio.run(run())
+    assert found == {7: {"value": 7}} and calls == [[7]]
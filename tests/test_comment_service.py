@@ -0,0 +1,68 @@
+# tests/test_comment_service.py
+import pytest
+
+from app.services import comment_service
+from app.services.comment_service import comment_cache, comment_post_ids, _entry_from_result
+
+
+class FakeEth:
+    def __init__(self):
+        self.eth = self
+        self.transactions = {}
+
+    def get_transaction(self, tx_hash):
+        return {"input": self.transactions[tx_hash]}
+
+    def get_block(self, number):
+        return {"timestamp": 1000 + number}
+
+
+@pytest.fixture
+def eth(monkeypatch):
+    fake = FakeEth()
+    monkeypatch.setattr(comment_service, "w3", fake)
+    yield fake
+    comment_cache.clear()
+
+
+def _cache_post(post_id, *comment_ids):
+    rows = [(i, post_id, "0xA", f"comment {i}", "", 1, True) for i in comment_ids]
+    comment_cache.set(post_id, _entry_from_result(rows))
+
+
+def _event(name, block, tx_hash, **args):
+    return {"event": name, "args": args, "blockNumber": block, "transactionHash": tx_hash}
+
+
+def test_created_and_updated_comments_are_applied_in_place(eth):
+    _cache_post(1, 10)
+    eth.transactions["t1"] = comment_service.comment_contract.encode_abi("createComment", args=[1, "new", "Qm1"])
+    comment_service._on_comment_created(_event("CommentCreated", 5, "t1", commentId=11, postId=1, author="0xB"))
+
+    entry = comment_cache.get(1)
+    assert entry["ids"] == [10, 11]
+    assert entry["live"][-1] == {"id": 11, "postId": 1, "author": "0xB", "content": "new",
+                                 "mediaHash": "Qm1", "timestamp": 1005, "exists": True}
+
+    eth.transactions["t2"] = comment_service.comment_contract.encode_abi("updateComment", args=[10, "edited", ""])
+    comment_service._on_comment_updated(_event("CommentUpdated", 6, "t2", commentId=10))
+    assert comment_cache.get(1)["live"][0]["content"] == "edited"
+
+
+def test_undecodable_transaction_invalidates_the_post(eth):
+    _cache_post(2, 20)
+    eth.transactions["t3"] = "0xdeadbeef"
+    comment_service._on_comment_created(_event("CommentCreated", 7, "t3", commentId=21, postId=2, author="0xB"))
+    assert comment_cache.get(2) is None
+
+
+def test_comment_post_ids_only_cover_cached_posts(eth):
+    _cache_post(3, 30, 31)
+    _cache_post(4, 40)
+    # An uncached post's comment isn't remembered
+    comment_service._on_comment_created(_event("CommentCreated", 8, "t4", commentId=50, postId=5, author="0xB"))
+    assert {30, 31, 40} <= comment_post_ids.keys() and 50 not in comment_post_ids
+
+    comment_cache.invalidate(3)
+    assert 30 not in comment_post_ids and 31 not in comment_post_ids
+    assert comment_post_ids[40] == 4
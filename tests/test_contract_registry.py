@@ -0,0 +1,89 @@
+# tests/test_contract_registry.py
+import pytest
+from eth_abi.grammar import parse
+from web3 import Web3
+from web3.providers.base import BaseProvider
+
+from app.services.contract_registry import ABI_DIR, ContractEntry, ContractRegistry, _codec
+
+ADDRESS = "0x00000000000000000000000000000000000000aA"
+ABI_NAMES = sorted(path.stem for path in ABI_DIR.glob("*.json"))
+
+
+class CallProvider(BaseProvider):
+    """Answers every eth_call with canned return data (and anything else with 0x1)."""
+
+    def __init__(self):
+        super().__init__()
+        self.result = "0x"
+
+    def make_request(self, method, params):
+        result = self.result if method == "eth_call" else "0x1"
+        return {"jsonrpc": "2.0", "id": 1, "result": result}
+
+
+def _sample(abi_type, seed=1):
+    """A non-trivial value of `abi_type`, varied by `seed` so fields differ."""
+    if abi_type.is_array:
+        item = abi_type.item_type
+        length = abi_type.arrlist[-1][0] if abi_type.arrlist[-1] else 2
+        return [_sample(item, seed + i) for i in range(length)]
+    if hasattr(abi_type, "components"):
+        return tuple(_sample(component, seed + i) for i, component in enumerate(abi_type.components))
+    base, sub = abi_type.base, abi_type.sub
+    if base == "uint":
+        return (seed * 1_000_003) % 2 ** min(sub, 64)
+    if base == "int":
+        return -seed
+    if base == "bool":
+        return seed % 2 == 1
+    if base == "address":
+        return Web3.to_checksum_address(f"0x{seed:040x}")
+    if base == "string":
+        return f"value {seed} ✓"
+    if base == "bytes":
+        return bytes([seed % 256]) * (sub or 5)
+    raise AssertionError(f"no sample for {abi_type.to_type_str()}")
+
+
+def _functions():
+    registry = ContractRegistry()
+    for abi_name in ABI_NAMES:
+        entry = ContractEntry(abi_name, abi_name, ADDRESS, registry.abi(abi_name))
+        for name, spec in sorted(entry.functions.items()):
+            yield pytest.param(entry, spec, id=f"{abi_name}.{name}")
+
+
+FUNCTIONS = list(_functions())
+
+
+def test_every_abi_has_fast_path_functions():
+    assert {p.values[0].abi_name for p in FUNCTIONS} == set(ABI_NAMES)
+
+
+def test_struct_and_array_returns_are_covered():
+    outputs = {t for p in FUNCTIONS for t in p.values[1].output_types}
+    assert any(t.startswith("(") and t.endswith("[]") for t in outputs)
+    assert any(t.startswith("(") and not t.endswith("]") for t in outputs)
+    assert any(t.endswith("[]") and not t.startswith("(") for t in outputs)
+
+
+@pytest.mark.parametrize("entry, spec", FUNCTIONS)
+def test_encode_matches_web3(entry, spec):
+    contract = Web3(CallProvider()).eth.contract(address=entry.address, abi=entry.abi)
+    args = [_sample(parse(t), i + 1) for i, t in enumerate(spec.input_types)]
+
+    assert spec.encode(args) == contract.encode_abi(spec.name, args=args)
+
+
+@pytest.mark.parametrize("entry, spec", FUNCTIONS)
+def test_decode_matches_web3_call(entry, spec):
+    provider = CallProvider()
+    contract = Web3(provider).eth.contract(address=entry.address, abi=entry.abi)
+    args = [_sample(parse(t), i + 1) for i, t in enumerate(spec.input_types)]
+    values = [_sample(parse(t), i + 7) for i, t in enumerate(spec.output_types)]
+    data = _codec.encode(spec.output_types, values)
+    provider.result = "0x" + data.hex()
+
+    expected = contract.functions[spec.name](*args).call()
+    assert spec.decode(data) == expected
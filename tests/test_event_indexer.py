@@ -0,0 +1,125 @@
+# tests/test_event_indexer.py
+from app.services.event_indexer import EventIndexer, JournaledTable
+from app.services.feed_index import FeedIndex
+from tests.conftest import FakeContract
+
+
+def test_journaled_table_rollback_restores_previous_rows():
+    table = JournaledTable()
+    table.put("a", 1, block=1)
+    table.put("a", 2, block=2)
+    table.put("b", 1, block=2)
+    table.delete("a", block=3)
+
+    table.rollback(2)
+    assert table.get("a") == 2 and table.get("b") == 1
+
+    table.rollback(1)
+    assert table.get("a") == 1 and "b" not in table
+
+
+def test_journaled_table_drops_undo_entries_past_depth():
+    table = JournaledTable(depth=4)
+    for block in range(1, 11):
+        table.put("a", block, block)
+    assert not table.can_rollback(2)
+    assert table.can_rollback(7)
+
+
+class Recorder:
+    def __init__(self, indexer):
+        self.rows = JournaledTable()
+        self.rollbacks = []
+        indexer.on_seed(lambda block: self.rows.reset({}))
+        indexer.on_rollback(self._rollback)
+        indexer.subscribe("Set", self._on_set)
+
+    def _rollback(self, block):
+        self.rollbacks.append(block)
+        self.rows.rollback(block)
+
+    def _on_set(self, event):
+        self.rows.put(event["args"]["key"], event["args"]["value"], event["blockNumber"])
+
+
+def test_indexer_dispatches_logs_in_order(chain):
+    indexer = EventIndexer(FakeContract(), name="test")
+    recorder = Recorder(indexer)
+    indexer.sync_once()  # seeds at head
+
+    chain.mine(1, [("Set", {"key": "a", "value": 1}), ("Set", {"key": "a", "value": 2})])
+    chain.mine(1, [("Set", {"key": "b", "value": 3})])
+    assert indexer.sync_once() == 3
+    assert recorder.rows.get("a") == 2 and recorder.rows.get("b") == 3
+    assert indexer.ready
+
+
+def test_indexer_rolls_back_orphaned_blocks_and_replays_canonical_logs(chain):
+    indexer = EventIndexer(FakeContract(), name="test")
+    recorder = Recorder(indexer)
+    chain.mine(5)
+    indexer.sync_once()
+
+    chain.mine(1, [("Set", {"key": "a", "value": 1})])
+    chain.mine(1, [("Set", {"key": "a", "value": 2})])
+    indexer.sync_once()
+    assert recorder.rows.get("a") == 2
+
+    # The block holding value=2 is replaced by one holding value=9
+    chain.fork(7)
+    chain.mine(1, [("Set", {"key": "a", "value": 9})])
+    chain.mine(1)
+    indexer.sync_once()
+
+    assert recorder.rollbacks == [6]
+    assert recorder.rows.get("a") == 9
+    assert indexer.checkpoint == chain.block_number
+
+
+class FeedFunctions:
+    def __init__(self):
+        self.posts = {}
+
+    def getPost(self, post_id):
+        post = self.posts.get(post_id, (post_id, "0x0", "", "", 0, 0, 0, False))
+        return type("Call", (), {"call": lambda _, **kw: post})()
+
+
+def test_feed_index_applies_post_events_and_rolls_back():
+    functions = FeedFunctions()
+    feed = FeedIndex(FakeContract(functions))
+
+    def event(name, post_id, block):
+        return {"event": name, "args": {"postId": post_id}, "blockNumber": block}
+
+    for post_id in (1, 2, 3):
+        functions.posts[post_id] = (post_id, "0xA", f"post {post_id}", "", 100 + post_id, 0, 0, True)
+        feed._on_post_written(event("PostCreated", post_id, 10))
+    feed._adjust(event("PostLiked", 2, 11), "likeCount", 1)
+    feed._on_post_deleted(event("PostDeleted", 3, 12))
+
+    assert [p["id"] for p in feed.latest(10)] == [2, 1]
+    assert feed.get(2)["likeCount"] == 1
+
+    feed._rollback(10)
+    assert [p["id"] for p in feed.latest(10)] == [3, 2, 1]
+    assert feed.get(2)["likeCount"] == 0
+
+
+def test_feed_index_page_walks_backwards_skipping_hidden_ids():
+    functions = FeedFunctions()
+    feed = FeedIndex(FakeContract(functions))
+    for post_id in range(1, 8):
+        functions.posts[post_id] = (post_id, "0xA", "", "", 100, 0, 0, True)
+        feed._on_post_written({"event": "PostCreated", "args": {"postId": post_id}, "blockNumber": 10})
+
+    page, more = feed.page(limit=3, hidden={6})
+    assert [p["id"] for p in page] == [7, 5, 4] and more
+
+    page, more = feed.page(before_id=4, limit=3)
+    assert [p["id"] for p in page] == [3, 2, 1] and not more
+
+    # Hidden IDs don't shorten the page; the last one is still reported as the end
+    page, more = feed.page(before_id=4, limit=3, hidden={1, 2})
+    assert [p["id"] for p in page] == [3] and not more
+    assert feed.page(before_id=1) == ([], False)
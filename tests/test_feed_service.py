@@ -0,0 +1,48 @@
+# tests/test_feed_service.py
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.routers import feed as feed_router
+from app.services import feed_service
+
+OWNER = "0x00000000000000000000000000000000000000aA"
+
+
+@pytest.fixture
+def removed(monkeypatch):
+    async def ready():
+        pass
+
+    async def no_profiles(addresses):
+        return {}
+
+    monkeypatch.setattr(feed_service, "_require_hidden_content", ready)
+    monkeypatch.setattr(feed_service, "hidden_content", {7})
+    monkeypatch.setattr(feed_service.config, "FEED_INDEX_ENABLED", False)
+    monkeypatch.setattr(feed_router.profile_service, "get_profiles_by_addresses", no_profiles)
+
+
+def test_removed_post_raises_post_removed(removed):
+    with pytest.raises(feed_service.PostRemoved, match="Post 7 has been removed"):
+        asyncio.run(feed_service.get_post(7))
+
+
+@pytest.mark.parametrize("indexed_owner", [None, OWNER])
+def test_removed_post_is_a_404(removed, monkeypatch, indexed_owner):
+    monkeypatch.setattr(feed_service, "get_indexed_owner", lambda post_id: indexed_owner)
+    with pytest.raises(HTTPException) as e:
+        asyncio.run(feed_router.get_post(7))
+    assert e.value.status_code == 404
+    assert e.value.detail == "Post 7 has been removed"
+
+
+def test_other_failures_are_still_wrapped(removed, monkeypatch):
+    async def broken():
+        raise RuntimeError("Moderation state is still syncing, try again shortly")
+
+    monkeypatch.setattr(feed_service, "_require_hidden_content", broken)
+    with pytest.raises(Exception, match="Error fetching post 7: Moderation state") as e:
+        asyncio.run(feed_service.get_post(7))
+    assert not isinstance(e.value, feed_service.PostRemoved)
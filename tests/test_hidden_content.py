@@ -0,0 +1,83 @@
+# tests/test_hidden_content.py
+import pytest
+
+from app.services import hidden_content as hidden_module
+from app.services.event_indexer import EventIndexer
+from app.services.hidden_content import HiddenContent, HiddenSet
+from tests.conftest import FakeContract
+
+
+class FakeCollection:
+    def __init__(self):
+        self.docs = {}
+
+    def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = dict(doc)
+
+    def find(self, query):
+        return [dict(d) for i, d in self.docs.items() if i in query["_id"]["$in"]]
+
+
+class FakeIndex:
+    def __init__(self, contract):
+        self.contract = contract
+        self.indexer = EventIndexer(contract)
+        self.posts = {}
+
+    @property
+    def ready(self):
+        return self.indexer.ready
+
+
+@pytest.fixture
+def db(monkeypatch, chain):
+    collection = FakeCollection()
+    monkeypatch.setattr(hidden_module, "w3", chain)
+    monkeypatch.setattr(hidden_module, "get_db", lambda: {"hidden_content": collection})
+    return collection
+
+
+def _hidden(deploy_block=0):
+    return HiddenContent(FakeIndex(FakeContract()), FakeIndex(FakeContract()),
+                         deploy_block=deploy_block, log_range=3)
+
+
+def test_hidden_set_refuses_rollbacks_past_trimmed_blocks():
+    hidden = HiddenSet(depth=2)
+    for block, content_id in [(1, 10), (2, 11), (5, 12), (6, 13)]:
+        hidden.add(content_id, block)
+    assert hidden.can_rollback(5) and not hidden.can_rollback(1)
+    hidden.rollback(5)
+    assert 13 not in hidden and 12 in hidden and 10 in hidden
+
+
+def test_fresh_start_replays_removals_before_ready(chain, db):
+    chain.mine(2)
+    chain.mine(1, [("FlagResolved", {"contentId": 4, "removed": True})])
+    chain.mine(5, [("FlagResolved", {"contentId": 5, "removed": False})])
+    chain.mine(4, [("FlagResolved", {"contentId": 6, "removed": True})])
+    hidden = _hidden(deploy_block=2)
+
+    assert not hidden.ready
+    hidden.moderation_index.indexer.sync_once()
+    assert hidden.ready
+    assert 4 in hidden and 6 in hidden and 5 not in hidden
+    assert db.docs["removed"]["block"] == chain.block_number
+
+
+def test_restart_replays_only_logs_after_the_snapshot(chain, db):
+    chain.mine(3, [("FlagResolved", {"contentId": 1, "removed": True})])
+    first = _hidden()
+    first.moderation_index.indexer.sync_once()
+    first.snapshot()
+    snapshot_block = db.docs["removed"]["block"]
+
+    chain.mine(2, [("FlagResolved", {"contentId": 2, "removed": True})])
+    # Logs the snapshot covers aren't read again: this one would show up if they were
+    chain.logs[0]["args"] = {"contentId": 9, "removed": True}
+    restarted = _hidden()
+    restarted.restore()
+    restarted.moderation_index.indexer.sync_once()
+
+    assert snapshot_block == 3
+    assert 1 in restarted and 2 in restarted and 9 not in restarted
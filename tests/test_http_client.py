@@ -0,0 +1,129 @@
+# tests/test_http_client.py
+import asyncio
+import random
+
+import pytest
+
+from app.services import http_client as http_module
+from app.services.http_client import (
+    CircuitBreaker, CircuitOpenError, HttpClient, Upstream, UpstreamHTTPError,
+)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(http_module.time, "monotonic", fake.monotonic)
+    return fake
+
+
+class FakeResponse:
+    def __init__(self, status):
+        self.status = status
+        self.headers = {}
+        self.released = False
+
+    async def text(self, errors="strict"):
+        return f"status {self.status}"
+
+    async def read(self):
+        return b"{}"
+
+    def release(self):
+        self.released = True
+
+
+class FakeSession:
+    def __init__(self, statuses):
+        self.statuses = list(statuses)
+        self.requests = 0
+
+    async def request(self, method, url, timeout=None, **kwargs):
+        self.requests += 1
+        return FakeResponse(self.statuses.pop(0))
+
+
+def _client(statuses):
+    client = HttpClient()
+    client._session = session = FakeSession(statuses)
+    client._get_session = lambda: session
+    return client, session
+
+
+def _upstream(**kwargs):
+    kwargs.setdefault("backoff", 0)
+    return Upstream("test", timeout=5, **kwargs)
+
+
+def test_breaker_opens_then_half_opens_and_closes_on_a_good_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    clock.now += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow() and not breaker.allow()  # a single trial call
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    clock.now += 29
+    assert not breaker.allow()
+
+
+def test_retry_statuses_are_retried_until_success():
+    client, session = _client([503, 429, 200])
+    upstream = _upstream(retries=2)
+    response = asyncio.run(client.request(upstream, "GET", "http://x"))
+    assert response.status == 200 and session.requests == 3
+    assert upstream.breaker._failures == 0
+
+
+def test_retries_give_up_with_the_last_status():
+    client, session = _client([502, 502])
+    with pytest.raises(UpstreamHTTPError) as e:
+        asyncio.run(client.request(_upstream(retries=1), "GET", "http://x"))
+    assert e.value.status == 502 and session.requests == 2
+
+
+def test_client_errors_are_not_retried_and_do_not_reset_failures():
+    upstream = _upstream(retries=0, failure_threshold=3)
+    client, session = _client([500, 500, 401, 404, 500])
+    for _ in range(4):
+        with pytest.raises(UpstreamHTTPError):
+            asyncio.run(client.request(upstream, "GET", "http://x"))
+    assert upstream.breaker._failures == 2 and upstream.breaker.state == "closed"
+
+    with pytest.raises(UpstreamHTTPError):
+        asyncio.run(client.request(upstream, "GET", "http://x"))
+    assert upstream.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(client.request(upstream, "GET", "http://x"))
+    assert session.requests == 5
+
+
+def test_retry_delay_is_full_jitter_capped_by_max_backoff():
+    random.seed(5)
+    upstream = Upstream("test", timeout=5, backoff=0.5, max_backoff=3)
+    for attempt, cap in [(0, 0.5), (1, 1), (2, 2), (5, 3)]:
+        delays = [upstream.delay(attempt) for _ in range(200)]
+        assert all(0 <= d <= cap for d in delays)
+        # Spread over the whole range, not a fixed step
+        assert max(delays) - min(delays) > cap / 2
@@ -0,0 +1,80 @@
+# tests/test_leaderboard.py
+import random
+from bisect import bisect_left, insort
+
+from web3 import Web3
+
+from app.services import streak_projection, streak_service
+from app.services.leaderboard import RankedSet, StreakLeaderboard
+from app.services.streak_projection import StreakState
+
+
+def test_ranked_set_matches_a_sorted_list():
+    rng = random.Random(11)
+    ranked, model = RankedSet(), []
+    for _ in range(3000):
+        key = rng.randrange(500)
+        if rng.random() < 0.6:
+            ranked.insert(key)
+            if key not in model:
+                insort(model, key)
+        else:
+            assert ranked.remove(key) == (key in model)
+            if key in model:
+                model.remove(key)
+        assert len(ranked) == len(model)
+        probe = rng.randrange(520)
+        assert ranked.count_below(probe) == bisect_left(model, probe)
+        start = rng.randrange(len(model) + 2)
+        assert ranked.slice(start, 7) == model[start:start + 7]
+
+
+def _state(last_day, run):
+    return StreakState(last_day, 1, run)
+
+
+def test_ties_share_a_rank_across_pages():
+    board = StreakLeaderboard()
+    board.rollover(10)
+    for address, run in [("A", 5), ("B", 3), ("C", 5), ("D", 3), ("E", 1)]:
+        board.update(address, _state(10, run))
+    assert [(r["rank"], r["address"]) for r in board.page(0, 5)] == \
+        [(1, "A"), (1, "C"), (3, "B"), (3, "D"), (5, "E")]
+    assert board.page(3, 2)[0]["rank"] == 3
+    assert board.rank("D") == {"rank": 3, "address": "D", "streak": 3}
+
+
+def test_entries_survive_eviction_and_expire_by_day():
+    board = StreakLeaderboard()
+    board.rollover(10)
+    board.update("A", _state(10, 4))
+    board.update("B", _state(9, 2))
+    board.update("A", None)  # evicted from the projection
+    assert board.rank("A")["streak"] == 4
+
+    assert board.expiring(11) == ["B"]
+    board.rollover(11)
+    assert board.rank("B") is None and board.rank("A") is not None
+    board.rollover(12)
+    assert len(board) == 0
+
+
+def test_due_users_are_reread_before_they_expire(monkeypatch):
+    alive, broken = (Web3.to_checksum_address(f"0x{c * 40}") for c in "ab")
+    board = StreakLeaderboard()
+    monkeypatch.setattr(streak_service, "streak_leaderboard", board)
+    board.rollover(10)
+    board.update(alive, _state(9, 3))  # completed day 11 without the projection seeing it
+    board.update(broken, _state(9, 2))
+
+    chain = {alive: (4, [True, True] + [False] * 5), broken: (0, [False] * 7)}
+
+    def batch_call(calls, block_identifier="latest"):
+        addresses = [c.args[0] for c in calls[1:]]
+        n = len(addresses) // 2
+        return [11] + [chain[a][0] for a in addresses[:n]] + [chain[a][1] for a in addresses[n:]]
+
+    monkeypatch.setattr(streak_projection, "batch_call", batch_call)
+    streak_service._revalidate_and_rollover(11)
+    assert board.rank(alive) == {"rank": 1, "address": alive, "streak": 4}
+    assert board.rank(broken) is None and len(board) == 1
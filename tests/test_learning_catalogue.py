@@ -0,0 +1,72 @@
+# tests/test_learning_catalogue.py
+from app.services import learning_catalogue
+from app.services.learning_catalogue import CatalogueSnapshot, LearningCatalogue, modules_from_columns
+from tests.conftest import FakeContract
+
+
+def _topic(topic_id):
+    return {"id": topic_id, "title": f"topic {topic_id}", "description": "", "totalModules": 1}
+
+
+def _modules(topic_id, *module_ids, deleted=()):
+    return (
+        list(module_ids), [f"m{i}" for i in module_ids], ["" for _ in module_ids],
+        [3 for _ in module_ids], [2 for _ in module_ids], [i not in deleted for i in module_ids],
+    )
+
+
+def test_modules_from_columns_skips_deleted_modules():
+    modules = modules_from_columns(1, _modules(1, 10, 11, 12, deleted={11}))
+    assert [m["id"] for m in modules] == [10, 12]
+    assert modules[0] == {"id": 10, "topicId": 1, "title": "m10", "contentHash": "",
+                          "questionCount": 3, "passScore": 2}
+
+
+def test_snapshot_reads_are_copies_and_with_topic_leaves_the_original_alone():
+    entry = (_topic(1), modules_from_columns(1, _modules(1, 10)))
+    snapshot = CatalogueSnapshot(5, {1: entry})
+
+    topic, modules = snapshot.topic(1)
+    topic["title"] = "changed"
+    modules[0]["title"] = "changed"
+    assert snapshot.topic(1)[0]["title"] == "topic 1"
+    assert snapshot.topic(1)[1][0]["title"] == "m10"
+
+    updated = snapshot.with_topic(6, 2, (_topic(2), ()))
+    removed = updated.with_topic(7, 1, None)
+    assert snapshot.topic_ids() == [1] and snapshot.block == 5
+    assert updated.topic_ids() == [1, 2] and updated.block == 6
+    assert removed.topic_ids() == [2] and removed.topic(1) is None
+    # Unchanged topics are shared between snapshots
+    assert updated._topics[1] is entry
+
+
+def test_topic_events_swap_in_a_snapshot_with_only_that_topic_reread(monkeypatch):
+    reads = []
+
+    class Functions:
+        def getTopic(self, topic_id):
+            return ("getTopic", topic_id)
+
+        def getModulesByTopic(self, topic_id):
+            return ("getModulesByTopic", topic_id)
+
+    def batch_call(calls, block_identifier="latest"):
+        reads.append((calls, block_identifier))
+        topic_id = calls[0][1]
+        return [(topic_id, "new", "", 2, topic_id != 3), _modules(topic_id, 20, 21)]
+
+    monkeypatch.setattr(learning_catalogue, "batch_call", batch_call)
+    catalogue = LearningCatalogue(FakeContract(Functions()))
+    catalogue.snapshot = CatalogueSnapshot(5, {1: (_topic(1), ()), 3: (_topic(3), ())})
+    before = catalogue.snapshot
+
+    catalogue._on_topic_changed({"args": {"topicId": 1}, "blockNumber": 8})
+    assert reads == [([("getTopic", 1), ("getModulesByTopic", 1)], 8)]
+    assert catalogue.snapshot.topic(1)[0]["title"] == "new"
+    assert [m["id"] for m in catalogue.snapshot.topic(1)[1]] == [20, 21]
+    assert before.topic(1)[0]["title"] == "topic 1"
+
+    # A topic that no longer exists at the event's block is dropped
+    catalogue._on_topic_changed({"args": {"topicId": 3}, "blockNumber": 9})
+    assert catalogue.snapshot.topic_ids() == [1] and catalogue.snapshot.block == 9
@@ -0,0 +1,80 @@
+# tests/test_learning_service.py
+import asyncio
+
+import pytest
+
+from app import config
+from app.services import learning_service
+from app.services.learning_service import quiz_cache_key, quiz_memo
+
+QUIZ = [{"q": "What is 1 + 1?", "options": ["1", "2", "3", "4"], "answerIndex": 1}]
+
+
+class FakeCollection:
+    def __init__(self, docs=None):
+        self.docs = docs or {}
+
+    async def find_one(self, query):
+        if "_id" in query:
+            return self.docs.get(query["_id"])
+        return {"content": "Addition adds numbers.", **query}
+
+    async def replace_one(self, query, doc, upsert=False):
+        self.docs[query["_id"]] = doc
+
+
+@pytest.fixture
+def quiz_env(monkeypatch):
+    env = {"cache": FakeCollection(), "requests": []}
+
+    async def request_quiz(content_text, question_count):
+        env["requests"].append((content_text, question_count))
+        await asyncio.sleep(0.01)
+        return QUIZ
+
+    monkeypatch.setattr(learning_service, "OPENROUTER_KEY", "key")
+    monkeypatch.setattr(learning_service, "_quiz_indexes_ready", True)
+    monkeypatch.setattr(learning_service, "modules_col", lambda: FakeCollection())
+    monkeypatch.setattr(learning_service, "quiz_cache_col", lambda: env["cache"])
+    monkeypatch.setattr(learning_service, "_request_quiz", request_quiz)
+    quiz_memo.clear()
+    yield env
+    quiz_memo.clear()
+
+
+def test_cache_key_changes_with_version_model_count_and_content(monkeypatch):
+    key = quiz_cache_key("text", 5)
+    assert quiz_cache_key("text", 5) == key
+    assert quiz_cache_key("text", 6) != key
+    assert quiz_cache_key("other text", 5) != key
+    monkeypatch.setattr(config, "QUIZ_CACHE_VERSION", "next")
+    assert quiz_cache_key("text", 5) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(learning_service, "QUIZ_MODEL", "another/model")
+    assert quiz_cache_key("text", 5) != key
+
+
+def test_generated_quiz_is_stored_and_served_from_cache(quiz_env):
+    first = asyncio.run(learning_service.generate_quiz_ai(1, 2, 5))
+    quiz_memo.clear()  # a new worker: only the Mongo cache is left
+    second = asyncio.run(learning_service.generate_quiz_ai(1, 2, 5))
+    assert first == second == QUIZ
+    assert len(quiz_env["requests"]) == 1
+    assert list(quiz_env["cache"].docs.values())[0]["quiz"] == QUIZ
+
+
+def test_concurrent_misses_share_one_generation(quiz_env):
+    async def run():
+        return await asyncio.gather(*(learning_service.generate_quiz_ai(1, 2, 5) for _ in range(10)))
+
+    assert all(quiz == QUIZ for quiz in asyncio.run(run()))
+    assert len(quiz_env["requests"]) == 1
+
+
+def test_failed_generation_is_not_cached(quiz_env, monkeypatch):
+    async def broken(content_text, question_count):
+        raise ValueError("AI returned no valid questions")
+
+    monkeypatch.setattr(learning_service, "_request_quiz", broken)
+    placeholder = asyncio.run(learning_service.generate_quiz_ai(1, 2, 3))
+    assert len(placeholder) == 3 and not quiz_env["cache"].docs
@@ -0,0 +1,135 @@
+# tests/test_moderation_index.py
+import pytest
+
+from app.services import moderation_index as moderation_index_module
+from app.services.moderation_index import ModerationIndex, ModerationStore, _content_row
+from tests.conftest import FakeContract
+
+
+def _flags(content_id, *flaggers, resolved=()):
+    return [{"contentId": content_id, "flagger": f, "resolved": f in resolved} for f in flaggers]
+
+
+def _queue_ids(store):
+    return [row["contentId"] for row in store.queue()[0]]
+
+
+def test_queue_orders_by_unresolved_count_then_recency():
+    store = ModerationStore()
+    store.reset({
+        1: _content_row(1, _flags(1, "A"), 10),
+        2: _content_row(2, _flags(2, "A", "B"), 5),
+        3: _content_row(3, _flags(3, "B"), 12),
+        4: _content_row(4, _flags(4, "C", resolved={"C"}), 12, removed=False),
+    })
+    assert _queue_ids(store) == [2, 3, 1]
+    assert store.queue(offset=1, limit=1)[0][0]["contentId"] == 3
+    assert store.queue()[1] == 3
+    assert store.flagger_counts("A") == {"flags": 2, "unresolved": 2}
+    assert store.flagger_counts("C") == {"flags": 1, "unresolved": 0}
+
+
+def test_put_moves_rows_and_flagger_counts_incrementally():
+    store = ModerationStore()
+    store.reset({1: _content_row(1, _flags(1, "A"), 10)})
+    store.put(_content_row(2, _flags(2, "B"), 11), block=11)
+    assert _queue_ids(store) == [2, 1]
+
+    store.put(_content_row(1, _flags(1, "A", "B"), 12), block=12)
+    assert _queue_ids(store) == [1, 2]
+    # Resolving leaves the queue but keeps the flag in the flagger's totals
+    store.put(_content_row(2, _flags(2, "B", resolved={"B"}), 11, removed=True), block=13)
+    assert _queue_ids(store) == [1]
+    assert store.flagger_counts("B") == {"flags": 2, "unresolved": 1}
+    assert store.get_many([2, 9]) == {2: _flags(2, "B", resolved={"B"}), 9: []}
+
+
+def test_rollback_restores_the_queue_and_counts():
+    store = ModerationStore()
+    store.reset({1: _content_row(1, _flags(1, "A"), 10)})
+    store.put(_content_row(1, _flags(1, "A", resolved={"A"}), 10, removed=True), block=11)
+    store.put(_content_row(3, _flags(3, "D"), 12), block=12)
+
+    store.rollback(10)
+    assert _queue_ids(store) == [1]
+    assert store.flagger_counts("A") == {"flags": 1, "unresolved": 1}
+    assert store.flagger_counts("D") == {"flags": 0, "unresolved": 0}
+    assert store.get(3) is None
+
+
+class FakeCall:
+    def __init__(self, functions, name, content_id=None):
+        self.functions, self.name, self.content_id = functions, name, content_id
+
+    def call(self, block_identifier="latest"):
+        self.functions.reads.append((self.name, self.content_id, block_identifier))
+        if self.name == "nextPostId":
+            return self.functions.total
+        return [(self.content_id, flagger, resolved)
+                for flagger, resolved in self.functions.flags.get(self.content_id, [])]
+
+
+class ModerationFunctions:
+    """getFlags/nextPostId answered from `flags` as it is *now*, like a "latest" read."""
+
+    def __init__(self, total=0, flags=None):
+        self.total = total
+        self.flags = flags or {}  # content ID -> [(flagger, resolved)]
+        self.reads = []
+
+    def getFlags(self, content_id):
+        return FakeCall(self, "getFlags", content_id)
+
+    def nextPostId(self):
+        return FakeCall(self, "nextPostId")
+
+
+@pytest.fixture
+def batches(monkeypatch):
+    calls = []
+
+    def batch_call(bound, block_identifier="latest"):
+        bound = list(bound)
+        calls.append(([b.content_id for b in bound], block_identifier))
+        return [b.call(block_identifier) for b in bound]
+
+    monkeypatch.setattr(moderation_index_module, "batch_call", batch_call)
+    return calls
+
+
+def _index(functions):
+    contract = FakeContract(functions)
+    return ModerationIndex(contract, FakeContract(functions))
+
+
+def test_seed_reads_every_post_in_one_batch_call(chain, batches):
+    functions = ModerationFunctions(total=4, flags={1: [("A", False)], 3: [("B", True)]})
+    index = _index(functions)
+    chain.mine(10)
+    index.indexer.sync_once()
+
+    assert batches == [([0, 1, 2, 3], 10)]
+    assert ("nextPostId", None, 10) in functions.reads
+    assert index.store.get_many([0, 1, 2, 3]) == {0: [], 1: _flags(1, "A"), 2: [], 3: _flags(3, "B", resolved={"B"})}
+    assert index.store.rows.get(1)["lastFlaggedBlock"] == 10
+
+
+def test_resolution_is_read_at_latest_without_later_flags(chain, batches):
+    functions = ModerationFunctions(total=1)
+    index = _index(functions)
+    chain.mine(5)
+    index.indexer.sync_once()
+    functions.reads.clear()
+
+    chain.mine(1, [("ContentFlagged", {"contentId": 0, "flagger": "A"})])
+    chain.mine(1, [("FlagResolved", {"contentId": 0, "removed": True})])
+    chain.mine(1, [("ContentFlagged", {"contentId": 0, "flagger": "B"})])
+    # Chain state as of now: A resolved, B flagged after the resolution
+    functions.flags[0] = [("A", True), ("B", False)]
+    index.indexer.sync_once()
+
+    assert functions.reads == [("getFlags", 0, "latest")]
+    assert index.store.get(0) == _flags(0, "A", "B", resolved={"A"})
+    row = index.store.rows.get(0)
+    assert (row["removed"], row["unresolved"], row["lastFlaggedBlock"]) == (True, 1, 8)
+    assert index.store.flagger_counts("B") == {"flags": 1, "unresolved": 1}
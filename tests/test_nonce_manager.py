@@ -0,0 +1,69 @@
+# tests/test_nonce_manager.py
+import asyncio
+import threading
+
+from app.services.nonce_manager import NonceManager, is_nonce_error
+
+
+def test_nonces_are_consecutive_after_one_chain_fetch():
+    manager = NonceManager()
+    fetches = []
+
+    def fetch():
+        fetches.append(1)
+        return 7
+
+    assert [manager.reserve(fetch) for _ in range(3)] == [7, 8, 9]
+    assert len(fetches) == 1
+
+
+def test_concurrent_reservations_never_repeat():
+    manager = NonceManager()
+    nonces = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(100):
+            nonce = manager.reserve(lambda: 0)
+            with lock:
+                nonces.append(nonce)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(nonces) == list(range(800))
+
+
+def test_release_reuses_latest_nonce_and_resyncs_on_gap():
+    manager = NonceManager()
+    a = manager.reserve(lambda: 10)
+    b = manager.reserve(lambda: 10)
+    manager.release(b)
+    assert manager.reserve(lambda: 99) == b
+
+    manager.release(a)  # out of order: leaves a gap, reload from the chain
+    assert not manager.synced
+    assert manager.reserve(lambda: 42) == 42
+
+
+def test_async_reservations_fetch_once():
+    manager = NonceManager()
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        await asyncio.sleep(0.01)
+        return 5
+
+    async def main():
+        return await asyncio.gather(*(manager.areserve(fetch) for _ in range(10)))
+
+    assert sorted(asyncio.run(main())) == list(range(5, 15))
+    assert len(fetches) == 1
+
+
+def test_nonce_error_detection():
+    assert is_nonce_error(ValueError("{'message': 'nonce too low'}"))
+    assert not is_nonce_error(ValueError("insufficient funds"))
@@ -0,0 +1,65 @@
+# tests/test_proposal_index.py
+import itertools
+import random
+
+import pytest
+
+from app.services.proposal_index import ProposalStore, proposal_status
+
+NOW = 1000
+
+
+def _row(proposal_id, proposer, end_time, executed=False):
+    return {"id": proposal_id, "proposer": proposer, "description": "", "startTime": 0,
+            "endTime": end_time, "yesVotes": 0, "noVotes": 0, "executed": executed}
+
+
+@pytest.fixture
+def store():
+    rng = random.Random(7)
+    store = ProposalStore()
+    # A few share an end time, so the (endTime, id) tiebreak is exercised
+    store.reset({i: _row(i, rng.choice("ABC"), rng.choice([900, 950, 1000, 1050, 1100]),
+                         executed=rng.random() < 0.2)
+                 for i in range(40)})
+    return store
+
+
+def _all_pages(store, **filters):
+    rows, cursor = [], None
+    while True:
+        page, cursor = store.query(cursor=cursor, limit=3, now=NOW, **filters)
+        rows += page
+        if cursor is None:
+            return [r["id"] for r in rows]
+
+
+@pytest.mark.parametrize("proposer,status,sort,descending", list(itertools.product(
+    [None, "B"], [None, "live", "ended", "executed"], ["id", "endTime"], [True, False])))
+def test_paged_query_matches_a_full_scan(store, proposer, status, sort, descending):
+    expected = sorted(
+        (r for r in store.rows.values()
+         if (proposer is None or r["proposer"] == proposer)
+         and (status is None or proposal_status(r, NOW) == status)),
+        key=lambda r: (r["id"],) if sort == "id" else (r["endTime"], r["id"]),
+        reverse=descending,
+    )
+    got = _all_pages(store, proposer=proposer, status=status, sort=sort, descending=descending)
+    assert got == [r["id"] for r in expected]
+
+
+def test_rollback_rebuilds_indexes(store):
+    store.put(_row(40, "D", 2000), block=5)
+    store.update(3, 6, executed=True)
+    assert [r["id"] for r in store.by_proposer("D")] == [40]
+
+    store.rollback(4)
+    assert store.by_proposer("D") == [] and store.get(40) is None
+    assert _all_pages(store, sort="endTime")[0] != 40
+
+
+def test_query_rejects_bad_arguments(store):
+    with pytest.raises(ValueError):
+        store.query(status="open")
+    with pytest.raises(ValueError):
+        store.query(sort="endTime", cursor="12")
@@ -0,0 +1,71 @@
+# tests/test_quiz_stream.py
+import asyncio
+import json
+
+import pytest
+
+from app.services import learning_service
+from app.services.learning_service import QuizStreamParser
+
+QUESTIONS = [
+    {"q": 'Which brace is "{"?', "options": ["{", "}", "[", "]"], "answerIndex": 0},
+    {"q": "Escapes: \\ and \" and \\\"", "options": ["a", "b", "c", "d"], "answerIndex": 3},
+    {"q": "Nested [1, {2}] text", "options": ["x", "y", "z", "w"], "answerIndex": 2},
+]
+TEXT = json.dumps(QUESTIONS)
+
+
+def _feed(chunks):
+    parser = QuizStreamParser()
+    return [q for chunk in chunks for q in parser.feed(chunk)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(TEXT)])
+def test_any_chunking_yields_the_same_questions(size):
+    # Size 1 and 2 split inside strings and between a backslash and what it escapes
+    assert _feed(TEXT[i:i + size] for i in range(0, len(TEXT), size)) == QUESTIONS
+
+
+def test_questions_are_yielded_as_soon_as_they_close():
+    parser = QuizStreamParser()
+    first_end = TEXT.index("}, {") + 1
+    assert parser.feed(TEXT[:first_end - 1]) == []
+    assert parser.feed(TEXT[first_end - 1:first_end + 3]) == QUESTIONS[:1]
+    assert parser.feed(TEXT[first_end + 3:]) == QUESTIONS[1:]
+
+
+def test_wrapping_text_and_objects_are_ignored():
+    wrapped = 'Sure! [quiz below]\n```json\n{"questions": ' + TEXT + "}\n```"
+    assert _feed([wrapped]) == QUESTIONS
+
+
+def test_malformed_and_truncated_output_only_yields_complete_questions():
+    bad = json.dumps({"q": "no options", "answerIndex": 1})
+    broken_index = json.dumps({"q": "x", "options": ["a"], "answerIndex": "two"})
+    truncated = json.dumps(QUESTIONS[1])[:-5]
+    assert _feed(["[", json.dumps(QUESTIONS[0]), ",", bad, ",", broken_index, ",", truncated]) == QUESTIONS[:1]
+    assert _feed(['[{"q": "a", "options": [}, ', json.dumps(QUESTIONS[2]), "]"]) == []
+
+
+def test_stream_quiz_raises_when_the_model_returns_nothing_usable(monkeypatch):
+    class Modules:
+        async def find_one(self, query):
+            # Nothing cached for the quiz key; the module has some text
+            return None if "_id" in query else {"content": "text"}
+
+    async def stream(prompt):
+        for chunk in ["I can't ", "make a quiz."]:
+            yield chunk
+
+    monkeypatch.setattr(learning_service, "OPENROUTER_KEY", "key")
+    monkeypatch.setattr(learning_service, "_quiz_indexes_ready", True)
+    monkeypatch.setattr(learning_service, "modules_col", lambda: Modules())
+    monkeypatch.setattr(learning_service, "quiz_cache_col", lambda: Modules())
+    monkeypatch.setattr(learning_service, "_stream_completion", stream)
+
+    async def run():
+        return [q async for q in learning_service.stream_quiz_ai(1, 1, 3)]
+
+    with pytest.raises(ValueError):
+        asyncio.run(run())
+
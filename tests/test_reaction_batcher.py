@@ -0,0 +1,76 @@
+# tests/test_reaction_batcher.py
+import asyncio
+
+import pytest
+
+from app.services import reaction_batcher as batcher_module
+from app.services.reaction_batcher import ReactionBatcher
+from app.services.tx_tracker import CONFIRMED
+
+
+class FakeTracker:
+    def __init__(self):
+        self.sent = []
+
+    async def submit(self, tx):
+        self.sent.append(tx)
+        return {"txHash": f"0x{len(self.sent):064x}", "state": "pending", "status": None,
+                "blockNumber": None, "submittedAt": 0}
+
+    async def wait(self, tx_hash, timeout=None):
+        return {"txHash": tx_hash, "state": CONFIRMED, "status": 1}
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    fake = FakeTracker()
+    monkeypatch.setattr(batcher_module, "tx_tracker", fake)
+    return fake
+
+
+async def _build_tx(action, post_id):
+    return (action, post_id)
+
+
+def test_opposite_reactions_net_out_and_repeats_collapse(tracker):
+    async def run():
+        batcher = ReactionBatcher(_build_tx, window=0.01)
+        return await asyncio.gather(
+            batcher.submit(1, "likePost"),
+            batcher.submit(1, "removeLike"),
+            batcher.submit(2, "likePost"),
+            batcher.submit(2, "likePost"),
+            batcher.submit(2, "dislikePost", wait=False),
+        )
+
+    netted, _, liked, _, disliked = asyncio.run(run())
+    assert tracker.sent == [("likePost", 2), ("dislikePost", 2)]
+    assert netted == {"txHash": None, "status": 1}
+    # Receipt shape of the unbatched path: hash without 0x
+    assert liked == {"txHash": f"{1:064x}", "status": 1}
+    assert disliked["txHash"] == f"0x{2:064x}" and disliked["state"] == "pending"
+
+
+def test_netted_result_without_wait_matches_tracker_record(tracker):
+    async def run():
+        batcher = ReactionBatcher(_build_tx, window=0.01)
+        return await asyncio.gather(batcher.submit(3, "dislikePost", wait=False),
+                                    batcher.submit(3, "removeDislike", wait=False))
+
+    result, _ = asyncio.run(run())
+    assert set(result) == {"txHash", "state", "status", "blockNumber", "submittedAt"}
+    assert result["txHash"] is None and result["state"] == CONFIRMED
+
+
+def test_stop_sends_queued_reactions(tracker):
+    async def run():
+        batcher = ReactionBatcher(_build_tx, window=60)
+        pending = asyncio.ensure_future(batcher.submit(4, "likePost", wait=False))
+        await asyncio.sleep(0)
+        await batcher.stop()
+        return await pending, batcher
+
+    result, batcher = asyncio.run(run())
+    assert tracker.sent == [("likePost", 4)]
+    assert result["txHash"] is not None
+    assert not batcher._flushes and not batcher._waiters
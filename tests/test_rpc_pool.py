@@ -0,0 +1,303 @@
+# tests/test_rpc_pool.py
+import asyncio
+import json
+
+import pytest
+import requests
+
+from app.services import rpc_pool as rpc_module
+from app.services.rpc_pool import AsyncMultiHTTPProvider, EndpointPool, MultiHTTPProvider
+
+URLS = ["http://a", "http://b", "http://c"]
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(rpc_module.time, "monotonic", fake.monotonic)
+    return fake
+
+
+class FakeNode:
+    """Stands in for a per-endpoint HTTPProvider; raises or answers in turn."""
+
+    def __init__(self, url, outcomes=()):
+        self.url = url
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def _next(self, method):
+        self.calls.append(method)
+        outcome = self.outcomes.pop(0) if self.outcomes else {"result": self.url}
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    def make_request(self, method, params):
+        return self._next(method)
+
+    def make_batch_request(self, batch_requests):
+        return [self._next(method) for method, _ in batch_requests]
+
+
+class AsyncFakeNode(FakeNode):
+    async def make_request(self, method, params):
+        return self._next(method)
+
+    async def make_batch_request(self, batch_requests):
+        return [self._next(method) for method, _ in batch_requests]
+
+    async def disconnect(self):
+        self.calls.append("disconnect")
+
+
+def _pool(**kwargs):
+    kwargs.setdefault("explore", 0)
+    return EndpointPool(URLS, **kwargs)
+
+
+def _measure(pool):
+    # a is left unmeasured so it is tried first; b is the best of the rest
+    pool.record_success(pool.endpoints[1], 0.1)
+    pool.record_success(pool.endpoints[2], 0.2)
+
+
+def _provider(pool, outcomes, cls=MultiHTTPProvider, node=FakeNode):
+    provider = cls(pool)
+    nodes = {url: node(url, outcomes.get(url, ())) for url in URLS}
+    provider._providers = nodes
+    return provider, nodes
+
+
+def test_requires_an_endpoint():
+    with pytest.raises(ValueError):
+        EndpointPool([])
+
+
+def test_reads_prefer_the_lowest_scoring_node(clock):
+    pool = _pool()
+    a, b, c = pool.endpoints
+    pool.record_success(a, 0.3)
+    pool.record_success(b, 0.1)
+    pool.record_success(c, 0.2)
+    assert pool.read_order() == [b, c, a]
+
+
+def test_latency_is_an_ewma(clock):
+    pool = _pool(alpha=0.5)
+    a = pool.endpoints[0]
+    pool.record_success(a, 0.1)
+    assert a.latency == pytest.approx(0.1)
+    pool.record_success(a, 0.3)
+    assert a.latency == pytest.approx(0.2)
+
+
+def test_errors_inflate_the_score(clock):
+    pool = _pool(eject_after=10)
+    a, b, c = pool.endpoints
+    pool.record_success(a, 0.1)
+    pool.record_success(b, 0.15)
+    pool.record_success(c, 0.5)
+    pool.record_failure(a, OSError("reset"))
+    assert a.error_rate == pytest.approx(0.2)
+    assert a.score > b.score
+    assert pool.read_order()[0] is b
+
+    pool.record_success(a, 0.1)
+    assert a.error_rate == pytest.approx(0.16)
+    assert a.failures == 0
+
+
+def test_unmeasured_nodes_are_tried_first(clock):
+    pool = _pool()
+    a, b, c = pool.endpoints
+    pool.record_success(a, 0.1)
+    assert pool.read_order()[0] in (b, c)
+
+
+def test_unmeasured_node_that_failed_goes_behind_measured_ones(clock):
+    pool = _pool()
+    a, b, c = pool.endpoints
+    pool.record_failure(a, OSError())
+    pool.record_success(b, 0.1)
+    pool.record_success(c, 0.2)
+    assert pool.read_order() == [b, c, a]
+
+
+def test_ejection_cooldown_doubles_and_resets(clock):
+    pool = _pool(eject_after=2, cooldown=10, max_cooldown=25)
+    a = pool.endpoints[0]
+
+    pool.record_failure(a, OSError())
+    assert a.available(clock.now)
+    pool.record_failure(a, OSError())
+    assert a.ejected_until == clock.now + 10
+    assert pool.read_order()[-1] is a  # ejected nodes only as a last resort
+
+    clock.now += 10
+    assert a.available(clock.now)
+    pool.record_failure(a, OSError())  # one failure on probation ejects again
+    assert a.ejected_until == clock.now + 20
+
+    clock.now += 20
+    pool.record_failure(a, OSError())
+    assert a.ejected_until == clock.now + 25  # capped at max_cooldown
+
+    clock.now += 25
+    pool.record_success(a, 0.1)
+    assert (a.failures, a.ejections) == (0, 0)
+    pool.record_failure(a, OSError())
+    assert a.available(clock.now)
+
+
+def test_writes_stay_pinned_until_the_node_is_ejected(clock):
+    changes = []
+    pool = _pool(eject_after=1, on_write_change=changes.append)
+    a, b, c = pool.endpoints
+    for endpoint, latency in ((a, 0.2), (b, 0.01), (c, 0.1)):
+        pool.record_success(endpoint, latency)  # a faster node does not move the writes
+
+    assert pool.order_for(["eth_sendRawTransaction"]) == [a, b, c]
+    assert pool.order_for(["eth_getTransactionCount"])[0] is a
+    assert pool.order_for(["eth_call"])[0] is b
+    assert changes == []
+
+    pool.record_failure(a, OSError())
+    assert pool.write_order() == [b, a, c]
+    assert changes == ["http://b"]
+
+    clock.now += 60  # a is healthy again, but writes stay where they are
+    assert pool.write_order()[0] is b
+    assert [s["writes"] for s in pool.stats()] == [False, True, False]
+
+
+def test_read_fails_over_to_the_next_node(clock):
+    pool = _pool()
+    provider, nodes = _provider(pool, {"http://a": [requests.ConnectionError("refused")]})
+
+    assert provider.make_request("eth_blockNumber", []) == {"result": "http://b"}
+    a, b, _ = pool.endpoints
+    assert (a.failures, a.requests) == (1, 1)
+    assert (b.failures, b.requests) == (0, 1)
+
+
+@pytest.mark.parametrize("error", [
+    requests.Timeout("slow"),
+    requests.HTTPError("502 Bad Gateway"),
+    json.JSONDecodeError("not json", "<html>", 0),
+    TimeoutError(),
+])
+def test_node_errors_count_against_the_node(clock, error):
+    pool = _pool()
+    provider, _ = _provider(pool, {"http://a": [error]})
+    assert provider.make_request("eth_blockNumber", []) == {"result": "http://b"}
+    assert pool.endpoints[0].failures == 1
+
+
+@pytest.mark.parametrize("error", [ValueError("execution reverted"), TypeError("bad params")])
+def test_request_errors_do_not_fail_over(clock, error):
+    pool = _pool()
+    provider, nodes = _provider(pool, {"http://a": [error]})
+
+    with pytest.raises(type(error)):
+        provider.make_request("eth_call", [])
+    assert nodes["http://b"].calls == []
+    assert pool.endpoints[0].failures == 0
+    assert pool.endpoints[0].error_rate == 0
+
+
+def test_rpc_error_responses_are_returned_not_failed_over(clock):
+    pool = _pool()
+    revert = {"error": {"code": 3, "message": "execution reverted"}}
+    provider, nodes = _provider(pool, {"http://a": [revert]})
+
+    assert provider.make_request("eth_call", []) == revert
+    assert nodes["http://b"].calls == []
+    assert pool.endpoints[0].failures == 0
+
+
+def test_gives_up_after_max_attempts(clock):
+    pool = EndpointPool(URLS + ["http://d"], explore=0)
+    provider = MultiHTTPProvider(pool, max_attempts=2)
+    provider._providers = {e.url: FakeNode(e.url, [OSError(e.url)]) for e in pool.endpoints}
+
+    with pytest.raises(OSError, match="http://b"):
+        provider.make_request("eth_blockNumber", [])
+    assert [len(n.calls) for n in provider._providers.values()] == [1, 1, 0, 0]
+
+
+def test_failed_node_is_routed_around(clock):
+    pool = _pool(eject_after=1)
+    _measure(pool)
+    provider, nodes = _provider(pool, {"http://a": [OSError()]})
+    provider.make_request("eth_blockNumber", [])
+    assert not pool.endpoints[0].available(clock.now)
+
+    provider.make_request("eth_blockNumber", [])
+    provider.make_request("eth_blockNumber", [])
+    assert len(nodes["http://a"].calls) == 1
+    assert len(nodes["http://b"].calls) == 3
+    assert nodes["http://c"].calls == []
+
+
+def test_batch_with_a_write_uses_the_pinned_node(clock):
+    pool = _pool()
+    provider, nodes = _provider(pool, {})
+    pool.record_success(pool.endpoints[0], 1.0)  # slowest node, but pinned for writes
+
+    provider.make_batch_request([("eth_getTransactionCount", []), ("eth_chainId", [])])
+    assert nodes["http://a"].calls == ["eth_getTransactionCount", "eth_chainId"]
+
+    provider.make_batch_request([("eth_chainId", []), ("eth_blockNumber", [])])
+    assert nodes["http://a"].calls == ["eth_getTransactionCount", "eth_chainId"]
+
+
+def test_failed_write_moves_the_pin_and_notifies(clock):
+    changes = []
+    pool = _pool(eject_after=1, on_write_change=changes.append)
+    provider, nodes = _provider(pool, {"http://a": [requests.ConnectionError()]})
+    pool.write_order()  # pin the first node
+
+    assert provider.make_request("eth_sendRawTransaction", ["0x"]) == {"result": "http://b"}
+    assert changes == []  # a is ejected, but the pin only moves on the next write
+    provider.make_request("eth_sendRawTransaction", ["0x"])
+    assert changes == ["http://b"]
+    assert nodes["http://b"].calls == ["eth_sendRawTransaction"] * 2
+
+
+def test_async_provider_fails_over(clock):
+    pool = _pool()
+    _measure(pool)
+    provider, nodes = _provider(pool, {"http://a": [asyncio.TimeoutError()]},
+                                cls=AsyncMultiHTTPProvider, node=AsyncFakeNode)
+
+    async def main():
+        response = await provider.make_request("eth_blockNumber", [])
+        batch = await provider.make_batch_request([("eth_chainId", [])])
+        await provider.disconnect()
+        return response, batch
+
+    response, batch = asyncio.run(main())
+    assert response == {"result": "http://b"}
+    assert batch == [{"result": "http://b"}]
+    assert pool.endpoints[0].failures == 1
+    assert all(n.calls[-1] == "disconnect" for n in nodes.values())
+
+
+def test_async_provider_does_not_fail_over_on_request_errors(clock):
+    pool = _pool()
+    provider, nodes = _provider(pool, {"http://a": [ValueError("bad input")]},
+                                cls=AsyncMultiHTTPProvider, node=AsyncFakeNode)
+
+    with pytest.raises(ValueError):
+        asyncio.run(provider.make_request("eth_call", []))
+    assert nodes["http://b"].calls == []
+    assert pool.endpoints[0].failures == 0
@@ -0,0 +1,150 @@
+# tests/test_streak_projection.py
+import random
+
+import pytest
+
+from app.services import streak_projection
+from app.services.streak_projection import StreakProjection, StreakState
+from tests.conftest import FakeContract
+
+WIDTH = 16
+
+
+def _naive_streak(days, today):
+    # Consecutive completed days ending today, or yesterday if today isn't done yet
+    day = today if today in days else today - 1
+    run = 0
+    while day in days:
+        run += 1
+        day -= 1
+    return run
+
+
+def _status(days, today):
+    return [today - k in days for k in range(7)]
+
+
+def test_recorded_completions_match_a_day_set():
+    rng = random.Random(3)
+    for _ in range(200):
+        state = StreakState(0, 0, 0)
+        days = set()
+        day = 0
+        for _ in range(30):
+            day += rng.choice([0, 0, 1, 1, 1, 2, 5])
+            state.record(day, WIDTH)
+            days.add(day)
+            for today in (day, day + 1, day + 2):
+                assert state.streak(today) == _naive_streak(days, today)
+                assert state.history(today, 7) == _status(days, today)
+
+
+def test_completion_after_seeding_without_today_starts_a_run():
+    # Seeded on day 10 with nothing done today or yesterday
+    days = {7, 8}
+    state = StreakState.from_chain(10, 0, _status(days, 10), WIDTH)
+    state.record(10, WIDTH)
+    assert state.streak(10) == 1
+    state.record(11, WIDTH)
+    assert state.streak(11) == 2
+
+
+def test_completion_on_the_seed_day_extends_yesterdays_run():
+    days = {7, 8, 9}
+    state = StreakState.from_chain(10, 3, _status(days, 10), WIDTH)
+    state.record(10, WIDTH)
+    days.add(10)
+    assert state.streak(10) == _naive_streak(days, 10) == 4
+    assert state.history(10, 7) == _status(days, 10)
+
+
+def test_runs_longer_than_the_bitset_stay_exact():
+    state = StreakState.from_chain(100, 40, [True] * 7, WIDTH)
+    for day in range(101, 105):
+        state.record(day, WIDTH)
+    assert state.streak(104) == 44 and state.streak(105) == 44 and state.streak(106) == 0
+
+
+class StreakFunctions:
+    def getCurrentDay(self):
+        return ("day",)
+
+    def getCurrentStreak(self, address):
+        return ("streak", address)
+
+    def getLast7DaysStatus(self, address):
+        return ("status", address)
+
+
+class StreakChain:
+    """
+    Head state of the Streak contract, answering batch_call with day sets per user.
+    """
+
+    def __init__(self, day):
+        self.day = day
+        self.days = {}
+        self.reads = []
+
+    def batch_call(self, calls, block_identifier="latest"):
+        self.reads.append(([c[1] for c in calls if c[0] == "streak"], block_identifier))
+        out = []
+        for call in calls:
+            days = self.days.get(call[-1], set())
+            out.append(self.day if call[0] == "day" else
+                       _naive_streak(days, self.day) if call[0] == "streak" else _status(days, self.day))
+        return out
+
+
+@pytest.fixture
+def streak_chain(monkeypatch):
+    chain = StreakChain(100)
+    monkeypatch.setattr(streak_projection, "batch_call", chain.batch_call)
+    return chain
+
+
+def _projection(**kwargs):
+    return StreakProjection(FakeContract(StreakFunctions()), history_days=WIDTH, **kwargs)
+
+
+def test_refresh_reads_users_in_rotation_at_the_head(streak_chain):
+    projection = _projection(refresh_batch=2)
+    projection.seed(100, {a: (0, [False] * 7) for a in "ABC"})
+    for _ in range(3):
+        projection.refresh_once()
+    assert streak_chain.reads == [(["A", "B"], "latest"), (["C"], "latest"), (["A", "B"], "latest")]
+    assert projection.ready and projection.day == 100
+
+
+def test_refresh_advances_completions_and_keeps_older_history(streak_chain):
+    projection = _projection()
+    streak_chain.days["A"] = set(range(80, 100))
+    projection.seed(100, {"A": (20, _status(streak_chain.days["A"], 100))})
+    changes = []
+    projection.on_change(lambda address, state: changes.append(address))
+
+    streak_chain.days["A"].add(100)
+    assert projection.refresh_once() == 1
+    # A plain reseed would only know the last 7 days plus the run length
+    assert projection.lookup(["A"], WIDTH)["A"] == {"streak": 21, "history": [True] * WIDTH}
+    assert changes == ["A"]
+    assert projection.refresh_once() == 0
+
+
+def test_refresh_reseeds_users_that_changed_otherwise(streak_chain):
+    projection = _projection()
+    streak_chain.days["A"] = {97, 98, 99}
+    projection.seed(100, {"A": (3, _status(streak_chain.days["A"], 100))})
+    days = []
+    projection.on_day(days.append)
+
+    # Two days pass without a completion
+    streak_chain.day = 102
+    projection.refresh_once()
+    assert days == [102]
+    assert projection.lookup(["A"])["A"]["streak"] == 0
+
+    # Two completions since the last refresh: more than record() can explain, so reseeded
+    streak_chain.days["A"] |= {101, 102}
+    assert projection.refresh_once() == 1
+    assert projection.lookup(["A"])["A"] == {"streak": 2, "history": _status(streak_chain.days["A"], 102)}
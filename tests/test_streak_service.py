@@ -0,0 +1,76 @@
+# tests/test_streak_service.py
+import asyncio
+
+from web3 import Web3
+
+from app.services import streak_service
+from app.services.leaderboard import StreakLeaderboard
+from app.services.streak_projection import StreakProjection
+from tests.conftest import FakeContract
+
+USER = Web3.to_checksum_address("0x" + "c" * 40)
+
+
+class Receipt:
+    transactionHash = bytes(32)
+    status = 1
+
+
+def test_completion_shows_up_on_the_next_read(monkeypatch):
+    projection = StreakProjection(FakeContract(), history_days=16)
+    projection._set_day(100)
+    projection.seed(100, {USER: (2, [False, True, True] + [False] * 4)})
+    chain = {"streak": 2, "status": [False, True, True] + [False] * 4}
+
+    async def build_tx(fn):
+        return "signed"
+
+    async def send(signed):
+        # Mined: the contract now counts today
+        chain.update(streak=3, status=[True, True, True] + [False] * 4)
+        return Receipt()
+
+    async def read_streaks(addresses):
+        return 100, {a: (chain["streak"], chain["status"]) for a in addresses}
+
+    monkeypatch.setattr(streak_service, "streak_projection", projection)
+    monkeypatch.setattr(streak_service, "_projected_reads", lambda: True)
+    monkeypatch.setattr(streak_service, "async_build_signed_tx", build_tx)
+    monkeypatch.setattr(streak_service, "async_send_signed_transaction", send)
+    monkeypatch.setattr(streak_service, "_read_streaks", read_streaks)
+
+    async def run():
+        before = await streak_service.get_current_streak(USER)
+        await streak_service.complete_task(USER)
+        return before, await streak_service.get_current_streak(USER)
+
+    assert asyncio.run(run()) == (2, 3)
+
+
+def test_never_queried_user_is_ranked_once_asked_for(monkeypatch):
+    projection = StreakProjection(FakeContract(), history_days=16)
+    board = StreakLeaderboard()
+    projection.on_change(board.update)
+    projection._set_day(100)
+    board.rollover(100)
+    known = Web3.to_checksum_address("0x" + "d" * 40)
+    projection.seed(100, {known: (2, [True, True] + [False] * 5)})
+
+    async def read_streaks(addresses):
+        return 100, {a: (9, [True] * 7) for a in addresses}
+
+    monkeypatch.setattr(streak_service, "streak_projection", projection)
+    monkeypatch.setattr(streak_service, "streak_leaderboard", board)
+    monkeypatch.setattr(streak_service, "_projected_reads", lambda: True)
+    monkeypatch.setattr(streak_service, "_read_streaks", read_streaks)
+
+    async def run():
+        before = await streak_service.get_leaderboard()
+        rank = await streak_service.get_leaderboard_rank(USER)
+        return before, rank, await streak_service.get_leaderboard()
+
+    before, rank, after = asyncio.run(run())
+    # Only tracked users are ranked, and the response says so
+    assert [e["address"] for e in before["entries"]] == [known] and before["scope"] == "tracked"
+    assert rank == {"rank": 1, "address": USER, "streak": 9, "scope": "tracked"}
+    assert [e["address"] for e in after["entries"]] == [USER, known]
@@ -0,0 +1,181 @@
+# tests/test_tally_stream.py
+import asyncio
+
+from app.services import dao_service
+from app.services.proposal_index import ProposalStore
+from app.services.tally_stream import Subscription, TallyHub
+
+
+class FakeIndexer:
+    def __init__(self):
+        self.handlers = {}
+        self.rollbacks = []
+        self.seeds = []
+
+    def subscribe(self, event_name, handler):
+        self.handlers.setdefault(event_name, []).append(handler)
+
+    def on_rollback(self, handler):
+        self.rollbacks.append(handler)
+
+    def on_seed(self, handler):
+        self.seeds.append(handler)
+
+
+class FakeIndex:
+    """ProposalIndex stand-in: a store the test writes to, then 'indexes' events."""
+
+    def __init__(self):
+        self.store = ProposalStore()
+        self.store.reset({1: _row(1), 2: _row(2)})
+        self.indexer = FakeIndexer()
+
+    def start(self):
+        pass
+
+    def vote(self, proposal_id, voter, support=True, block=10):
+        row = self.store.get(proposal_id)
+        field = "yesVotes" if support else "noVotes"
+        self.store.put(dict(row, **{field: row[field] + 1}), block=block)
+        for handler in self.indexer.handlers["Voted"]:
+            handler({"args": {"proposalId": proposal_id, "voter": voter, "voteType": int(support)},
+                     "blockNumber": block})
+
+    def execute(self, proposal_id, block=11):
+        self.store.put(dict(self.store.get(proposal_id), executed=True), block=block)
+        for handler in self.indexer.handlers["ProposalExecuted"]:
+            handler({"args": {"proposalId": proposal_id}, "blockNumber": block})
+
+
+def _row(proposal_id, **fields):
+    return {"id": proposal_id, "proposer": "A", "description": "", "startTime": 0, "endTime": 10 ** 10,
+            "yesVotes": 0, "noVotes": 0, "executed": False, **fields}
+
+
+async def _drain(subscription):
+    await asyncio.sleep(0)  # let call_soon_threadsafe fan-outs run
+    messages = []
+    while (message := await subscription.get(0.01)) is not None:
+        messages.append(message)
+    return messages
+
+
+def test_votes_fan_out_to_subscribers_of_that_proposal_only():
+    index = FakeIndex()
+    hub = TallyHub(index)
+
+    async def main():
+        async with hub.subscribe(1) as first, hub.subscribe(1) as second, hub.subscribe(2) as other:
+            assert hub.stats() == {"proposals": 2, "subscribers": 3}
+            index.vote(1, "A")
+            index.vote(1, "B", support=False)
+            return await _drain(first), await _drain(second), await _drain(other)
+
+    first, second, other = asyncio.run(main())
+    assert first == second
+    assert [(m["event"], m["data"]["yesVotes"], m["data"]["noVotes"], m["data"]["voter"]) for m in first] == [
+        ("vote", 1, 0, "A"), ("vote", 1, 1, "B"),
+    ]
+    assert other == []
+    assert hub.stats() == {"proposals": 0, "subscribers": 0}
+
+
+def test_overflow_replaces_the_backlog_with_a_snapshot():
+    index = FakeIndex()
+    hub = TallyHub(index, queue_size=3)
+
+    async def main():
+        async with hub.subscribe(1) as subscription:
+            for i in range(5):
+                index.vote(1, f"voter{i}")
+            await asyncio.sleep(0)
+            return subscription.overflows, await _drain(subscription)
+
+    overflows, messages = asyncio.run(main())
+    assert overflows == 1
+    assert [m["event"] for m in messages] == ["snapshot", "vote"]
+    # Read when the fourth vote is delivered, the store already holds all five
+    assert messages[0]["data"]["yesVotes"] == 5
+    assert (messages[1]["data"]["yesVotes"], messages[1]["data"]["voter"]) == (5, "voter4")
+
+
+def test_overflow_without_a_snapshot_drops_the_oldest_message():
+    async def main():
+        subscription = Subscription(1, asyncio.get_running_loop(), maxsize=2)
+        for i in range(3):
+            subscription.push({"event": "vote", "data": i})
+        return await _drain(subscription)
+
+    assert [m["data"] for m in asyncio.run(main())] == [1, 2]
+
+
+def test_reorg_resends_a_snapshot_to_every_watched_proposal():
+    index = FakeIndex()
+    hub = TallyHub(index)
+
+    async def main():
+        async with hub.subscribe(1) as first, hub.subscribe(2) as second:
+            index.vote(1, "A", block=12)
+            await _drain(first)
+            # The vote's block is orphaned: the index rolls back, then the hub resends
+            index.store.rollback(11)
+            for handler in index.indexer.rollbacks:
+                handler(11)
+            return await _drain(first), await _drain(second)
+
+    first, second = asyncio.run(main())
+    assert [(m["event"], m["data"]["yesVotes"]) for m in first] == [("snapshot", 0)]
+    assert [(m["event"], m["data"]["id"]) for m in second] == [("snapshot", 2)]
+
+
+def test_watch_proposal_subscribes_before_taking_the_snapshot(monkeypatch):
+    index = FakeIndex()
+    hub = TallyHub(index)
+    monkeypatch.setattr(dao_service, "tally_hub", hub)
+    monkeypatch.setattr(dao_service.config, "TALLY_STREAM_HEARTBEAT", 0.01)
+
+    async def get_proposal(proposal_id):
+        snapshot = index.store.get(proposal_id)
+        # A vote lands after the snapshot is read but before it is sent
+        index.vote(proposal_id, "late")
+        await asyncio.sleep(0)
+        return snapshot
+
+    monkeypatch.setattr(dao_service, "get_proposal", get_proposal)
+
+    async def main():
+        stream = dao_service.watch_proposal(1)
+        items = [await anext(stream), await anext(stream)]
+        index.execute(1)
+        items += [item async for item in stream]
+        return items
+
+    items = asyncio.run(main())
+    assert [(event, data["yesVotes"]) for event, data in items] == [
+        ("snapshot", 0), ("vote", 1), ("executed", 1),
+    ]
+    assert hub.stats() == {"proposals": 0, "subscribers": 0}
+
+
+def test_watch_proposal_ends_on_an_executed_snapshot(monkeypatch):
+    index = FakeIndex()
+    hub = TallyHub(index, queue_size=1)
+    monkeypatch.setattr(dao_service, "tally_hub", hub)
+
+    async def get_proposal(proposal_id):
+        return index.store.get(proposal_id)
+
+    monkeypatch.setattr(dao_service, "get_proposal", get_proposal)
+
+    async def main():
+        stream = dao_service.watch_proposal(1)
+        items = [await anext(stream)]
+        # The viewer falls behind and the "executed" message is folded into a snapshot
+        index.vote(1, "A")
+        index.execute(1)
+        items += [item async for item in stream]
+        return items
+
+    items = asyncio.run(main())
+    assert [event for event, _ in items] == ["snapshot", "snapshot"]
+    assert items[-1][1]["executed"] is True
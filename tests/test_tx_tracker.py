@@ -0,0 +1,220 @@
+# tests/test_tx_tracker.py
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from app.routers import tx as tx_router
+from app.services import tx_tracker as tx_module
+from app.services.tx_tracker import CONFIRMED, FAILED, PENDING, TIMEOUT, TxTracker
+
+
+class FakeNode:
+    """
+    Receipt lookups answered from `receipts` (tx hash -> receipt, missing = not
+    mined yet), returned in reverse id order like some nodes do.
+    """
+
+    def __init__(self):
+        self.receipts = {}
+        self.batches = []
+        self.sent = []
+        self._id = 0
+
+    async def make_batch_request(self, batch_requests):
+        self.batches.append([params[0] for _, params in batch_requests])
+        responses = []
+        for method, (tx_hash,) in batch_requests:
+            assert method == "eth_getTransactionReceipt"
+            self._id += 1
+            responses.append({"jsonrpc": "2.0", "id": self._id, "result": self.receipts.get(tx_hash)})
+        return responses[::-1]
+
+    async def broadcast(self, signed_tx):
+        self.sent.append(signed_tx)
+        return bytes.fromhex(signed_tx.hash)
+
+    def mine(self, tx_hash, status=1, block=42):
+        self.receipts[tx_hash] = {"status": hex(status), "blockNumber": hex(block)}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def node(monkeypatch):
+    fake = FakeNode()
+    monkeypatch.setattr(tx_module, "aw3", SimpleNamespace(provider=fake))
+    monkeypatch.setattr(tx_module, "async_broadcast", fake.broadcast)
+    return fake
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = Clock()
+    monkeypatch.setattr(tx_module.time, "time", fake.time)
+    return fake
+
+
+def _signed(n):
+    return SimpleNamespace(hash=f"{n:064x}")
+
+
+def _hash(n):
+    return f"0x{n:064x}"
+
+
+def test_submit_broadcasts_and_tracks_as_pending(node, clock):
+    tracker = TxTracker(poll_interval=60)
+
+    async def main():
+        record = await tracker.submit(_signed(1))
+        tracker._task.cancel()
+        return record
+
+    record = asyncio.run(main())
+    assert node.sent == [_signed(1)]
+    assert record == {"txHash": _hash(1), "state": PENDING, "status": None,
+                      "blockNumber": None, "submittedAt": int(clock.now)}
+    assert tracker.get(_hash(1).upper().replace("0X", "")) == record
+    assert tracker.pending_hashes() == [_hash(1)]
+
+
+def test_one_batched_poll_settles_each_transaction(node, clock, monkeypatch):
+    monkeypatch.setattr(tx_module.config, "BATCH_CALL_CHUNK_SIZE", 2)
+    tracker = TxTracker(timeout=600)
+    for n in range(1, 6):
+        tracker._store({"txHash": _hash(n), "state": PENDING, "status": None,
+                        "blockNumber": None, "submittedAt": int(clock.now)})
+    node.mine(_hash(1), status=1, block=10)
+    node.mine(_hash(2), status=0, block=11)
+    node.mine(_hash(5), status=1, block=12)
+
+    asyncio.run(tracker.poll_once())
+
+    assert node.batches == [[_hash(1), _hash(2)], [_hash(3), _hash(4)], [_hash(5)]]
+    assert tracker.get(_hash(1))["state"] == CONFIRMED
+    assert (tracker.get(_hash(1))["status"], tracker.get(_hash(1))["blockNumber"]) == (1, 10)
+    assert tracker.get(_hash(2))["state"] == FAILED
+    assert tracker.get(_hash(5))["blockNumber"] == 12
+    assert tracker.pending_hashes() == [_hash(3), _hash(4)]
+
+    node.batches.clear()
+    asyncio.run(tracker.poll_once())
+    assert node.batches == [[_hash(3), _hash(4)]]  # settled hashes are not polled again
+
+
+def test_pending_to_mined_through_the_background_poller(node, clock):
+    tracker = TxTracker(poll_interval=0.01)
+
+    async def main():
+        record = await tracker.submit(_signed(7))
+        await asyncio.sleep(0.05)
+        assert tracker.get(record["txHash"])["state"] == PENDING
+        node.mine(record["txHash"], status=1)
+        settled = await tracker.wait(record["txHash"], timeout=1)
+        await asyncio.sleep(0.05)
+        return settled
+
+    settled = asyncio.run(main())
+    assert settled["state"] == CONFIRMED
+    assert tracker._task is None  # the poller stops once nothing is pending
+    assert tracker._subscribers == {}
+
+
+def test_reverted_transaction_is_failed(node, clock):
+    tracker = TxTracker(poll_interval=0.01)
+
+    async def main():
+        record = await tracker.submit(_signed(8))
+        node.mine(record["txHash"], status=0)
+        return await tracker.wait(record["txHash"], timeout=1)
+
+    assert asyncio.run(main())["state"] == FAILED
+
+
+def test_dropped_transaction_times_out(node, clock):
+    tracker = TxTracker(timeout=600)
+    tracker._store({"txHash": _hash(9), "state": PENDING, "status": None,
+                    "blockNumber": None, "submittedAt": int(clock.now)})
+
+    clock.now += 600
+    asyncio.run(tracker.poll_once())
+    assert tracker.get(_hash(9))["state"] == PENDING
+
+    clock.now += 1
+    asyncio.run(tracker.poll_once())
+    assert tracker.get(_hash(9))["state"] == TIMEOUT
+    assert tracker.pending_hashes() == []
+
+
+def test_rejected_batch_keeps_transactions_pending(node, clock, monkeypatch):
+    tracker = TxTracker()
+    tracker._store({"txHash": _hash(3), "state": PENDING, "status": None,
+                    "blockNumber": None, "submittedAt": int(clock.now)})
+
+    async def rejected(batch_requests):
+        return {"jsonrpc": "2.0", "id": None, "error": {"code": -32005, "message": "rate limited"}}
+
+    monkeypatch.setattr(node, "make_batch_request", rejected)
+    asyncio.run(tracker.poll_once())
+    assert tracker.get(_hash(3))["state"] == PENDING
+
+
+def test_old_settled_records_are_evicted_but_pending_ones_kept(node, clock):
+    tracker = TxTracker(max_records=2)
+    tracker._store({"txHash": _hash(1), "state": PENDING, "submittedAt": 0})
+    tracker._store({"txHash": _hash(2), "state": CONFIRMED, "submittedAt": 0})
+    tracker._store({"txHash": _hash(3), "state": CONFIRMED, "submittedAt": 0})
+    assert tracker.get(_hash(1)) is not None  # oldest, but still pending
+
+    tracker._store({**tracker.get(_hash(1)), "state": CONFIRMED})  # moves to the end
+    tracker._store({"txHash": _hash(4), "state": CONFIRMED, "submittedAt": 0})
+    assert [tracker.get(_hash(n)) is not None for n in range(1, 5)] == [True, False, False, True]
+
+
+def _events(tx_hash):
+    async def collect():
+        response = await tx_router.stream_tx_status(tx_hash)
+        return [json.loads(chunk[len("data: "):]) async for chunk in response.body_iterator]
+    return collect()
+
+
+def test_sse_streams_until_the_transaction_settles(node, clock, monkeypatch):
+    tracker = TxTracker(poll_interval=0.01)
+    monkeypatch.setattr(tx_router, "tx_tracker", tracker)
+
+    async def main():
+        record = await tracker.submit(_signed(5))
+        stream = asyncio.ensure_future(_events(record["txHash"]))
+        await asyncio.sleep(0.05)
+        node.mine(record["txHash"], status=1, block=77)
+        return await asyncio.wait_for(stream, 1)
+
+    events = asyncio.run(main())
+    assert [e["state"] for e in events] == [PENDING, CONFIRMED]
+    assert events[-1]["blockNumber"] == 77
+    assert tracker._subscribers == {}
+
+
+def test_sse_for_a_settled_transaction_sends_one_event(node, clock, monkeypatch):
+    tracker = TxTracker()
+    monkeypatch.setattr(tx_router, "tx_tracker", tracker)
+    tracker._store({"txHash": _hash(6), "state": FAILED, "status": 0,
+                    "blockNumber": 3, "submittedAt": 0})
+
+    events = asyncio.run(_events(_hash(6)))
+    assert [e["state"] for e in events] == [FAILED]
+
+
+def test_sse_for_an_unknown_transaction_is_404(monkeypatch):
+    monkeypatch.setattr(tx_router, "tx_tracker", TxTracker())
+    with pytest.raises(tx_router.HTTPException) as e:
+        asyncio.run(tx_router.stream_tx_status(_hash(404)))
+    assert e.value.status_code == 404
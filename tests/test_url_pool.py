@@ -0,0 +1,97 @@
+# tests/test_url_pool.py
+import asyncio
+
+from app import config
+from app.services import pinata_service, url_pool
+from app.services.http_client import UpstreamHTTPError
+from app.services.url_pool import SignedUrlPool
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_pool_never_serves_urls_with_less_than_min_remaining(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(url_pool.time, "monotonic", clock.monotonic)
+    fetched = []
+
+    async def fetch():
+        fetched.append(clock.now)
+        return f"url-{len(fetched)}"
+
+    async def run():
+        pool = SignedUrlPool(fetch, ttl=90, min_remaining=60, min_size=2, max_size=2)
+        await pool.refill_once()
+        clock.now += 29  # 61 s left
+        first = pool.take()
+        clock.now += 2  # 59 s left: stale
+        second = pool.take()
+        return first, second
+
+    assert asyncio.run(run()) == ("url-1", None)
+
+
+def test_pooled_urls_are_signed_for_the_shelf_life_on_top_of_expires(monkeypatch):
+    payloads = []
+
+    class Response:
+        def json(self):
+            return {"data": "https://upload"}
+
+    async def request(service, method, url, json=None, headers=None):
+        payloads.append(json)
+        return Response()
+
+    monkeypatch.setattr(pinata_service.http_client, "request", request)
+    asyncio.run(pinata_service.signed_url_pool.fetch())
+    asyncio.run(pinata_service.request_signed_url())
+
+    pool = pinata_service.signed_url_pool
+    assert payloads[0]["expires"] == pool.ttl == config.PINATA_URL_EXPIRES + config.PINATA_URL_SHELF_LIFE
+    assert pool.min_remaining == config.PINATA_URL_EXPIRES
+    assert payloads[1]["expires"] == config.PINATA_URL_EXPIRES
+
+
+def test_pool_without_credentials_never_starts_refilling():
+    async def fetch():
+        raise AssertionError("no credentials, nothing should be signed")
+
+    async def run():
+        pool = SignedUrlPool(fetch, ttl=90, min_remaining=60, enabled=lambda: False)
+        return pool.take(), pool
+
+    url, pool = asyncio.run(run())
+    assert url is None and pool._task is None
+
+
+def test_pinata_pool_is_disabled_without_a_jwt(monkeypatch):
+    monkeypatch.setattr(config, "PINATA_JWT", None)
+    assert not pinata_service.signed_url_pool.enabled()
+    monkeypatch.setattr(config, "PINATA_JWT", "jwt")
+    assert pinata_service.signed_url_pool.enabled()
+
+
+def test_rejected_credentials_back_off_exponentially():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        raise UpstreamHTTPError("pinata", 401, "invalid token")
+
+    async def run():
+        pool = SignedUrlPool(fetch, ttl=90, min_remaining=60, min_size=1, max_size=1,
+                             refill_interval=0.01, max_backoff=10)
+        pool.start()
+        await asyncio.sleep(0.3)
+        await pool.stop()
+        return pool
+
+    pool = asyncio.run(run())
+    # Without back-off this would be ~30 rounds; with it: 0.02 + 0.04 + 0.08 + 0.16 s
+    assert 3 <= len(calls) <= 5
+    assert pool.failures == len(calls) and pool.stats()["failures"] == pool.failures
@@ -0,0 +1,208 @@
+# tests/test_view_cache.py
+import asyncio
+
+import pytest
+
+from app.services.cache_backend import CacheBackend
+from app.services.event_indexer import EventIndexer
+from app.services.view_cache import BLOCK, EVENTS, ViewCache, cached_view
+from tests.conftest import FakeContract
+
+
+class FakeHead:
+    def __init__(self, head=100):
+        self.head = head
+        self.reorgs = 0
+
+    def start(self):
+        pass
+
+
+class Reads:
+    """Counts node reads and returns a new value on every one."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+@pytest.fixture
+def indexer(chain):
+    indexer = EventIndexer(FakeContract(), name="test")
+    indexer.start = lambda: None  # synced by hand
+    chain.mine(5)
+    indexer.sync_once()
+    return indexer
+
+
+@pytest.fixture
+def cache(indexer):
+    cache = ViewCache(head=FakeHead(), backend=CacheBackend())
+    cache.watch_events("Moderation", indexer)
+    return cache
+
+
+def _get(cache, mode, read, key=("Moderation", "getFlags", (1,))):
+    return asyncio.run(cache.get_or_load(key, mode, read))
+
+
+def test_block_entries_live_until_the_head_moves(cache):
+    read = Reads()
+    assert _get(cache, BLOCK, read) == 1
+    assert _get(cache, BLOCK, read) == 1
+
+    cache.head.head += 1
+    assert _get(cache, BLOCK, read) == 2
+    assert read.calls == 2
+
+
+def test_block_reads_pass_through_without_a_head(cache):
+    cache.head.head = None
+    read = Reads()
+    _get(cache, BLOCK, read)
+    _get(cache, BLOCK, read)
+    assert read.calls == 2
+
+
+def test_events_entries_ignore_the_head(cache):
+    read = Reads()
+    _get(cache, EVENTS, read)
+    cache.head.head += 10
+    assert _get(cache, EVENTS, read) == 1
+
+
+def test_matching_log_invalidates_events_entries(cache, chain, indexer):
+    read = Reads()
+    assert _get(cache, EVENTS, read) == 1
+
+    chain.mine(1, [("FlagResolved", {"contentId": 1, "removed": True})])
+    indexer.sync_once()
+    assert _get(cache, EVENTS, read) == 2
+    assert _get(cache, EVENTS, read) == 2
+
+
+def test_unwatched_events_do_not_invalidate(cache, chain, indexer):
+    read = Reads()
+    _get(cache, EVENTS, read)
+    chain.mine(3)
+    indexer.sync_once()
+    assert _get(cache, EVENTS, read) == 1
+
+
+def test_events_reads_pass_through_until_the_indexer_is_ready(chain):
+    cache = ViewCache(head=FakeHead(), backend=CacheBackend())
+    indexer = EventIndexer(FakeContract(), name="test")
+    indexer.start = lambda: None
+    cache.watch_events("Moderation", indexer)
+    read = Reads()
+
+    _get(cache, EVENTS, read)
+    _get(cache, EVENTS, read)
+    assert read.calls == 2
+
+    indexer.sync_once()
+    _get(cache, EVENTS, read)
+    _get(cache, EVENTS, read)
+    assert read.calls == 3
+
+
+def test_events_entries_expire_after_event_ttl(cache):
+    cache.event_ttl = 0
+    read = Reads()
+    _get(cache, EVENTS, read)
+    _get(cache, EVENTS, read)
+    assert read.calls == 2
+
+
+def test_reorg_clears_block_and_events_entries(cache, chain, indexer):
+    block_key = ("Streak", "getCurrentStreak", ("0xabc",))
+    block_read, events_read = Reads(), Reads()
+    chain.mine(1, [("ContentFlagged", {"contentId": 1})])
+    indexer.sync_once()
+    _get(cache, BLOCK, block_read, block_key)
+    _get(cache, EVENTS, events_read)
+
+    # Same height, different blocks: the head number alone can't tell
+    chain.fork(chain.block_number)
+    chain.mine(1)
+    indexer.sync_once()
+
+    assert _get(cache, BLOCK, block_read, block_key) == 2
+    assert _get(cache, EVENTS, events_read) == 2
+
+
+def test_head_going_backwards_clears_block_entries(cache):
+    read = Reads()
+    _get(cache, BLOCK, read)
+    cache.head.head -= 1
+    cache.head.reorgs += 1
+    _get(cache, BLOCK, read)
+    cache.head.head += 1  # back at the original height, on the new branch
+    assert _get(cache, BLOCK, read) == 3
+
+
+def test_reorg_during_a_read_is_not_cached(cache):
+    async def read_across_a_reorg():
+        cache.invalidate_blocks()
+        return "stale"
+
+    assert _get(cache, BLOCK, read_across_a_reorg) == "stale"
+    read = Reads()
+    assert _get(cache, BLOCK, read) == 1
+
+
+def test_event_during_a_read_is_not_cached(cache):
+    async def read_across_an_event():
+        cache.invalidate_contract("Moderation", "9:0")
+        return "stale"
+
+    assert _get(cache, EVENTS, read_across_an_event) == "stale"
+    assert _get(cache, EVENTS, Reads()) == 1
+
+
+def test_concurrent_misses_share_one_read(cache):
+    calls = []
+
+    async def slow():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(
+            cache.get_or_load(("Moderation", "getFlags", (1,)), BLOCK, slow) for _ in range(5)
+        ))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+    stats = cache.stats()["functions"]["Moderation.getFlags"]
+    assert (stats["misses"], stats["coalesced"]) == (1, 4)
+
+
+def test_lru_evicts_past_maxsize(cache):
+    cache.maxsize = 2
+    for n in range(3):
+        _get(cache, BLOCK, Reads(), ("Moderation", "getFlags", (n,)))
+    assert cache.stats()["size"] == 2
+    read = Reads()
+    assert _get(cache, BLOCK, read, ("Moderation", "getFlags", (0,))) == 1
+    assert read.calls == 1
+
+
+def test_cached_view_keys_by_function_and_args(cache):
+    calls = []
+
+    @cached_view("Moderation", BLOCK, cache=cache)
+    async def get_flags(content_id):
+        calls.append(content_id)
+        return [content_id]
+
+    async def main():
+        return [await get_flags(1), await get_flags(1), await get_flags(2)]
+
+    assert asyncio.run(main()) == [[1], [1], [2]]
+    assert calls == [1, 2]
+    assert set(cache.stats()["functions"]) == {"Moderation.get_flags"}